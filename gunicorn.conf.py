@@ -0,0 +1,55 @@
+# Production server config: gunicorn --config gunicorn.conf.py
+#
+# preload_app runs create_app() (schema setup + catalog warm-up) once in the
+# master, then forks workers that share the warmed catalog copy-on-write.
+
+import os
+from pathlib import Path
+import tempfile
+
+wsgi_app = "src.trivia_web:create_app()"
+bind = os.getenv("TRIVIA_BIND", "0.0.0.0:8000")
+
+
+def usable_cpus() -> int:
+    # cores this process may run on (container CPU sets), not every core on the host
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+# one process per usable core (WEB_CONCURRENCY overrides); a few threads each
+# to overlap SQLite I/O
+workers = int(os.getenv("WEB_CONCURRENCY", usable_cpus()))
+worker_class = "gthread"
+threads = int(os.getenv("TRIVIA_THREADS", "4"))
+
+preload_app = True
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = "-"
+errorlog = "-"
+
+# With TRIVIA_METRICS=1 the workers share their metrics through files in this
+# directory, so /metrics sums every worker rather than reporting whichever one
+# served the scrape. It has to be set before the app (and prometheus_client)
+# is imported, and stale files from a previous run are removed.
+if os.getenv("TRIVIA_METRICS", "0") != "0":
+    metrics_dir = Path(
+        os.environ.setdefault(
+            "PROMETHEUS_MULTIPROC_DIR", str(Path(tempfile.gettempdir()) / "trivia-metrics")
+        )
+    )
+    metrics_dir.mkdir(parents=True, exist_ok=True)
+    for stale in metrics_dir.glob("*.db"):
+        stale.unlink()
+
+
+def child_exit(server, worker):
+    # an exited worker's counters stay in the totals; only its live gauges go
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
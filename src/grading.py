@@ -0,0 +1,204 @@
+"""
+Answer grading: normalization, an in-memory answer index and fuzzy matching.
+
+Answers are normalized once when the index is built (case, accents,
+punctuation, leading articles, number words -> digits) and split into
+accepted variants ("Hermione (Granger)" accepts "hermione granger" and
+"hermione"; "Vader / Anakin" accepts either, or both). The full answer
+is always a variant. Grading a submission is then a dict lookup plus a
+rapidfuzz comparison against a handful of short strings, with no
+database access.
+"""
+
+from collections.abc import Callable
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+from rapidfuzz import fuzz
+
+from src.sqlite_functions.catalog_cache import catalog_version
+
+# 0-100 similarity a normalized answer needs to count as correct
+FUZZY_THRESHOLD = float(os.getenv("TRIVIA_FUZZY_THRESHOLD", "85"))
+
+# How stale the index may get before we ask the DB for the catalog version again
+VERSION_CHECK_SECONDS = float(os.getenv("TRIVIA_ANSWER_INDEX_CHECK_SECONDS", "1.0"))
+
+ARTICLES = {"a", "an", "the"}
+
+_UNITS = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+    "thirteen": 13, "fourteen": 14, "fifteen": 15, "sixteen": 16,
+    "seventeen": 17, "eighteen": 18, "nineteen": 19,
+}  # fmt: skip
+_TENS = {
+    "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50,
+    "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90,
+}  # fmt: skip
+_SCALES = {"hundred": 100, "thousand": 1000, "million": 1000000}
+
+_DIGIT_GROUPS = re.compile(r"(?<=\d)[,_](?=\d{3}\b)")
+_NON_WORD = re.compile(r"[^\w\s]")
+# only a spaced slash separates alternatives: "AC/DC", "24/7" and "1/2" are one answer,
+# and "A; B; C" lists answers that are all required
+_VARIANT_SPLIT = re.compile(r"\s+/\s+")
+_PARENS = re.compile(r"\(([^)]*)\)")
+_NUMBERS = re.compile(r"\d+")
+
+
+def _words_to_digits(tokens: list[str]) -> list[str]:
+    """Collapse runs of number words ("twenty", "one") into digits ("21")."""
+    out = []
+    total = current = 0
+    prev = None  # kind of the previous number word: "unit", "tens", "scale"
+
+    def flush():
+        nonlocal total, current
+        out.append(str(total + current))
+        total = current = 0
+
+    for tok in tokens:
+        if tok in _UNITS:
+            if prev == "unit":  # "one two" is two numbers, not three
+                flush()
+            current += _UNITS[tok]
+            prev = "unit"
+        elif tok in _TENS:
+            if prev in ("unit", "tens"):
+                flush()
+            current += _TENS[tok]
+            prev = "tens"
+        elif tok in _SCALES and prev is not None:
+            scale = _SCALES[tok]
+            if scale == 100:
+                current *= scale
+            else:
+                total += current * scale
+                current = 0
+            prev = "scale"
+        else:
+            if prev is not None:
+                flush()
+                prev = None
+            out.append(tok)
+    if prev is not None:
+        flush()
+    return out
+
+
+def normalize_answer(text: str) -> str:
+    """
+    Canonical form used for both stored answers and submissions,
+    e.g. "The Twenty-One Pilots!" -> "21 pilots".
+    """
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+    text = text.replace("&", " and ")
+    text = _DIGIT_GROUPS.sub("", text)
+    text = _NON_WORD.sub(" ", text.replace("-", " "))
+    tokens = text.split()
+    stripped = tokens
+    while stripped and stripped[0] in ARTICLES:
+        stripped = stripped[1:]
+    # an answer that is only articles ("A") keeps them rather than becoming ""
+    tokens = stripped or tokens
+    return " ".join(_words_to_digits(tokens))
+
+
+def answer_variants(answer: str) -> tuple[str, ...]:
+    """All normalized spellings accepted for a stored answer, the full answer first."""
+    answer = answer or ""
+    raw = [answer]
+    # "Hermione (Granger)" -> also accept "Hermione"
+    if _PARENS.search(answer):
+        raw.append(_PARENS.sub(" ", answer))
+    variants = []
+    for item in raw:
+        for part in (item, *_VARIANT_SPLIT.split(item)):
+            norm = normalize_answer(part)
+            if norm and norm not in variants:
+                variants.append(norm)
+    return tuple(variants)
+
+
+def grade(
+    user_answer: str, variants: tuple[str, ...], threshold: float = FUZZY_THRESHOLD
+) -> tuple[bool, float]:
+    """
+    Compare a submission against pre-normalized variants.
+
+    The numbers in a submission must match a variant's exactly ("Apollo 11"
+    is not "Apollo 13"); only then is it scored with the better of
+    rapidfuzz's ratio and token_sort_ratio.
+
+    Returns:
+        (correct, score) with score in 0-100
+    """
+    norm = normalize_answer(user_answer)
+    if not norm or not variants:
+        return False, 0.0
+    if norm in variants:
+        return True, 100.0
+
+    numbers = sorted(_NUMBERS.findall(norm))
+    best = 0.0
+    for variant in variants:
+        if sorted(_NUMBERS.findall(variant)) != numbers:
+            continue
+        score = max(fuzz.ratio(norm, variant), fuzz.token_sort_ratio(norm, variant))
+        best = max(best, score)
+    return best >= threshold, round(best, 1)
+
+
+class AnswerIndex:
+    """
+    question id -> accepted answer variants, rebuilt when the catalog changes.
+
+    The catalog version is re-read at most every `check_seconds`, so most
+    lookups never touch the database.
+    """
+
+    def __init__(self, check_seconds: float = VERSION_CHECK_SECONDS):
+        self.check_seconds = check_seconds
+        self._lock = threading.Lock()
+        self._answers = {}
+        self._version = None
+        self._checked_at = float("-inf")
+
+    def _refresh(self, conn: sqlite3.Connection) -> None:
+        version = catalog_version(conn)
+        if version is not None and version == self._version:
+            return
+        cur = conn.execute("SELECT id, answer FROM questions;")
+        self._answers = {qid: answer_variants(answer) for qid, answer in cur}
+        self._version = version
+
+    def warm(self, get_conn: Callable[[], sqlite3.Connection]) -> None:
+        """Build the index now rather than on the first lookup."""
+        self._checked_at = float("-inf")
+        self._maybe_refresh(get_conn)
+
+    def _maybe_refresh(self, get_conn: Callable[[], sqlite3.Connection]) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_seconds:
+            return
+        with self._lock:
+            if now - self._checked_at >= self.check_seconds:
+                conn = get_conn()
+                try:
+                    self._refresh(conn)
+                finally:
+                    conn.close()
+                self._checked_at = now
+
+    def variants(
+        self, get_conn: Callable[[], sqlite3.Connection], qid: int
+    ) -> tuple[str, ...] | None:
+        """Accepted variants for a question, or None if it doesn't exist."""
+        self._maybe_refresh(get_conn)
+        return self._answers.get(qid)
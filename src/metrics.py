@@ -0,0 +1,89 @@
+"""
+Request metrics, rendered in the Prometheus text format by prometheus_client.
+
+Per endpoint: request counts by method and status, a latency histogram,
+and histograms of how many SQLite statements each request ran and how
+long they took (from the QueryStats that get_db() connections fill in).
+
+Under gunicorn every worker is its own process. gunicorn.conf.py then
+sets PROMETHEUS_MULTIPROC_DIR, each worker writes its values to files
+there, and /metrics sums the files of all workers (exited ones included),
+so every scrape sees the same monotonic totals whichever worker serves it.
+"""
+
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.multiprocess import MultiProcessCollector
+
+# Set TRIVIA_METRICS=1 to record request metrics and serve them at /metrics.
+# /metrics has no authentication and lists every route, so keep it off on
+# public deployments unless the proxy blocks that path.
+METRICS_ENABLED = os.getenv("TRIVIA_METRICS", "0") != "0"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+
+class RequestMetrics:
+    """Everything /metrics reports, updated once per request."""
+
+    def __init__(self):
+        self.registry = CollectorRegistry()
+        self.requests = Counter(
+            "trivia_http_requests",
+            "HTTP requests by endpoint, method and status code.",
+            ("endpoint", "method", "status"),
+            registry=self.registry,
+        )
+        self.latency = Histogram(
+            "trivia_http_request_duration_seconds",
+            "Time from request start to response, by endpoint.",
+            ("endpoint",),
+            buckets=LATENCY_BUCKETS,
+            registry=self.registry,
+        )
+        self.db_queries = Histogram(
+            "trivia_db_queries_per_request",
+            "SQLite statements run per request, by endpoint.",
+            ("endpoint",),
+            buckets=QUERY_COUNT_BUCKETS,
+            registry=self.registry,
+        )
+        self.db_seconds = Histogram(
+            "trivia_db_seconds_per_request",
+            "Time spent in SQLite per request, by endpoint.",
+            ("endpoint",),
+            buckets=LATENCY_BUCKETS,
+            registry=self.registry,
+        )
+
+    def observe(
+        self,
+        endpoint: str,
+        method: str,
+        status: int,
+        seconds: float,
+        db_queries: int,
+        db_seconds: float,
+    ) -> None:
+        self.requests.labels(endpoint, method, str(status)).inc()
+        self.latency.labels(endpoint).observe(seconds)
+        self.db_queries.labels(endpoint).observe(db_queries)
+        self.db_seconds.labels(endpoint).observe(db_seconds)
+
+    def render(self) -> str:
+        registry = self.registry
+        if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+            # every worker's files, not just this process's values
+            registry = CollectorRegistry()
+            MultiProcessCollector(registry)
+        return generate_latest(registry).decode()
@@ -0,0 +1,122 @@
+"""
+Requests/sec for a mixed read/write workload, with and without connection pooling.
+
+Runs against a throwaway copy of the database so the real file is never touched:
+
+    python src/scripts/bench_db_pool.py --requests 2000 --threads 8
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Ensure the project root (parent of 'src') is on sys.path
+project_root = Path(__file__).resolve().parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src import trivia_web  # noqa: E402
+from src.sqlite_functions.connection import ConnectionPool  # noqa: E402
+
+_pooled_get_db = trivia_web.get_db
+
+
+def _workload(db_path: Path, n: int) -> list[tuple[str, str, dict | None]]:
+    with sqlite3.connect(db_path) as conn:
+        topics = [r[0] for r in conn.execute("SELECT DISTINCT topic FROM questions;")]
+        qids = [r[0] for r in conn.execute("SELECT id FROM questions;")]
+
+    rng = random.Random(42)
+    users = [f"bench-user-{i}" for i in range(20)]
+    calls = []
+    for _ in range(n):
+        user = rng.choice(users)
+        roll = rng.random()
+        if roll < 0.3:
+            payload = {
+                "user_name": user,
+                "question_id": rng.choice(qids),
+                "status": rng.choice(["correct", "wrong"]),
+            }
+            calls.append(("POST", "/update_progress/", payload))
+        elif roll < 0.5:
+            calls.append(("GET", f"/study/{rng.choice(topics)}/?user={user}", None))
+        elif roll < 0.7:
+            calls.append(("GET", f"/user/{user}/", None))
+        elif roll < 0.85:
+            calls.append(("GET", "/api/topics/", None))
+        else:
+            calls.append(("GET", f"/stats/{user}/", None))
+    return calls
+
+
+def _legacy_get_db(db_path: Path):
+    """The old get_db(): fresh connection + pragma on every call, rollback journal."""
+
+    def get_db():
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON;")
+        return conn
+
+    return get_db
+
+
+def run(db_path: Path, pooled: bool, calls: list, threads: int, pool_size: int) -> float:
+    """Replay `calls` through the Flask test client and return requests/sec."""
+    trivia_web.db_pool.close_all()
+    trivia_web.db_pool = ConnectionPool(db_path, size=pool_size)
+    trivia_web.get_db = _pooled_get_db if pooled else _legacy_get_db(db_path)
+    trivia_web.init_db()
+
+    def worker(chunk):
+        client = trivia_web.app.test_client()
+        for method, url, payload in chunk:
+            if method == "POST":
+                resp = client.post(url, json=payload)
+            else:
+                resp = client.get(url)
+            assert resp.status_code < 500, (url, resp.status_code)
+
+    chunks = [calls[i::threads] for i in range(threads)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as ex:
+        list(ex.map(worker, chunks))
+    elapsed = time.perf_counter() - start
+
+    trivia_web.db_pool.close_all()
+    return len(calls) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--pool-size", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for label, pooled in (("connect-per-request", False), ("pooled", True)):
+            # fresh copy each time so WAL / progress rows don't carry over
+            db_path = Path(tmp) / f"{label}.db"
+            shutil.copy(trivia_web.DB_PATH, db_path)
+            with sqlite3.connect(db_path) as conn:
+                conn.execute("PRAGMA journal_mode = DELETE;")
+            calls = _workload(db_path, args.requests)
+            results[label] = run(db_path, pooled, calls, args.threads, args.pool_size)
+
+    for label, rps in results.items():
+        print(f"{label:>22}: {rps:8.1f} req/s")
+    base = results["connect-per-request"]
+    print(f"{'speedup':>22}: {results['pooled'] / base:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
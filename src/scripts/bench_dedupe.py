@@ -0,0 +1,102 @@
+"""
+Duplicate-clustering time and peak memory across catalog sizes.
+
+Uses synthetic unit vectors with planted near-duplicates, so no model or
+database is needed:
+
+    python src/scripts/bench_dedupe.py --sizes 1000 5000 20000 200000
+
+The legacy full-matrix + Python double loop is only run up to --legacy-max.
+"""
+
+import argparse
+from collections import deque
+from pathlib import Path
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+# Ensure the project root (parent of 'src') is on sys.path
+project_root = Path(__file__).resolve().parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.sqlite_functions.similarity import MAX_BLOCK_BYTES, duplicate_groups  # noqa: E402
+
+
+def synthetic_embeddings(n: int, dim: int = 384, dup_rate: float = 0.05, seed: int = 0):
+    """Random unit vectors where a `dup_rate` share are noisy copies of another row."""
+    rng = np.random.default_rng(seed)
+    emb = rng.standard_normal((n, dim), dtype=np.float32)
+    n_dups = int(n * dup_rate)
+    if n_dups:
+        src = rng.integers(0, n, n_dups)
+        dst = rng.choice(n, n_dups, replace=False)
+        emb[dst] = emb[src] + 0.3 * rng.standard_normal((n_dups, dim), dtype=np.float32)
+    emb /= np.linalg.norm(emb, axis=1, keepdims=True)
+    return emb
+
+
+def legacy_groups(embeddings: np.ndarray, threshold: float) -> list[list[int]]:
+    """The original check_for_duplicates: full matrix, Python adjacency loop, BFS."""
+    sim_matrix = embeddings @ embeddings.T
+    n = len(embeddings)
+    adj = [[] for _ in range(n)]
+    for i in range(n):
+        for j in range(i + 1, n):
+            if float(sim_matrix[i, j]) >= threshold:
+                adj[i].append(j)
+                adj[j].append(i)
+    visited = [False] * n
+    groups = []
+    for i in range(n):
+        if visited[i] or not adj[i]:
+            continue
+        comp, q = [], deque([i])
+        visited[i] = True
+        while q:
+            u = q.popleft()
+            comp.append(u)
+            for v in adj[u]:
+                if not visited[v]:
+                    visited[v] = True
+                    q.append(v)
+        groups.append(sorted(comp))
+    return groups
+
+
+def measure(fn, *args) -> tuple[object, float, float]:
+    """Run fn, returning (result, seconds, peak MiB traced)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--threshold", type=float, default=0.6)
+    parser.add_argument("--legacy-max", type=int, default=5000)
+    parser.add_argument("--block-mib", type=int, default=MAX_BLOCK_BYTES // 2**20)
+    args = parser.parse_args()
+
+    print(f"{'n':>8} {'impl':>10} {'seconds':>9} {'peak MiB':>9} {'groups':>7}")
+    for n in args.sizes:
+        emb = synthetic_embeddings(n)
+        groups, secs, peak = measure(duplicate_groups, emb, args.threshold, args.block_mib * 2**20)
+        print(f"{n:>8} {'blocked':>10} {secs:>9.3f} {peak:>9.1f} {len(groups):>7}")
+
+        if n <= args.legacy_max:
+            legacy, secs, peak = measure(legacy_groups, emb, args.threshold)
+            print(f"{n:>8} {'legacy':>10} {secs:>9.3f} {peak:>9.1f} {len(legacy):>7}")
+            assert sorted(map(list, map(sorted, groups))) == sorted(legacy), "results differ"
+
+
+if __name__ == "__main__":
+    main()
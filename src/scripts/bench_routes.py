@@ -0,0 +1,485 @@
+"""
+Per-route latency (p50/p95/p99) and allocation benchmark for trivia_web.
+
+Drives every route through the Flask test client against a database built
+by generate_large_db.py (or a throwaway copy of the bundled one when no
+path is given) and saves the results as JSON, so runs from different
+commits can be compared:
+
+    python src/scripts/generate_large_db.py /tmp/large.db
+    python src/scripts/bench_routes.py /tmp/large.db --out before.json
+    python src/scripts/bench_routes.py /tmp/large.db --out after.json --compare before.json
+
+Write routes (update_progress, reset_progress) modify the database, so
+point it at a generated file, never at one holding real progress.
+
+Request metrics are off unless TRIVIA_METRICS=1 is set, as in production.
+Without it the metrics scenario only measures a 404. Results record
+which mode the run used, so compare runs made in the same mode.
+"""
+
+import argparse
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass
+import datetime
+import json
+from pathlib import Path
+import platform
+import random
+import re
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+# Ensure the project root (parent of 'src') is on sys.path
+project_root = Path(__file__).resolve().parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src import trivia_web  # noqa: E402
+from src.metrics import METRICS_ENABLED  # noqa: E402
+from src.sqlite_functions.connection import ConnectionPool  # noqa: E402
+from src.sqlite_functions.progress_writer import upsert_progress, utc_timestamp  # noqa: E402
+
+
+@dataclass
+class Sample:
+    """Ids, users and topics drawn from the database to build requests from."""
+
+    topics: list[str]
+    users: list[str]
+    heavy_user: str
+    qids: list[int]
+    max_qid: int
+    answers: dict[int, str]
+    words: list[str]
+
+
+@dataclass
+class Scenario:
+    """
+    One benchmarked request shape.
+
+    Args:
+        name (str): label in the results
+        endpoint (str): Flask endpoint it exercises
+        request (Callable): rng -> (method, url, json body or None)
+        setup (Callable | None): rng -> None, run untimed before each request
+        max_requests (int | None): cap for very heavy requests (full catalog streams)
+    """
+
+    name: str
+    endpoint: str
+    request: Callable[[random.Random], tuple[str, str, dict | None]]
+    setup: Callable[[random.Random], None] | None = None
+    max_requests: int | None = None
+
+
+def load_sample(db_path: Path, n_users: int = 1000, n_qids: int = 5000) -> Sample:
+    with sqlite3.connect(db_path) as conn:
+        topics = [
+            r[0] for r in conn.execute("SELECT DISTINCT topic FROM questions ORDER BY topic;")
+        ]
+        users = [
+            r[0]
+            for r in conn.execute(
+                "SELECT user_name FROM progress_summary GROUP BY user_name ORDER BY random() LIMIT ?;",
+                (n_users,),
+            )
+        ]
+        heavy = conn.execute(
+            """
+            SELECT user_name FROM progress_summary
+            GROUP BY user_name ORDER BY SUM(total_count) DESC LIMIT 1;
+            """
+        ).fetchone()
+        rows = conn.execute(
+            "SELECT id, answer FROM questions ORDER BY random() LIMIT ?;", (n_qids,)
+        ).fetchall()
+        max_qid = conn.execute("SELECT MAX(id) FROM questions;").fetchone()[0] or 0
+
+    words = sorted({w for _, answer in rows for w in re.findall(r"[A-Za-z]{4,}", answer or "")})
+    users = users or ["bench-user"]
+    return Sample(
+        topics=topics,
+        users=users,
+        heavy_user=heavy[0] if heavy else users[0],
+        qids=[r[0] for r in rows],
+        max_qid=max_qid,
+        answers={r[0]: r[1] or "" for r in rows},
+        words=words or ["the"],
+    )
+
+
+def seed_user(user: str, qids: list[int]) -> None:
+    """Give a throwaway user some progress so the reset routes have rows to delete."""
+    conn = trivia_web.get_db()
+    ts = utc_timestamp()
+    upsert_progress(conn, ((user, qid, "wrong", ts) for qid in qids))
+    conn.close()
+
+
+def scenarios(s: Sample, stream_requests: int) -> list[Scenario]:
+    def topic(rng):
+        return rng.choice(s.topics)
+
+    def user(rng):
+        return rng.choice(s.users)
+
+    return [
+        Scenario("index", "index", lambda rng: ("GET", "/", None)),
+        Scenario(
+            "enter_name",
+            "enter_name",
+            lambda rng: ("GET", f"/study/{topic(rng)}/enter/", None),
+        ),
+        Scenario(
+            "study_all",
+            "study",
+            lambda rng: ("GET", f"/study/{topic(rng)}/?user={user(rng)}", None),
+        ),
+        Scenario(
+            "study_missed",
+            "study",
+            lambda rng: ("GET", f"/study/{topic(rng)}/?user={user(rng)}&mode=missed", None),
+        ),
+        Scenario("stats", "stats", lambda rng: ("GET", f"/stats/{user(rng)}/", None)),
+        Scenario("stats_heavy_user", "stats", lambda rng: ("GET", f"/stats/{s.heavy_user}/", None)),
+        Scenario(
+            "api_stats_questions",
+            "api_stats_questions",
+            lambda rng: (
+                "GET",
+                f"/api/stats/{s.heavy_user}/questions/"
+                f"?topic={topic(rng)}&status={rng.choice(['correct', 'wrong'])}&limit=50",
+                None,
+            ),
+        ),
+        Scenario("user_home", "user_home", lambda rng: ("GET", f"/user/{user(rng)}/", None)),
+        Scenario(
+            "reset_progress_user",
+            "reset_progress_user",
+            lambda rng: ("POST", "/reset_progress/bench-reset/", None),
+            setup=lambda rng: seed_user("bench-reset", rng.sample(s.qids, min(50, len(s.qids)))),
+        ),
+        Scenario(
+            "reset_topic_progress",
+            "reset_topic_progress",
+            lambda rng: ("POST", f"/reset_progress/bench-reset/{topic(rng)}/", None),
+            setup=lambda rng: seed_user("bench-reset", rng.sample(s.qids, min(50, len(s.qids)))),
+        ),
+        Scenario(
+            "update_progress",
+            "update_progress",
+            lambda rng: (
+                "POST",
+                "/update_progress/",
+                {
+                    "user_name": user(rng),
+                    "question_id": rng.choice(s.qids),
+                    "status": rng.choice(["correct", "wrong"]),
+                },
+            ),
+        ),
+        Scenario(
+            "update_progress_batch",
+            "update_progress_batch",
+            lambda rng: (
+                "POST",
+                "/update_progress/batch/",
+                {
+                    "user_name": user(rng),
+                    "updates": [
+                        {"question_id": qid, "status": rng.choice(["correct", "wrong"])}
+                        for qid in rng.sample(s.qids, min(100, len(s.qids)))
+                    ],
+                },
+            ),
+        ),
+        Scenario(
+            "api_questions_page",
+            "api_get_questions",
+            lambda rng: (
+                "GET",
+                f"/api/questions/?after_id={rng.randrange(max(s.max_qid, 1))}&limit=100",
+                None,
+            ),
+        ),
+        Scenario(
+            "api_questions_stream",
+            "api_get_questions",
+            lambda rng: ("GET", "/api/questions/?format=ndjson", None),
+            max_requests=stream_requests,
+        ),
+        Scenario(
+            "api_next",
+            "api_next_cards",
+            lambda rng: ("GET", f"/api/next/{topic(rng)}/{user(rng)}/?n=20", None),
+        ),
+        Scenario(
+            "api_check_answer",
+            "api_check_answer",
+            lambda rng: (
+                "POST",
+                f"/api/check_answer/{(qid := rng.choice(s.qids))}/",
+                {"answer": s.answers[qid]},
+            ),
+        ),
+        Scenario(
+            "api_check_answers",
+            "api_check_answers",
+            lambda rng: (
+                "POST",
+                "/api/check_answers/",
+                {
+                    "answers": [
+                        {"question_id": qid, "answer": s.answers[qid]}
+                        for qid in rng.sample(s.qids, min(50, len(s.qids)))
+                    ]
+                },
+            ),
+        ),
+        Scenario(
+            "api_search",
+            "api_search",
+            lambda rng: ("GET", f"/api/search/?q={rng.choice(s.words)}&limit=20", None),
+        ),
+        Scenario(
+            # search-as-you-type after two or three keystrokes
+            "api_search_prefix",
+            "api_search",
+            lambda rng: (
+                "GET",
+                f"/api/search/?q={rng.choice(s.words)[: rng.choice([2, 3])]}&limit=20",
+                None,
+            ),
+        ),
+        Scenario("api_topics", "api_get_topics", lambda rng: ("GET", "/api/topics/", None)),
+        Scenario(
+            "api_questions_by_topic",
+            "api_get_questions_by_topic",
+            lambda rng: ("GET", f"/api/questions/{topic(rng)}/", None),
+        ),
+        Scenario("admin_overview", "admin_overview", lambda rng: ("GET", "/admin/overview/", None)),
+        Scenario("metrics", "metrics_endpoint", lambda rng: ("GET", "/metrics", None)),
+        Scenario("health_ready", "health_ready", lambda rng: ("GET", "/health/ready/", None)),
+    ]
+
+
+def _call(client, method: str, url: str, body: dict | None) -> tuple[int, int]:
+    resp = client.open(url, method=method, json=body)
+    # read the whole body so streamed responses are fully generated
+    size = len(resp.get_data())
+    resp.close()
+    return resp.status_code, size
+
+
+def run_scenario(
+    client, scenario: Scenario, n: int, warmup: int, alloc_requests: int, seed: int
+) -> dict:
+    """Time `n` requests (after `warmup` untimed ones), then trace allocations on a few more."""
+    rng = random.Random(f"{seed}-{scenario.name}")
+    if scenario.max_requests is not None:
+        n = min(n, scenario.max_requests)
+        warmup = min(warmup, 1)
+        alloc_requests = min(alloc_requests, 1)
+
+    for _ in range(warmup):
+        if scenario.setup:
+            scenario.setup(rng)
+        _call(client, *scenario.request(rng))
+
+    latencies = []
+    statuses = Counter()
+    sizes = []
+    for _ in range(n):
+        if scenario.setup:
+            scenario.setup(rng)
+        method, url, body = scenario.request(rng)
+        start = time.perf_counter_ns()
+        status, size = _call(client, method, url, body)
+        latencies.append((time.perf_counter_ns() - start) / 1e6)
+        statuses[status] += 1
+        sizes.append(size)
+
+    # tracemalloc slows everything down, so allocations get their own pass
+    peaks = []
+    retained = []
+    tracemalloc.start()
+    for _ in range(alloc_requests):
+        if scenario.setup:
+            scenario.setup(rng)
+        method, url, body = scenario.request(rng)
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        _call(client, method, url, body)
+        current, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - before)
+        retained.append(current - before)
+    tracemalloc.stop()
+
+    ms = np.array(latencies)
+    return {
+        "endpoint": scenario.endpoint,
+        "requests": n,
+        "status": {str(code): count for code, count in sorted(statuses.items())},
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+        "mean_response_bytes": float(np.mean(sizes)),
+        "alloc_peak_kib_p50": float(np.median(peaks)) / 1024 if peaks else None,
+        "alloc_peak_kib_max": max(peaks) / 1024 if peaks else None,
+        "alloc_retained_kib_p50": float(np.median(retained)) / 1024 if retained else None,
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        out = subprocess.run(  # noqa: S603
+            ["git", "rev-parse", "--short", "HEAD"],  # noqa: S607
+            cwd=project_root,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def db_stats(db_path: Path) -> dict:
+    with sqlite3.connect(db_path) as conn:
+        return {
+            "questions": conn.execute("SELECT COUNT(*) FROM questions;").fetchone()[0],
+            "topics": conn.execute("SELECT COUNT(DISTINCT topic) FROM questions;").fetchone()[0],
+            "users": conn.execute(
+                "SELECT COUNT(DISTINCT user_name) FROM progress_summary;"
+            ).fetchone()[0],
+            "progress": conn.execute("SELECT COUNT(*) FROM progress;").fetchone()[0],
+            "file_mib": db_path.stat().st_size / 2**20,
+        }
+
+
+def compare(current: dict, previous: dict, threshold: float) -> list[str]:
+    """Print per-route p50/p95/p99 deltas; return the routes that got slower than `threshold`."""
+    regressions = []
+    print(f"\n{'route':<24} {'p50':>16} {'p95':>16} {'p99':>16}")
+    for name, now in current["routes"].items():
+        before = previous.get("routes", {}).get(name)
+        if before is None:
+            print(f"{name:<24} {'(new)':>16}")
+            continue
+        cells = []
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            delta = (now[key] - before[key]) / before[key] if before[key] else 0.0
+            cells.append(f"{now[key]:7.2f} {delta:+7.0%}")
+            if key != "p99_ms" and delta > threshold:
+                regressions.append(name)
+        print(f"{name:<24} " + " ".join(f"{c:>16}" for c in cells))
+    regressions = sorted(set(regressions))
+    if regressions:
+        print(f"\n⚠️ Slower than +{threshold:.0%} (p50/p95): {', '.join(regressions)}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "db_path",
+        type=Path,
+        nargs="?",
+        help="database to benchmark (default: a temporary copy of the bundled one)",
+    )
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per route")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--alloc-requests", type=int, default=20, help="requests traced per route")
+    parser.add_argument(
+        "--stream-requests", type=int, default=5, help="cap for full-catalog streams"
+    )
+    parser.add_argument("--routes", help="regex; only run scenarios whose name matches")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", type=Path, help="write results JSON here")
+    parser.add_argument("--compare", type=Path, help="previous results JSON to diff against")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="regression threshold (0.2 = +20%%)"
+    )
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = args.db_path
+        if db_path is None:
+            db_path = Path(tmp) / "database.db"
+            shutil.copy(trivia_web.DEFAULT_DB_PATH, db_path)
+        elif db_path.resolve() == trivia_web.DEFAULT_DB_PATH.resolve():
+            raise SystemExit("Refusing to write benchmark progress into the bundled database.")
+
+        trivia_web.db_pool.close_all()
+        trivia_web.db_pool = ConnectionPool(db_path)
+        trivia_web.create_app()
+        client = trivia_web.app.test_client()
+
+        sample = load_sample(db_path)
+        todo = scenarios(sample, args.stream_requests)
+        missing = (
+            {rule.endpoint for rule in trivia_web.app.url_map.iter_rules()}
+            - {sc.endpoint for sc in todo}
+            - {"static"}
+        )
+        if missing:
+            print(f"⚠️ Routes without a scenario: {', '.join(sorted(missing))}", file=sys.stderr)
+        if args.routes:
+            todo = [sc for sc in todo if re.search(args.routes, sc.name)]
+
+        results = {
+            "meta": {
+                "commit": git_commit(),
+                "timestamp": datetime.datetime.now(datetime.UTC).isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "sqlite": sqlite3.sqlite_version,
+                "metrics": METRICS_ENABLED,
+                "db": db_stats(db_path),
+                "args": {
+                    "requests": args.requests,
+                    "warmup": args.warmup,
+                    "alloc_requests": args.alloc_requests,
+                    "seed": args.seed,
+                },
+            },
+            "routes": {},
+        }
+
+        print(f"{'route':<24} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'peak KiB':>9}")
+        for sc in todo:
+            r = run_scenario(client, sc, args.requests, args.warmup, args.alloc_requests, args.seed)
+            results["routes"][sc.name] = r
+            errors = sum(v for k, v in r["status"].items() if k.startswith("5"))
+            peak = r["alloc_peak_kib_p50"]
+            print(
+                f"{sc.name:<24} {r['requests']:>5} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} "
+                f"{r['p99_ms']:>9.2f} {peak if peak is not None else float('nan'):>9.0f}"
+                + (f"  ⚠️ {errors} 5xx" if errors else "")
+            )
+        trivia_web.db_pool.close_all()
+
+    if args.out:
+        args.out.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\n✅ Results saved to {args.out}")
+
+    if args.compare:
+        regressions = compare(results, json.loads(args.compare.read_text()), args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
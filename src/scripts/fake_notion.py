@@ -0,0 +1,141 @@
+"""
+In-memory stand-in for notion_client.Client, for offline sync benchmarks.
+
+Implements just the calls notion_sync.py makes (databases.retrieve,
+data_sources.query with cursor pagination, pages.update). It also simulates
+per-request latency and Notion's rate limit: requests over the budget
+fail with a 429 carrying a Retry-After header, like the real API.
+"""
+
+import math
+import threading
+import time
+
+
+class FakeRateLimited(Exception):
+    """Shaped like notion_client.APIResponseError for a 429."""
+
+    def __init__(self, retry_after: float):
+        super().__init__("rate_limited")
+        self.status = 429
+        self.code = "rate_limited"
+        self.headers = {"retry-after": f"{math.ceil(retry_after * 1000) / 1000:.3f}"}
+
+
+def make_page(i: int, topic: str = "Fake Topic", synced: bool = False) -> dict:
+    return {
+        "id": f"page-{i}",
+        "last_edited_time": f"2025-01-01T{i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}.000Z",
+        "archived": False,
+        "properties": {
+            "Question": {"title": [{"text": {"content": f"Fake question {i}?"}}]},
+            "Answer": {"rich_text": [{"text": {"content": f"Answer {i}"}}]},
+            "Topic": {"select": {"name": topic}},
+            "Synced": {"checkbox": synced},
+        },
+    }
+
+
+class FakeNotionClient:
+    """
+    Args:
+        pages (list[dict]): pages in the data source, see make_page()
+        latency (float): seconds each request takes
+        rate (float): sustained requests/sec before 429s (Notion allows ~3)
+        burst (int): requests allowed back to back
+    """
+
+    def __init__(
+        self, pages: list[dict], latency: float = 0.05, rate: float = 3.0, burst: int = 10
+    ):
+        self.store = {page["id"]: page for page in pages}
+        self.latency = latency
+        self.rate = rate
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self.calls = 0
+        self.rate_limited = 0
+        self.databases = _Databases()
+        self.data_sources = _DataSources(self)
+        self.pages = _Pages(self)
+
+    def _request(self) -> None:
+        """Token-bucket rate limit, then simulated network latency."""
+        with self._lock:
+            self.calls += 1
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+            self._refilled = now
+            if self._tokens < 1:
+                self.rate_limited += 1
+                raise FakeRateLimited((1 - self._tokens) / self.rate)
+            self._tokens -= 1
+        time.sleep(self.latency)
+
+
+class _Databases:
+    def retrieve(self, database_id: str) -> dict:
+        return {"id": database_id, "data_sources": [{"id": "fake-data-source"}]}
+
+
+def _matches(page: dict, flt: dict | None) -> bool:
+    if not flt:
+        return True
+    if "and" in flt:
+        return all(_matches(page, f) for f in flt["and"])
+    if flt.get("timestamp") == "last_edited_time":
+        cond = flt["last_edited_time"]
+        if "on_or_after" in cond:
+            return page["last_edited_time"] >= cond["on_or_after"]
+        if "after" in cond:
+            return page["last_edited_time"] > cond["after"]
+        return True
+    prop = page["properties"].get(flt["property"], {})
+    return prop.get("checkbox") == flt["checkbox"]["equals"]
+
+
+class _DataSources:
+    def __init__(self, client: FakeNotionClient):
+        self.client = client
+
+    def query(
+        self,
+        data_source_id: str,
+        filter: dict | None = None,
+        sorts: list | None = None,
+        start_cursor: str | None = None,
+        page_size: int = 100,
+    ) -> dict:
+        self.client._request()
+        with self.client._lock:
+            pages = [
+                p for p in self.client.store.values() if not p["archived"] and _matches(p, filter)
+            ]
+        if sorts:
+            pages.sort(key=lambda p: p["last_edited_time"])
+        start = int(start_cursor or 0)
+        chunk = pages[start : start + min(page_size, 100)]
+        has_more = start + len(chunk) < len(pages)
+        return {
+            "object": "list",
+            "results": chunk,
+            "has_more": has_more,
+            "next_cursor": str(start + len(chunk)) if has_more else None,
+        }
+
+
+class _Pages:
+    def __init__(self, client: FakeNotionClient):
+        self.client = client
+
+    def update(self, page_id: str, properties: dict | None = None, archived=None) -> dict:
+        self.client._request()
+        with self.client._lock:
+            page = self.client.store[page_id]
+            for name, value in (properties or {}).items():
+                page["properties"][name] = value
+            if archived is not None:
+                page["archived"] = archived
+            return page
@@ -0,0 +1,245 @@
+"""
+Build a synthetic, realistically shaped trivia database for scale testing.
+
+Questions are spread over topics with Zipf-like sizes; users answer a
+long-tailed number of questions drawn from a few favourite topics, so a
+handful of heavy users sit next to many light ones:
+
+    python src/scripts/generate_large_db.py /tmp/large.db
+    python src/scripts/generate_large_db.py /tmp/small.db --questions 20000 \\
+        --users 500 --progress 200000
+
+Rows are bulk-loaded with triggers and indexes absent, then init_db() runs
+against the file so every index, summary table, trigger and the FTS index
+is built the same way production builds them.
+"""
+
+import argparse
+from collections.abc import Iterator
+from pathlib import Path
+import sqlite3
+import sys
+import time
+
+import numpy as np
+
+# Ensure the project root (parent of 'src') is on sys.path
+project_root = Path(__file__).resolve().parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src import trivia_web  # noqa: E402
+from src.sqlite_functions.connection import ConnectionPool  # noqa: E402
+
+INSERT_BATCH_ROWS = 50_000
+
+# same DDL as the bundled database / init_db()
+QUESTIONS_DDL = """
+CREATE TABLE questions (
+    id INTEGER PRIMARY KEY,
+    topic TEXT,
+    question TEXT,
+    answer TEXT,
+    likelihood INTEGER DEFAULT 3
+);
+"""
+
+PROGRESS_DDL = """
+CREATE TABLE progress (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_name VARCHAR(100) NOT NULL,
+    question_id INTEGER NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'unanswered',
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (question_id) REFERENCES questions(id) ON DELETE CASCADE
+);
+"""
+
+SUBJECTS = (
+    "captain", "planet", "ship", "droid", "senator", "wizard", "castle", "river",
+    "king", "queen", "dragon", "village", "episode", "season", "battle", "treaty",
+    "song", "album", "painter", "novel", "scientist", "element", "volcano", "island",
+)  # fmt: skip
+VERBS = (
+    "destroyed", "founded", "discovered", "betrayed", "rescued", "named", "ruled",
+    "invented", "painted", "wrote", "won", "lost", "built", "crossed", "defended",
+)  # fmt: skip
+TEMPLATES = (
+    "Who {verb} the {subject} in the {ordinal} {unit}?",
+    "What was the name of the {subject} that {verb} the {other}?",
+    "In which {unit} was the {subject} first {verb}?",
+    "Which {subject} {verb} the {other} after the {ordinal} {unit}?",
+    "How many {other}s were {verb} by the {subject}?",
+)
+ORDINALS = ("first", "second", "third", "final", "last", "opening", "fourth", "fifth")
+UNITS = ("episode", "season", "chapter", "book", "act", "film", "war", "era")
+ANSWER_WORDS = (
+    "Anakin", "Ahsoka", "Mandalore", "Tatooine", "Gandalf", "Rohan", "Mercury",
+    "Avalon", "Picasso", "Curie", "Everest", "Atlantis", "Orion", "Hydra", "Phoenix",
+    "Nova", "Cobalt", "Saturn", "Vesper", "Lyra", "Draco", "Titan", "Echo", "Kestrel",
+)  # fmt: skip
+STATUSES = np.array(["correct", "wrong", "unanswered"])
+
+
+def topic_sizes(n_questions: int, n_topics: int) -> np.ndarray:
+    """Zipf-like topic sizes (a few big topics, a long tail) summing to n_questions."""
+    weights = 1.0 / np.arange(1, n_topics + 1) ** 0.8
+    sizes = np.maximum(1, np.floor(weights / weights.sum() * n_questions)).astype(np.int64)
+    sizes[0] += n_questions - sizes.sum()
+    return sizes
+
+
+def generate_questions(
+    rng: np.random.Generator, sizes: np.ndarray
+) -> Iterator[tuple[int, str, str, str, int]]:
+    """(id, topic, question, answer, likelihood) rows, each topic a contiguous id range."""
+    qid = 0
+    for t, size in enumerate(sizes):
+        topic = f"Topic {t + 1:04d}"
+        template = rng.integers(len(TEMPLATES), size=size)
+        picks = rng.integers(1 << 16, size=(size, 6))
+        likelihood = rng.choice(5, size=size, p=[0.1, 0.2, 0.4, 0.2, 0.1]) + 1
+        for i in range(size):
+            qid += 1
+            p = picks[i]
+            question = TEMPLATES[template[i]].format(
+                subject=SUBJECTS[p[0] % len(SUBJECTS)],
+                other=SUBJECTS[p[1] % len(SUBJECTS)],
+                verb=VERBS[p[2] % len(VERBS)],
+                ordinal=ORDINALS[p[3] % len(ORDINALS)],
+                unit=UNITS[p[4] % len(UNITS)],
+            )
+            # the id keeps (topic, question) unique, as the natural-key index requires
+            question = f"{question[:-1]} (#{qid})?"
+            words = 1 + p[5] % 3
+            answer = " ".join(
+                ANSWER_WORDS[(p[5] >> (4 * k)) % len(ANSWER_WORDS)] for k in range(words)
+            )
+            yield qid, topic, question, answer, int(likelihood[i])
+
+
+def generate_progress(
+    rng: np.random.Generator, sizes: np.ndarray, n_users: int, n_rows: int
+) -> Iterator[tuple[str, int, str, str]]:
+    """
+    (user_name, question_id, status, updated_at) rows, unique per (user, question).
+
+    Per-user row counts are lognormal (heavy users dominate), each user
+    studies 1-5 topics picked by popularity, and timestamps fall within
+    the last 180 days.
+    """
+    starts = np.concatenate(([1], 1 + np.cumsum(sizes)[:-1]))
+    popularity = sizes / sizes.sum()
+    counts = rng.lognormal(mean=0.0, sigma=1.2, size=n_users)
+    counts = np.maximum(1, np.round(counts / counts.sum() * n_rows)).astype(np.int64)
+    now = int(time.time())
+
+    for u in range(n_users):
+        user = f"user-{u:06d}"
+        n_topics = min(len(sizes), int(rng.integers(1, 6)))
+        topics = rng.choice(len(sizes), size=n_topics, replace=False, p=popularity)
+        pool = np.concatenate([np.arange(starts[t], starts[t] + sizes[t]) for t in topics])
+        n = min(int(counts[u]), len(pool))
+        qids = rng.choice(pool, size=n, replace=False)
+        status = STATUSES[rng.choice(3, size=n, p=[0.6, 0.3, 0.1])]
+        stamps = now - rng.integers(0, 180 * 86400, size=n)
+        for qid, st, ts in zip(qids.tolist(), status.tolist(), stamps.tolist(), strict=True):
+            yield user, qid, st, time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(ts))
+
+
+def bulk_insert(conn: sqlite3.Connection, sql: str, rows: Iterator[tuple], label: str) -> int:
+    start = time.perf_counter()
+    total = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= INSERT_BATCH_ROWS:
+            conn.executemany(sql, batch)
+            total += len(batch)
+            batch.clear()
+            rate = total / (time.perf_counter() - start)
+            print(f"\r  {label}: {total:,} rows ({rate:,.0f} rows/s)", end="", file=sys.stderr)
+    if batch:
+        conn.executemany(sql, batch)
+        total += len(batch)
+    conn.commit()
+    print(f"\r  {label}: {total:,} rows in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return total
+
+
+def generate(
+    db_path: Path, n_questions: int, n_topics: int, n_users: int, n_progress: int, seed: int
+) -> dict:
+    """Write a fresh database at `db_path` and return row counts."""
+    rng = np.random.default_rng(seed)
+    sizes = topic_sizes(n_questions, min(n_topics, n_questions))
+
+    conn = sqlite3.connect(db_path)
+    # throwaway file: no journal, no fsync while loading
+    conn.execute("PRAGMA journal_mode = OFF;")
+    conn.execute("PRAGMA synchronous = OFF;")
+    conn.execute("PRAGMA cache_size = -262144;")
+    conn.executescript(QUESTIONS_DDL + PROGRESS_DDL)
+
+    bulk_insert(
+        conn,
+        "INSERT INTO questions (id, topic, question, answer, likelihood) VALUES (?, ?, ?, ?, ?);",
+        generate_questions(rng, sizes),
+        "questions",
+    )
+    progress_rows = bulk_insert(
+        conn,
+        "INSERT INTO progress (user_name, question_id, status, updated_at) VALUES (?, ?, ?, ?);",
+        generate_progress(rng, sizes, n_users, n_progress),
+        "progress",
+    )
+    conn.close()
+
+    # indexes, triggers, progress_summary and the FTS index, built the production way
+    start = time.perf_counter()
+    trivia_web.db_pool.close_all()
+    trivia_web.db_pool = ConnectionPool(db_path)
+    trivia_web.init_db()
+    trivia_web.db_pool.close_all()
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("ANALYZE;")
+    print(f"  init_db + ANALYZE: {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    return {
+        "questions": n_questions,
+        "topics": len(sizes),
+        "users": n_users,
+        "progress": progress_rows,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("db_path", type=Path, help="output file (must not exist unless --force)")
+    parser.add_argument("--questions", type=int, default=500_000)
+    parser.add_argument("--topics", type=int, default=200)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--progress", type=int, default=20_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--force", action="store_true", help="overwrite an existing file")
+    args = parser.parse_args()
+
+    if args.db_path.resolve() == trivia_web.DEFAULT_DB_PATH.resolve():
+        raise SystemExit("Refusing to overwrite the bundled database.")
+    if args.db_path.exists():
+        if not args.force:
+            raise SystemExit(f"{args.db_path} exists; pass --force to overwrite it.")
+        for suffix in ("", "-wal", "-shm"):
+            Path(f"{args.db_path}{suffix}").unlink(missing_ok=True)
+
+    counts = generate(
+        args.db_path, args.questions, args.topics, args.users, args.progress, args.seed
+    )
+    print(
+        f"✅ {args.db_path}: {counts['questions']:,} questions in {counts['topics']} topics, "
+        f"{counts['users']:,} users, {counts['progress']:,} progress rows"
+    )
+
+
+if __name__ == "__main__":
+    main()
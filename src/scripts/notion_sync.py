@@ -1,20 +1,35 @@
+import argparse
 from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+import functools
 import os
 
 # src/scripts/sync.py
 from pathlib import Path
+import random
+import sqlite3
 import sys
+import threading
+import time
 
 from dotenv import load_dotenv
-from notion_client import Client
 
 # Ensure the project root (parent of 'src') is on sys.path
 project_root = Path(__file__).resolve().parent.parent.parent  # up from src/scripts to project root
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
-from src.sqlite_functions.basic_functions import insert_question  # noqa: E402
+from src.sqlite_functions.basic_functions import DB_PATH, insert_questions  # noqa: E402
+from src.sqlite_functions.sync_state import (  # noqa: E402
+    create_sync_state,
+    get_watermark,
+    processed_pages,
+    record_archived,
+    record_synced,
+    unarchived_pages,
+)
 
 
 @dataclass
@@ -22,136 +37,253 @@ class QA:
     topic: str
     question: str
     answer: str
+    page_id: str | None = None
+    last_edited_time: str | None = None
+
 
 load_dotenv()
 
-notion = Client(auth=os.getenv("NOTION_TOKEN"))
 db_id = os.getenv("NOTION_DATABASE_ID")
 
-# Base data directory
-DB_PATH = Path(__file__).parent.parent / "data" / "database.db"
+# Concurrent pages.update calls; Notion allows ~3 requests/sec per integration
+UPDATE_WORKERS = int(os.getenv("TRIVIA_NOTION_WORKERS", "3"))
+
+# Retries per request on 429 / 5xx before giving up
+MAX_RETRIES = int(os.getenv("TRIVIA_NOTION_MAX_RETRIES", "8"))
+
+UNSYNCED = {"property": "Synced", "checkbox": {"equals": False}}
+
 
-def get_data_source_id() -> str:
-    db = notion.databases.retrieve(database_id=db_id)
+@functools.cache
+def get_client():
+    """The Notion client, created on first use so importing this module is offline."""
+    from notion_client import Client
+
+    return Client(auth=os.getenv("NOTION_TOKEN"))
+
+
+@functools.cache
+def get_data_source_id(client=None) -> str:
+    db = (client or get_client()).databases.retrieve(database_id=db_id)
     data_sources = db.get("data_sources", [])
     if not data_sources:
         raise RuntimeError("No data sources found in the Notion database.")
     return data_sources[0]["id"]
 
-DATA_SOURCE_ID = get_data_source_id()
 
-def fetch_new_questions() -> deque:
-    new_questions_per_folder = deque()
-    query_results = notion.data_sources.query(
-        data_source_id=DATA_SOURCE_ID,
-        filter={
-            "property": "Synced",
-            "checkbox": {
-                "equals": False
-            }
-        }
-    )
+def _retry_delay(error: Exception, attempt: int) -> float | None:
+    """
+    Seconds to wait before retrying `error`, or None if it isn't retryable.
+
+    Honours Retry-After on 429s; otherwise (and for 5xx / timeouts)
+    exponential backoff with jitter.
+    """
+    status = getattr(error, "status", None)
+    timed_out = type(error).__name__ == "RequestTimeoutError"
+    if status != 429 and not (isinstance(status, int) and status >= 500) and not timed_out:
+        return None
+    headers = getattr(error, "headers", None) or {}
+    retry_after = headers.get("retry-after") or headers.get("Retry-After")
+    if retry_after is not None:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return min(30.0, 0.5 * 2**attempt) * (0.5 + random.random() / 2)  # noqa: S311
+
+
+class _RateGate:
+    """
+    Shared pause for all worker threads.
+
+    A 429 on one thread means the whole integration is over budget, so
+    every thread waits out the Retry-After instead of each one hammering
+    the API until it gets its own 429.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._resume_at = 0.0
+
+    def wait(self) -> None:
+        while True:
+            with self._lock:
+                delay = self._resume_at - time.monotonic()
+            if delay <= 0:
+                return
+            time.sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+
+_gate = _RateGate()
+
+
+def with_backoff(fn: Callable, *args, **kwargs):
+    """Call a Notion API method, sleeping and retrying on rate limits."""
+    for attempt in range(MAX_RETRIES + 1):
+        _gate.wait()
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            delay = _retry_delay(e, attempt)
+            if delay is None or attempt == MAX_RETRIES:
+                raise
+            _gate.pause(delay)
+            # spread the retries out so waiting threads don't all fire at once
+            time.sleep(random.uniform(0, min(5.0, 0.1 * 2**attempt)))  # noqa: S311
+
+
+def query_all(filter: dict, client=None, sorts: list | None = None) -> Iterator[dict]:
+    """Every page matching `filter`, following next_cursor across result pages."""
+    client = client or get_client()
+    data_source_id = get_data_source_id(client)
+    cursor = None
+    while True:
+        params = {"data_source_id": data_source_id, "filter": filter, "page_size": 100}
+        if sorts:
+            params["sorts"] = sorts
+        if cursor:
+            params["start_cursor"] = cursor
+        response = with_backoff(client.data_sources.query, **params)
+        yield from response.get("results", [])
+        if not response.get("has_more"):
+            return
+        cursor = response.get("next_cursor")
+
+
+def update_pages(page_ids: list[str], client=None, workers: int | None = None, **update) -> int:
+    """
+    pages.update(page_id=..., **update) for every id on a bounded thread pool.
+
+    Returns:
+        number of pages updated
+    """
+    client = client or get_client()
+    if not page_ids:
+        return 0
+
+    def update_one(page_id):
+        with_backoff(client.pages.update, page_id=page_id, **update)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers or UPDATE_WORKERS)) as pool:
+        for _ in pool.map(update_one, page_ids):
+            pass
+    return len(page_ids)
+
+
+def parse_page(page) -> QA | None:
+    props = page["properties"]
 
-    results = query_results.get("results", [])
+    # Extract question
+    question_prop = props.get("Question", {})
+    if not question_prop.get("title") or len(question_prop["title"]) == 0:
+        print("Skipping page with no Question title.")
+        return None
+    question = question_prop["title"][0]["text"]["content"].strip()
 
-    for page in results:
-        props = page["properties"]
+    # Extract answer
+    answer_prop = props.get("Answer", {})
+    if not answer_prop.get("rich_text") or len(answer_prop["rich_text"]) == 0:
+        print("Skipping page with no Answer.")
+        return None
+    answer = answer_prop["rich_text"][0]["text"]["content"].strip()
 
-        # Extract question
-        question_prop = props.get("Question", {})
-        if not question_prop.get("title") or len(question_prop["title"]) == 0:
-            print("Skipping page with no Question title.")
-            continue
-        question = question_prop["title"][0]["text"]["content"].strip()
+    # Get folder/category for this question
+    topic = get_folder_from_page(page)
 
-        # Extract answer
-        answer_prop = props.get("Answer", {})
-        if not answer_prop.get("rich_text") or len(answer_prop["rich_text"]) == 0:
-            print("Skipping page with no Answer.")
-            continue
-        answer = answer_prop["rich_text"][0]["text"]["content"].strip()
+    return QA(topic, question, answer, page["id"], page.get("last_edited_time"))
 
-        # Get folder/category for this question
-        topic = get_folder_from_page(page)
 
-        data = QA(topic, question, answer)
+def fetch_new_questions(client=None, since: str | None = None) -> deque:
+    """
+    Unsynced pages as QA items. Pages are not marked Synced here, see mark_synced().
+
+    Args:
+        since (str | None): only pages edited on or after this ISO timestamp
+            (the sync watermark), oldest first
+    """
+    new_questions_per_folder = deque()
+
+    flt, sorts = UNSYNCED, None
+    if since:
+        edited = {"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": since}}
+        flt = {"and": [UNSYNCED, edited]}
+        sorts = [{"timestamp": "last_edited_time", "direction": "ascending"}]
+
+    for page in query_all(flt, client, sorts):
+        data = parse_page(page)
+        if data is None:
+            continue
 
         # Add to folder bucket
         new_questions_per_folder.append(data)
 
-
-        # Mark page as synced
-        notion.pages.update(
-            page_id=page["id"],
-            properties={
-                "Synced": {"checkbox": True}
-            }
-        )
     return new_questions_per_folder
 
+
+def mark_synced(items, client=None) -> int:
+    """Tick Synced on the pages behind `items`; call only once they are committed."""
+    page_ids = [item.page_id for item in items if item.page_id]
+    return update_pages(page_ids, client, properties={"Synced": {"checkbox": True}})
+
+
 def get_folder_from_page(page) -> str:
     props = page["properties"]
     folder_prop = props.get("Topic", {})
 
     return folder_prop["select"]["name"]
 
-def check_all_synced() -> None:
-    query_results = notion.data_sources.query(
-        data_source_id=DATA_SOURCE_ID,
-        filter={
-            "property": "Synced",
-            "checkbox": {
-                "equals": False
-            }
-        }
-    )
 
-    return False if query_results else True
-
-def archive_pages() -> None:
-    query_results = notion.data_sources.query(
-        data_source_id=DATA_SOURCE_ID,
-        filter={
-            "property": "Synced",
-            "checkbox": {
-                "equals": True
-            }
-        }
-    )
+def archive_recorded(conn: sqlite3.Connection, client=None) -> int:
+    """Archive every page the sync state knows is done, without querying Notion."""
+    data_source_id = get_data_source_id(client or get_client())
+    page_ids = unarchived_pages(conn, data_source_id)
+    archived = update_pages(page_ids, client, archived=True)
+    record_archived(conn, page_ids)
+    return archived
 
-    results = query_results.get("results", [])
 
-    for page in results:
-        notion.pages.update(
-            page_id=page["id"],
-            archived=True
-        )
+def main():
+    parser = argparse.ArgumentParser(description="Sync new questions from Notion.")
+    parser.add_argument(
+        "--full", action="store_true", help="ignore the watermark and rescan every unsynced page"
+    )
+    args = parser.parse_args()
 
+    client = get_client()
+    data_source_id = get_data_source_id(client)
+    conn = sqlite3.connect(DB_PATH)
+    create_sync_state(conn)
 
-def main():
-    new_questions = fetch_new_questions()
+    since = None if args.full else get_watermark(conn, data_source_id)
+    new_questions = fetch_new_questions(client, since)
+    seen = processed_pages(conn, [q.page_id for q in new_questions])
+    new_questions = deque(q for q in new_questions if q.page_id not in seen)
 
     if not new_questions:
         print("ℹ️ No new questions to sync.")
     else:
-        total = 0
-        while new_questions:
-            item = new_questions.popleft()
-
-            insert_question(item.topic, item.question, item.answer)
-            total += 1
+        # one transaction for the whole batch; if it fails nothing is marked Synced
+        inserted = insert_questions((q.topic, q.question, q.answer) for q in new_questions)
+        record_synced(
+            conn, data_source_id, [(q.page_id, q.last_edited_time or "") for q in new_questions]
+        )
+        mark_synced(new_questions, client)
 
-        print(f"✅ {total} new questions synced and saved.")
+        print(f"✅ {len(inserted)} new questions synced and saved.")
+        skipped = len(new_questions) - len(inserted)
+        if skipped:
+            print(f"⚠️ {skipped} duplicates skipped.")
 
-    # Now double-check if everything is synced
-    all_synced = check_all_synced()
+    # Synced pages are known locally, so archiving needs no extra queries
+    archived = archive_recorded(conn, client)
+    if archived:
+        print(f"📦 {archived} synced pages archived.")
+    conn.close()
 
-    if not all_synced:
-        print("📦 All pages are synced. Archiving now...")
-        archive_pages()
-        print("✅ All synced pages archived.")
-    else:
-        print("⚠️ Some pages are still not synced. Archiving skipped.")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,194 @@
+"""
+Bulk import/export (CSV, TSV or JSONL) and bulk delete for the questions table.
+
+Both directions stream through generators, so memory stays flat however
+large the file is. Imports upsert on (topic, question) in one
+transaction, on a database that has been migrated once:
+
+    python src/scripts/questions_io.py migrate
+    python src/scripts/questions_io.py export catalog.jsonl
+    python src/scripts/questions_io.py export - --topic "Star Wars" --format csv
+    python src/scripts/questions_io.py import catalog.csv --batch-rows 10000
+    python src/scripts/questions_io.py delete --topic "Test" --question-like "%draft%"
+
+delete only previews the matching rows unless --yes is given.
+"""
+
+import argparse
+from collections.abc import Iterable, Iterator
+import contextlib
+import csv
+import json
+from pathlib import Path
+import sqlite3
+import sys
+import time
+
+# Ensure the project root (parent of 'src') is on sys.path
+project_root = Path(__file__).resolve().parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.sqlite_functions import basic_functions  # noqa: E402
+from src.sqlite_functions.basic_functions import (  # noqa: E402
+    BULK_BATCH_ROWS,
+    QUESTION_FIELDS,
+    bulk_delete_questions,
+    create_natural_key,
+    iter_questions,
+    upsert_questions,
+)
+
+FORMATS = ("csv", "tsv", "jsonl")
+
+
+def detect_format(path: str, fmt: str | None) -> str:
+    if fmt:
+        return fmt
+    suffix = Path(path).suffix.lower().lstrip(".")
+    if suffix in ("ndjson", "jsonl", "json"):
+        return "jsonl"
+    if suffix in FORMATS:
+        return suffix
+    raise SystemExit(f"Can't tell the format of {path!r}; pass --format {{{','.join(FORMATS)}}}")
+
+
+@contextlib.contextmanager
+def open_text(path: str, mode: str):
+    if path == "-":
+        yield sys.stdin if mode == "r" else sys.stdout
+    else:
+        with open(path, mode, encoding="utf-8", newline="") as f:
+            yield f
+
+
+def read_rows(f, fmt: str) -> Iterator[dict]:
+    if fmt == "jsonl":
+        for lineno, line in enumerate(f, start=1):
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise SystemExit(f"Line {lineno}: invalid JSON ({e})") from e
+    else:
+        yield from csv.DictReader(f, delimiter="\t" if fmt == "tsv" else ",")
+
+
+def write_rows(f, fmt: str, rows: Iterable[dict]) -> None:
+    if fmt == "jsonl":
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    else:
+        writer = csv.DictWriter(f, QUESTION_FIELDS, delimiter="\t" if fmt == "tsv" else ",")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+class Progress:
+    """Rate-limited progress line on stderr."""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.start = self.last = time.perf_counter()
+
+    def __call__(self, read: int, written: int | None = None, final: bool = False) -> None:
+        now = time.perf_counter()
+        if not final and now - self.last < 0.5:
+            return
+        self.last = now
+        rate = read / max(now - self.start, 1e-9)
+        extra = f", {written} written" if written is not None else ""
+        end = "\n" if final else ""
+        print(f"\r{self.label}: {read} rows{extra} ({rate:,.0f} rows/s)", end=end, file=sys.stderr)
+
+
+def counted(rows: Iterable[dict], progress: Progress) -> Iterator[dict]:
+    n = 0
+    for row in rows:
+        yield row
+        n += 1
+        if n % 1000 == 0:
+            progress(n)
+    progress(n, final=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", type=Path, default=basic_functions.DB_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    exp = sub.add_parser("export", help="write questions to a file ('-' for stdout)")
+    exp.add_argument("path")
+    exp.add_argument("--format", choices=FORMATS)
+    exp.add_argument("--topic")
+
+    imp = sub.add_parser("import", help="upsert questions from a file ('-' for stdin)")
+    imp.add_argument("path")
+    imp.add_argument("--format", choices=FORMATS)
+    imp.add_argument("--batch-rows", type=int, default=BULK_BATCH_ROWS)
+    imp.add_argument("--no-update", action="store_true", help="keep existing rows as they are")
+    sub.add_parser("migrate", help="add the unique (topic, question) key imports rely on")
+    rm = sub.add_parser("delete", help="delete questions matching all given filters")
+    rm.add_argument("--ids", type=lambda v: [int(x) for x in v.split(",") if x.strip()])
+    rm.add_argument("--topic")
+    rm.add_argument("--question-like", help="SQL LIKE pattern, e.g. '%%draft%%'")
+    rm.add_argument("--answer-like", help="SQL LIKE pattern")
+    rm.add_argument("--max-likelihood", type=int)
+    rm.add_argument("--yes", action="store_true", help="actually delete (default: dry run)")
+    args = parser.parse_args()
+
+    basic_functions.DB_PATH = args.db
+
+    if args.command == "migrate":
+        conn = sqlite3.connect(args.db)
+        try:
+            create_natural_key(conn)
+        except ValueError as e:
+            raise SystemExit(str(e)) from e
+        finally:
+            conn.close()
+        print(f"✅ {args.db}: unique (topic, question) key in place")
+        return
+
+    if args.command == "delete":
+        try:
+            rows = bulk_delete_questions(
+                ids=args.ids,
+                topic=args.topic,
+                question_like=args.question_like,
+                answer_like=args.answer_like,
+                max_likelihood=args.max_likelihood,
+                dry_run=not args.yes,
+            )
+        except ValueError as e:
+            raise SystemExit(str(e)) from e
+        for row in rows[:50]:
+            print(f"[{row['id']}] ({row['topic']}) {row['question']} | A: {row['answer']}")
+        if len(rows) > 50:
+            print(f"... and {len(rows) - 50} more")
+        verb = "Deleted" if args.yes else "Would delete (dry run, pass --yes)"
+        print(f"{verb}: {len(rows)} question(s)")
+        return
+
+    fmt = detect_format(args.path, args.format)
+    if args.command == "export":
+        progress = Progress("export")
+        with open_text(args.path, "w") as f:
+            write_rows(f, fmt, counted(iter_questions(args.topic), progress))
+    else:
+        progress = Progress("import")
+        with open_text(args.path, "r") as f:
+            try:
+                read, written = upsert_questions(
+                    read_rows(f, fmt),
+                    update_existing=not args.no_update,
+                    batch_size=args.batch_rows,
+                    progress=progress,
+                )
+            except ValueError as e:
+                raise SystemExit(f"Import rolled back: {e}") from e
+        progress(read, written, final=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+"""
+Insert-time near-duplicate detection with a random-projection LSH index.
+
+Each question embedding is hashed into `n_tables` signatures of `n_bits`
+hyperplane signs. Vectors that share a signature in any table become
+candidates, and only those are rescored exactly. Within each table, rows
+are kept sorted by signature, so one lookup is a binary search. New rows go
+into a small unsorted tail that is merged in when it grows. The index is
+saved as an .npz next to the database. It is kept in step with the
+question_embeddings store, so a check only ever encodes the new question.
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+import sqlite3
+import threading
+
+import numpy as np
+
+from src.sqlite_functions.catalog_cache import catalog_version
+from src.sqlite_functions.embedding_model import DEFAULT_MODEL, encode
+from src.sqlite_functions.embedding_store import EmbeddingStore
+
+# Cosine similarity at which a new question counts as a likely duplicate
+DUPLICATE_THRESHOLD = float(os.getenv("TRIVIA_DUPLICATE_THRESHOLD", "0.85"))
+
+# 16 tables x 8 bits: ~97% recall at cosine 0.85, ~n/16 candidates per query
+N_TABLES = 16
+N_BITS = 8
+
+
+class DuplicateQuestionError(ValueError):
+    """Raised by insert_question() in "reject" mode."""
+
+    def __init__(self, question: str, matches: list[dict]):
+        self.question = question
+        self.matches = matches
+        best = matches[0]
+        super().__init__(
+            f"Likely duplicate of question {best['id']} ({best['score']:.2f}): {best['question']}"
+        )
+
+
+def index_path_for(db_path: Path) -> Path:
+    """Where the LSH index for a database lives: database.db -> database.ann.npz"""
+    db_path = Path(db_path)
+    return db_path.with_name(f"{db_path.stem}.ann.npz")
+
+
+class LSHIndex:
+    """
+    Random-hyperplane LSH over L2-normalized vectors, with exact re-ranking.
+
+    Args:
+        dim (int): embedding dimension
+        model (str): name of the model the vectors came from
+        n_tables (int): independent hash tables (more = better recall)
+        n_bits (int): hyperplanes per table (more = fewer candidates)
+        seed (int): seed for the hyperplanes
+    """
+
+    def __init__(
+        self,
+        dim: int,
+        model: str = DEFAULT_MODEL,
+        n_tables: int = N_TABLES,
+        n_bits: int = N_BITS,
+        seed: int = 0,
+    ):
+        rng = np.random.default_rng(seed)
+        self.model = model
+        self.planes = rng.standard_normal((n_tables, n_bits, dim)).astype(np.float32)
+        self.ids = np.empty(0, dtype=np.int64)
+        self.vectors = np.empty((0, dim), dtype=np.float16)
+        self.codes = np.empty((0, n_tables), dtype=np.uint32)
+        self._reindex()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _hash(self, vectors: np.ndarray) -> np.ndarray:
+        """(n, n_tables) signatures: one bit per hyperplane side."""
+        bits = np.einsum("tbd,nd->ntb", self.planes, vectors) > 0
+        weights = np.uint32(1) << np.arange(self.planes.shape[1], dtype=np.uint32)
+        return (bits * weights).sum(axis=2, dtype=np.uint32)
+
+    def _reindex(self) -> None:
+        """Sort every table by signature and empty the tail."""
+        self._order = np.argsort(self.codes.T, axis=1, kind="stable")
+        self._sorted = np.take_along_axis(self.codes.T, self._order, axis=1)
+        self._n_sorted = len(self.ids)
+
+    def add(self, ids: np.ndarray, vectors: np.ndarray) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.planes.shape[2])
+        self.ids = np.concatenate([self.ids, np.asarray(ids, dtype=np.int64)])
+        self.vectors = np.concatenate([self.vectors, vectors.astype(np.float16)])
+        self.codes = np.concatenate([self.codes, self._hash(vectors)])
+        if len(self.ids) - self._n_sorted > max(1024, self._n_sorted // 8):
+            self._reindex()
+
+    def remove(self, ids: np.ndarray) -> None:
+        keep = ~np.isin(self.ids, ids)
+        if keep.all():
+            return
+        self.ids = self.ids[keep]
+        self.vectors = self.vectors[keep]
+        self.codes = self.codes[keep]
+        self._reindex()
+
+    def query(self, vector: np.ndarray, threshold: float, k: int = 5) -> list[tuple[int, float]]:
+        """
+        Up to k (id, cosine) pairs with cosine >= threshold, best first.
+
+        Approximate: a true neighbour is missed only if it collides with the
+        query in none of the tables.
+        """
+        vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+        code = self._hash(vector[None, :])[0]
+
+        parts = []
+        for t in range(len(code)):
+            lo, hi = np.searchsorted(self._sorted[t], [code[t], code[t] + 1])
+            parts.append(self._order[t, lo:hi])
+        tail = self.codes[self._n_sorted :]
+        parts.append(np.nonzero((tail == code).any(axis=1))[0] + self._n_sorted)
+        candidates = np.unique(np.concatenate(parts))
+        if not candidates.size:
+            return []
+
+        scores = self.vectors[candidates].astype(np.float32) @ vector
+        hits = np.nonzero(scores >= threshold)[0]
+        best = hits[np.argsort(-scores[hits])][:k]
+        return [(int(self.ids[candidates[i]]), float(scores[i])) for i in best]
+
+    def save(self, path: Path) -> None:
+        """Write atomically, so a crash never leaves a half-written index."""
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                planes=self.planes,
+                ids=self.ids,
+                vectors=self.vectors,
+                codes=self.codes,
+                model=np.array(self.model),
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "LSHIndex":
+        with np.load(path) as data:
+            index = cls.__new__(cls)
+            index.model = str(data["model"])
+            index.planes = data["planes"]
+            index.ids = data["ids"]
+            index.vectors = data["vectors"]
+            index.codes = data["codes"]
+        index._reindex()
+        return index
+
+
+class DuplicateChecker:
+    """
+    Process-wide LSH index for one database, synced lazily with the catalog.
+
+    The index is brought up to date only when the catalog version has moved
+    since the last check. Rows whose stored embedding was invalidated
+    (edited or deleted questions) are dropped. Questions not yet indexed are
+    added, and only the ones without a stored vector are encoded.
+    """
+
+    def __init__(
+        self, index_path: Path, model: str = DEFAULT_MODEL, threshold: float = DUPLICATE_THRESHOLD
+    ):
+        self.index_path = Path(index_path)
+        self.model = model
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._index = None
+        self._version = None
+
+    def _load(self) -> None:
+        if self._index is not None:
+            return
+        if self.index_path.exists():
+            index = LSHIndex.load(self.index_path)
+            if index.model == self.model:
+                self._index = index
+
+    def _sync(self, conn: sqlite3.Connection) -> None:
+        version = catalog_version(conn)
+        if version is not None and version == self._version and self._index is not None:
+            return
+
+        self._load()
+        store = EmbeddingStore(conn, self.model)
+        changed = False
+
+        if self._index is not None:
+            stored = np.fromiter(
+                (
+                    row[0]
+                    for row in conn.execute(
+                        "SELECT question_id FROM question_embeddings WHERE model = ?;",
+                        (self.model,),
+                    )
+                ),
+                dtype=np.int64,
+            )
+            stale = self._index.ids[~np.isin(self._index.ids, stored)]
+            if stale.size:
+                self._index.remove(stale)
+                changed = True
+            indexed = self._index.ids.tolist()
+        else:
+            indexed = []
+
+        rows = conn.execute(
+            "SELECT id, question FROM questions WHERE id NOT IN (SELECT value FROM json_each(?));",
+            (json.dumps(indexed),),
+        ).fetchall()
+        if rows:
+            ids = [row[0] for row in rows]
+            vectors = store.embeddings(ids, [row[1] for row in rows], self._encode)
+            if self._index is None:
+                self._index = LSHIndex(vectors.shape[1], model=self.model)
+            self._index.add(np.array(ids), vectors)
+            changed = True
+
+        if changed and self._index is not None:
+            self._index.save(self.index_path)
+        self._version = version
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        return encode(texts, name=self.model)
+
+    def check(
+        self, conn: sqlite3.Connection, question: str, topic: str | None = None, k: int = 5
+    ) -> tuple[list[dict], np.ndarray]:
+        """
+        Likely duplicates of `question` among existing questions.
+
+        Args:
+            question (str): text of the question about to be inserted
+            topic (str | None): only report matches in this topic
+            k (int): max matches
+
+        Returns:
+            (matches, vector): matches are id/topic/question/answer/score
+            dicts (best first); pass vector to add() after inserting
+        """
+        matches, vectors = self.check_many(conn, [question], [topic], k)
+        return matches[0], vectors[0]
+
+    def check_many(
+        self,
+        conn: sqlite3.Connection,
+        questions: list[str],
+        topics: list[str | None],
+        k: int = 5,
+    ) -> tuple[list[list[dict]], np.ndarray]:
+        """check() for a batch, encoding all questions in one model call."""
+        vectors = self._encode(list(questions))
+        with self._lock:
+            self._sync(conn)
+            hits = [
+                self._index.query(vector, self.threshold, k) if self._index else []
+                for vector in vectors
+            ]
+
+        hit_ids = {qid for per_question in hits for qid, _ in per_question}
+        if not hit_ids:
+            return [[] for _ in questions], vectors
+        cur = conn.execute(
+            """
+            SELECT id, topic, question, answer
+            FROM questions
+            WHERE id IN (SELECT value FROM json_each(?));
+            """,
+            (json.dumps(list(hit_ids)),),
+        )
+        rows = {row[0]: row for row in cur}
+
+        results = []
+        for per_question, topic in zip(hits, topics, strict=True):
+            matches = [
+                {
+                    "id": qid,
+                    "topic": rows[qid][1],
+                    "question": rows[qid][2],
+                    "answer": rows[qid][3],
+                    "score": round(score, 4),
+                }
+                for qid, score in per_question  # already best first
+                if qid in rows and (topic is None or rows[qid][1] == topic)
+            ]
+            results.append(matches)
+        return results, vectors
+
+    def add(self, conn: sqlite3.Connection, qid: int, question: str, vector: np.ndarray) -> None:
+        """Index a freshly inserted question without re-encoding it."""
+        self.add_many(conn, [qid], [question], vector[None, :])
+
+    def add_many(
+        self, conn: sqlite3.Connection, qids: list[int], questions: list[str], vectors: np.ndarray
+    ) -> None:
+        if not qids:
+            return
+        EmbeddingStore(conn, self.model).save(qids, questions, vectors)
+        with self._lock:
+            if self._index is None:
+                self._index = LSHIndex(vectors.shape[1], model=self.model)
+            self._index.add(np.array(qids), vectors)
+            self._index.save(self.index_path)
+            self._version = catalog_version(conn)
+
+    def sync(self, conn: sqlite3.Connection, rebuild: bool = False) -> int:
+        """
+        Bring the index up to date now; returns the number of indexed questions.
+
+        With rebuild=True the saved index is discarded and every question is
+        re-indexed (from stored embeddings where they are still fresh).
+        """
+        with self._lock:
+            if rebuild:
+                self._index = None
+                self.index_path.unlink(missing_ok=True)
+            self._sync(conn)
+            return len(self._index) if self._index else 0
+
+
+_checkers = {}
+_checkers_lock = threading.Lock()
+
+
+def get_checker(db_path: Path, model: str = DEFAULT_MODEL) -> DuplicateChecker:
+    """The shared DuplicateChecker for a database file."""
+    key = (str(db_path), model)
+    with _checkers_lock:
+        if key not in _checkers:
+            _checkers[key] = DuplicateChecker(index_path_for(db_path), model)
+        return _checkers[key]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or update the near-duplicate index.")
+    parser.add_argument("db_path", type=Path)
+    parser.add_argument("--rebuild", action="store_true", help="re-index from scratch")
+    args = parser.parse_args()
+
+    checker = get_checker(args.db_path)
+    conn = sqlite3.connect(args.db_path)
+    n = checker.sync(conn, rebuild=args.rebuild)
+    conn.close()
+    print(f"✅ {n} questions indexed in {checker.index_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,66 +1,472 @@
+from collections.abc import Callable, Iterable, Iterator
+from itertools import islice
+import json
+import os
 from pathlib import Path
 import sqlite3
 
-DB_PATH = Path(__file__).parent.parent.parent / "data" / "database.db"
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
+# Same database (and TRIVIA_DB_PATH override) as the web app
+DB_PATH = Path(os.getenv("TRIVIA_DB_PATH", BASE_DIR / "database" / "database.db"))
 
-def insert_question(topic: str, question: str, answer: str) -> None:
+# "off", "flag" (warn and insert anyway) or "reject" (raise, don't insert).
+# Anything but "off" imports ann_index (numpy) and loads the embedding model.
+DUPLICATE_CHECK = os.getenv("TRIVIA_DUPLICATE_CHECK", "off")
+
+# Rows per transaction / fetchmany() for bulk import and export
+BULK_BATCH_ROWS = int(os.getenv("TRIVIA_BULK_BATCH_ROWS", "5000"))
+
+QUESTION_FIELDS = ("id", "topic", "question", "answer", "likelihood")
+
+
+def insert_question(
+    topic: str, question: str, answer: str, duplicate_check: str | None = None
+) -> int:
     """
     Inserts a trivia question into the database.
 
+    With duplicate checking on, the question is first checked against the
+    near-duplicate index (see ann_index.py). In "flag" mode likely
+    duplicates are printed and the question is inserted anyway. In "reject" mode DuplicateQuestionError
+    is raised and nothing is inserted. An exact (topic, question) match is
+    never inserted twice; its existing id is returned.
+
     Args:
         topic (str): The topic/category of the question.
         question (str): The trivia question text.
         answer (str): The correct answer.
-        db_file (str): Path to SQLite database file.
+        duplicate_check (str | None): "off", "flag" or "reject";
+            defaults to TRIVIA_DUPLICATE_CHECK.
+
+    Returns:
+        the new question's id
     """
+    mode = duplicate_check or DUPLICATE_CHECK
     conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    try:
+        checker = vector = None
+        if mode != "off":
+            from src.sqlite_functions.ann_index import DuplicateQuestionError, get_checker
+
+            checker = get_checker(DB_PATH)
+            matches, vector = checker.check(conn, question, topic=topic)
+            if matches and mode == "reject":
+                raise DuplicateQuestionError(question, matches)
+            for match in matches:
+                print(
+                    f"⚠️ Possible duplicate of [{match['id']}] ({match['score']:.2f}): "
+                    f"{match['question']} | A: {match['answer']}"
+                )
 
-    cursor.execute(
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            INSERT INTO questions (topic, question, answer, likelihood)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT DO NOTHING
+        """,
+            (topic, question, answer, 3),
+        )
+        conn.commit()
+        if cursor.rowcount == 0:
+            # the natural key (see create_natural_key) already has this question
+            qid = conn.execute(
+                """
+                SELECT id FROM questions
+                WHERE IFNULL(topic, '') = IFNULL(?, '') AND question = ?;
+                """,
+                (topic, question),
+            ).fetchone()[0]
+            print(f"ℹ️ Question already exists with id={qid}; not inserted.")
+            return qid
+        qid = cursor.lastrowid
+
+        if checker is not None:
+            checker.add(conn, qid, question, vector)
+    finally:
+        conn.close()
+    return qid
+
+
+def insert_questions(
+    items: Iterable[tuple[str, str, str]],
+    dedupe: bool = True,
+    duplicate_check: str | None = None,
+) -> list[int]:
+    """
+    Inserts many trivia questions with one executemany in a single transaction.
+
+    Either every row is committed or none is, and there is one fsync for
+    the whole batch. Near-duplicates are checked in one batch as in
+    insert_question(). In "reject" mode the offending rows are skipped
+    instead of raising.
+
+    Args:
+        items: (topic, question, answer) tuples.
+        dedupe (bool): Skip rows whose (topic, question) already exists, in
+            the database or earlier in `items`.
+        duplicate_check (str | None): "off", "flag" or "reject";
+            defaults to TRIVIA_DUPLICATE_CHECK.
+
+    Returns:
+        ids of the inserted questions, in input order
+    """
+    rows = [tuple(item) for item in items]
+    if dedupe:
+        seen = set()
+        unique = []
+        for row in rows:
+            if (row[0], row[1]) not in seen:
+                seen.add((row[0], row[1]))
+                unique.append(row)
+        rows = unique
+
+    mode = duplicate_check or DUPLICATE_CHECK
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        if dedupe and rows:
+            cur = conn.execute(
+                """
+                SELECT topic, question
+                FROM questions
+                WHERE topic IN (SELECT value FROM json_each(?))
+                   OR (? AND topic IS NULL);
+                """,
+                (
+                    json.dumps(sorted({row[0] for row in rows if row[0] is not None})),
+                    any(row[0] is None for row in rows),
+                ),
+            )
+            existing = set(cur)
+            rows = [row for row in rows if (row[0], row[1]) not in existing]
+        if not rows:
+            return []
+
+        checker = vectors = None
+        if mode != "off":
+            from src.sqlite_functions.ann_index import get_checker
+
+            checker = get_checker(DB_PATH)
+            all_matches, vectors = checker.check_many(
+                conn, [row[1] for row in rows], [row[0] for row in rows]
+            )
+            keep = []
+            for i, (row, matches) in enumerate(zip(rows, all_matches, strict=True)):
+                if matches:
+                    best = matches[0]
+                    action = "Skipped" if mode == "reject" else "Possible duplicate"
+                    print(
+                        f"⚠️ {action}: {row[1]!r} ~ [{best['id']}] ({best['score']:.2f}) "
+                        f"{best['question']}"
+                    )
+                if not matches or mode != "reject":
+                    keep.append(i)
+            rows = [rows[i] for i in keep]
+            vectors = vectors[keep]
+
+        # BEGIN IMMEDIATE takes the write lock up front; the NOT EXISTS guard
+        # covers rows another writer added since the dedupe read above
+        conn.execute("BEGIN IMMEDIATE;")
+        try:
+            before = conn.execute("SELECT IFNULL(MAX(id), 0) FROM questions;").fetchone()[0]
+            conn.executemany(
+                """
+                INSERT INTO questions (topic, question, answer, likelihood)
+                SELECT :topic, :question, :answer, 3
+                WHERE NOT :dedupe OR NOT EXISTS (
+                    SELECT 1 FROM questions WHERE topic IS :topic AND question = :question
+                )
+                ON CONFLICT DO NOTHING
+                """,
+                ({"topic": t, "question": q, "answer": a, "dedupe": dedupe} for t, q, a in rows),
+            )
+            inserted = conn.execute(
+                "SELECT id, topic, question FROM questions WHERE id > ? ORDER BY id;",
+                (before,),
+            ).fetchall()
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+        if checker is not None and inserted:
+            position = {(row[0], row[1]): i for i, row in enumerate(rows)}
+            picks = [position[(topic, question)] for _, topic, question in inserted]
+            checker.add_many(
+                conn,
+                [row[0] for row in inserted],
+                [row[2] for row in inserted],
+                vectors[picks],
+            )
+    finally:
+        conn.close()
+    return [row[0] for row in inserted]
+
+
+# NULL topics count as "" so they are deduplicated too (NULLs never collide in an index)
+NATURAL_KEY = "IFNULL(topic, ''), question"
+NATURAL_KEY_INDEX = "questions_natural_key_uq"
+
+
+def has_natural_key(conn: sqlite3.Connection) -> bool:
+    return (
+        conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?;", (NATURAL_KEY_INDEX,)
+        ).fetchone()
+        is not None
+    )
+
+
+def create_natural_key(conn: sqlite3.Connection) -> None:
+    """
+    Migration: unique index on (topic, question), the key bulk upserts match on.
+
+    Run once per database (python src/scripts/questions_io.py migrate).
+
+    Raises:
+        ValueError: if the table already holds duplicate (topic, question) rows
+    """
+    try:
+        with conn:
+            conn.execute(
+                f"""
+                CREATE UNIQUE INDEX IF NOT EXISTS {NATURAL_KEY_INDEX}
+                ON questions({NATURAL_KEY});
+                """
+            )
+    except sqlite3.IntegrityError as e:
+        raise ValueError(
+            "questions has duplicate (topic, question) rows; remove them before migrating"
+        ) from e
+
+
+def iter_questions(
+    topic: str | None = None, by_topic: bool = False, batch_size: int = BULK_BATCH_ROWS
+) -> Iterator[dict]:
+    """
+    Stream questions (optionally one topic) in bounded memory, with one query.
+
+    Ordered by id, or by topic then id with by_topic=True.
+
+    Yields:
+        dicts with id/topic/question/answer/likelihood
+    """
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        cursor = conn.execute(
+            f"""
+            SELECT id, topic, question, answer, likelihood
+            FROM questions
+            WHERE ? IS NULL OR topic = ?
+            ORDER BY {"topic, id" if by_topic else "id"};
+            """,  # noqa: S608
+            (topic, topic),
+        )
+        while rows := cursor.fetchmany(batch_size):
+            for row in rows:
+                yield dict(zip(QUESTION_FIELDS, row, strict=True))
+    finally:
+        conn.close()
+
+
+def upsert_questions(
+    rows: Iterable[dict],
+    update_existing: bool = True,
+    batch_size: int = BULK_BATCH_ROWS,
+    progress: Callable[[int, int], None] | None = None,
+) -> tuple[int, int]:
+    """
+    Load questions keyed on (topic, question) in a single transaction.
+
+    `rows` is consumed lazily, so a generator over a large file never has
+    more than one batch in memory. Any "id" field is ignored. A row that
+    fails validation rolls back the whole import, so a file is either
+    loaded completely or not at all.
+
+    Args:
+        rows: dicts with topic, question, answer and optionally likelihood
+        update_existing (bool): overwrite answer/likelihood of rows that
+            already exist; otherwise leave them untouched
+        batch_size (int): rows per executemany
+        progress: called with (rows_read, rows_written) after each batch
+
+    Returns:
+        (rows_read, rows_written)
+
+    Raises:
+        ValueError: if the natural-key migration hasn't been run, or a row
+            has no question or a likelihood outside 1-5
+    """
+    on_conflict = (
         """
-        INSERT INTO questions (topic, question, answer, likelihood)
-        VALUES (?, ?, ?, ?)
-    """,
-        (topic, question, answer, 3),
+        DO UPDATE SET
+            answer = excluded.answer,
+            likelihood = IFNULL(excluded.likelihood, questions.likelihood)
+        WHERE questions.answer IS NOT excluded.answer
+           OR questions.likelihood IS NOT IFNULL(excluded.likelihood, questions.likelihood)
+        """
+        if update_existing
+        else "DO NOTHING"
     )
+    sql = f"""
+        INSERT INTO questions (topic, question, answer, likelihood)
+        VALUES (:topic, :question, :answer, IFNULL(:likelihood, 3))
+        ON CONFLICT({NATURAL_KEY}) {on_conflict};
+    """  # noqa: S608
 
-    conn.commit()
-    conn.close()
+    read = written = 0
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        if not has_natural_key(conn):
+            raise ValueError(
+                "questions has no natural key yet; run `questions_io.py migrate` first"
+            )
+        it = iter(rows)
+        with conn:
+            while batch := list(islice(it, batch_size)):
+                params = [_upsert_params(read + i + 1, row) for i, row in enumerate(batch)]
+                cursor = conn.executemany(sql, params)
+                read += len(batch)
+                # rows inserted or actually changed; unlike total_changes this
+                # leaves out what the catalog triggers write
+                written += cursor.rowcount
+                if progress:
+                    progress(read, written)
+    finally:
+        conn.close()
+    return read, written
+
+
+_LIKELIHOODS = ("1", "2", "3", "4", "5")
+
+
+def _upsert_params(n: int, row: dict) -> dict:
+    """Validated parameters for the n-th (1-based) imported row."""
+    if not row.get("question"):
+        raise ValueError(f"row {n}: missing question")
+    likelihood = row.get("likelihood")
+    if likelihood in (None, ""):
+        likelihood = None
+    elif not (isinstance(likelihood, int | str) and str(likelihood).strip() in _LIKELIHOODS):
+        raise ValueError(f"row {n}: likelihood must be 1-5, got {likelihood!r}")
+    else:
+        likelihood = int(likelihood)
+    return {
+        "topic": row.get("topic"),
+        "question": row["question"],
+        "answer": row.get("answer"),
+        "likelihood": likelihood,
+    }
 
 
 def delete_questions(ids: int | list[int]) -> None:
     """
     Deletes one or more trivia questions from the database.
 
+    Each question is shown and confirmed interactively; the confirmed ones
+    are then removed together with bulk_delete_questions().
+
     Args:
         ids (int | list[int]): The id(s) of the item(s) to delete
     """
     if isinstance(ids, int):
         ids = [ids]  # wrap single int in a list
 
-    with sqlite3.connect(DB_PATH) as conn:
-        cursor = conn.cursor()
+    found = {row["id"]: row for row in bulk_delete_questions(ids=ids, dry_run=True)}
 
-        for qid in ids:
-            cursor.execute("SELECT * FROM questions WHERE id=?", (qid,))
-            row = cursor.fetchone()
+    confirmed = []
+    for qid in ids:
+        row = found.get(qid)
+        if not row:
+            print(f"No question found with id={qid}")
+            continue
 
-            if not row:
-                print(f"No question found with id={qid}")
-                continue
+        user_input = input(
+            f"Delete this question (id={qid})?\nQuestion: {row['question']}\n"
+            f"Answer: {row['answer']}\n(y/n): "
+        )
 
-            user_input = input(
-                f"Delete this question (id={qid})?\nQuestion: {row[2]}\nAnswer: {row[3]}\n(y/n): "
-            )
+        if user_input.lower().strip() == "y":
+            confirmed.append(qid)
+        else:
+            print(f"Skipped question id={qid}")
 
-            if user_input.lower().strip() == "y":
-                cursor.execute("DELETE FROM questions WHERE id=?", (qid,))
-                print(f"Deleted question id={qid}")
-            else:
-                print(f"Skipped question id={qid}")
+    if confirmed:
+        deleted = bulk_delete_questions(ids=confirmed)
+        print(f"Deleted {len(deleted)} question(s): {', '.join(str(r['id']) for r in deleted)}")
 
-        conn.commit()
+
+def bulk_delete_questions(
+    ids: Iterable[int] | None = None,
+    topic: str | None = None,
+    question_like: str | None = None,
+    answer_like: str | None = None,
+    max_likelihood: int | None = None,
+    dry_run: bool = False,
+) -> list[dict]:
+    """
+    Deletes every question matching all given filters, in one transaction.
+
+    Matching rows are selected once, then removed with a single
+    DELETE ... WHERE id IN (...). Foreign keys are enforced, so their
+    progress and schedule rows go with them.
+
+    Args:
+        ids: only these question ids
+        topic (str | None): only this topic
+        question_like (str | None): SQL LIKE pattern on the question text
+        answer_like (str | None): SQL LIKE pattern on the answer text
+        max_likelihood (int | None): only likelihood <= this
+        dry_run (bool): only report what would be deleted
+
+    Returns:
+        the matching rows as id/topic/question/answer/likelihood dicts
+
+    Raises:
+        ValueError: if no filter is given (refuses to empty the table)
+    """
+    filters = {
+        "ids": None if ids is None else json.dumps(list(ids)),
+        "topic": topic,
+        "question_like": question_like,
+        "answer_like": answer_like,
+        "max_likelihood": max_likelihood,
+    }
+    if all(value is None for value in filters.values()):
+        raise ValueError("bulk_delete_questions needs at least one filter")
+
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        conn.execute("PRAGMA foreign_keys = ON;")
+        conn.execute("BEGIN IMMEDIATE;")
+        try:
+            cur = conn.execute(
+                """
+                SELECT id, topic, question, answer, likelihood
+                FROM questions
+                WHERE (:ids IS NULL OR id IN (SELECT value FROM json_each(:ids)))
+                  AND (:topic IS NULL OR topic = :topic)
+                  AND (:question_like IS NULL OR question LIKE :question_like)
+                  AND (:answer_like IS NULL OR answer LIKE :answer_like)
+                  AND (:max_likelihood IS NULL OR likelihood <= :max_likelihood)
+                ORDER BY id;
+                """,
+                filters,
+            )
+            rows = [dict(zip(QUESTION_FIELDS, row, strict=True)) for row in cur]
+            if rows and not dry_run:
+                conn.execute(
+                    "DELETE FROM questions WHERE id IN (SELECT value FROM json_each(?));",
+                    (json.dumps([row["id"] for row in rows]),),
+                )
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    finally:
+        conn.close()
+    return rows
 
 
 def get_unique_topics() -> list:
@@ -158,13 +564,15 @@ def add_likelihood_column():
 
 
 def list_questions():
-    """List all questions in the database."""
-    topics = get_unique_topics()
-    for topic in topics:
-        print(f"\n--- Topic: {topic} ---")
-        questions = load_topic(topic)
-        for q in questions:
-            print(f"ID: {q[0]} | Q: {q[2]} | A: {q[3]} | Likelihood: {q[4]}")
+    """List all questions in the database, grouped by topic, with a single query."""
+    current = object()
+    for q in iter_questions(by_topic=True):
+        if q["topic"] != current:
+            current = q["topic"]
+            print(f"\n--- Topic: {current} ---")
+        print(
+            f"ID: {q['id']} | Q: {q['question']} | A: {q['answer']} | Likelihood: {q['likelihood']}"
+        )
 
 
 def interactive_menu():
@@ -0,0 +1,128 @@
+from collections import OrderedDict
+import os
+import sqlite3
+import threading
+
+# Upper bound on the number of question rows held in memory across all entries
+MAX_CACHED_ROWS = int(os.getenv("TRIVIA_CATALOG_CACHE_ROWS", "100000"))
+
+
+def catalog_version(conn: sqlite3.Connection) -> int | None:
+    """
+    Current catalog generation, bumped by triggers on every questions write.
+
+    Returns None if the catalog_version table hasn't been created yet
+    (init_db() not run), in which case nothing should be cached.
+    """
+    try:
+        row = conn.execute("SELECT version FROM catalog_version WHERE id = 1;").fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row[0] if row else None
+
+
+def _question_dict(row) -> dict:
+    return {
+        "id": row[0],
+        "question": row[1],
+        "answer": row[2],
+        "likelihood": row[3],
+    }
+
+
+def _cost(rows: tuple) -> int:
+    # empty lists (unknown topics) still take an entry, so they count as one row
+    return max(len(rows), 1)
+
+
+class CatalogCache:
+    """
+    Read-through, in-process cache of topics and per-topic question lists.
+
+    Every lookup checks the catalog version first (a single-row read), so
+    inserts/edits/deletes from the web app, the basic_functions CLI or the
+    Notion sync invalidate it automatically. Question lists are kept in an
+    LRU capped at `max_rows` rows in total. Cached lists are shared between
+    callers: treat them as read-only.
+    """
+
+    def __init__(self, max_rows: int = MAX_CACHED_ROWS):
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._version = None
+        self._topics = None
+        self._questions = OrderedDict()
+        self._rows = 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def _clear(self) -> None:
+        self._topics = None
+        self._questions.clear()
+        self._rows = 0
+
+    def _sync(self, version: int | None) -> None:
+        """Drop everything if the DB moved on (call with the lock held)."""
+        if version is None or version != self._version:
+            self._clear()
+            self._version = version
+
+    def _store(self, key, rows: tuple) -> None:
+        if _cost(rows) > self.max_rows:
+            return
+        self._questions[key] = rows
+        self._rows += _cost(rows)
+        while self._rows > self.max_rows:
+            _, evicted = self._questions.popitem(last=False)
+            self._rows -= _cost(evicted)
+
+    def topics(self, conn: sqlite3.Connection) -> list[str]:
+        """Sorted distinct non-null topics."""
+        version = catalog_version(conn)
+        with self._lock:
+            self._sync(version)
+            if self._topics is not None:
+                return self._topics
+
+        # a miss queries without the lock, so it doesn't hold up other readers
+        cur = conn.execute(
+            "SELECT DISTINCT topic FROM questions WHERE topic IS NOT NULL ORDER BY topic;"
+        )
+        topics = [row[0] for row in cur.fetchall()]
+        with self._lock:
+            if version is not None and version == self._version:
+                if self._topics is None:
+                    self._topics = topics
+                return self._topics
+        return topics
+
+    def questions(self, conn: sqlite3.Connection, topic: str) -> tuple[dict, ...]:
+        """All questions for a topic, as id/question/answer/likelihood dicts."""
+        return self._lookup(
+            conn,
+            topic,
+            "SELECT id, question, answer, likelihood FROM questions WHERE topic = ?;",
+            (topic,),
+        )
+
+    def _lookup(self, conn, key, sql: str, params: tuple) -> tuple[dict, ...]:
+        version = catalog_version(conn)
+        with self._lock:
+            self._sync(version)
+            rows = self._questions.get(key)
+            if rows is not None:
+                self._questions.move_to_end(key)
+                return rows
+
+        # a miss queries without the lock, so it doesn't hold up other readers
+        rows = tuple(_question_dict(row) for row in conn.execute(sql, params))
+        with self._lock:
+            # don't publish if another lookup has already seen a newer catalog
+            if version is not None and version == self._version:
+                cached = self._questions.get(key)
+                if cached is not None:  # another thread filled it meanwhile
+                    return cached
+                self._store(key, rows)
+        return rows
@@ -0,0 +1,362 @@
+"""
+Whole-catalog, cross-topic duplicate scan on a process pool.
+
+The catalog's embeddings are written once to a memory-mapped .npy, and the
+upper triangle of the similarity matrix is split into square tiles. Worker
+processes map the file read-only (no pickling of the matrix), score one
+tile each and send back only the pairs above the threshold. The parent
+streams those into dedupe_pairs and marks the tile done in the same
+transaction. An interrupted scan therefore resumes where it stopped. When
+every tile is done, pairs are grouped into clusters in dedupe_clusters for
+review.
+"""
+
+import argparse
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import hashlib
+import os
+from pathlib import Path
+import sqlite3
+import tempfile
+
+import numpy as np
+
+from src.sqlite_functions.embedding_model import DEFAULT_MODEL, encode
+from src.sqlite_functions.embedding_store import EmbeddingStore
+from src.sqlite_functions.similarity import connected_components
+
+# Rows per tile side; a tile's float32 block is TILE_ROWS**2 * 4 bytes (64 MiB at 4096)
+TILE_ROWS = int(os.getenv("TRIVIA_DEDUPE_TILE_ROWS", "4096"))
+
+# Worker processes; 0 = one per CPU
+WORKERS = int(os.getenv("TRIVIA_DEDUPE_WORKERS", "0"))
+
+DEDUPE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dedupe_runs (
+    run_id INTEGER PRIMARY KEY,
+    model TEXT NOT NULL,
+    threshold REAL NOT NULL,
+    tile_rows INTEGER NOT NULL,
+    catalog_hash TEXT NOT NULL,
+    n_questions INTEGER NOT NULL,
+    n_tiles INTEGER NOT NULL,
+    started_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now')),
+    finished_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS dedupe_tiles (
+    run_id INTEGER NOT NULL REFERENCES dedupe_runs(run_id) ON DELETE CASCADE,
+    row_start INTEGER NOT NULL,
+    col_start INTEGER NOT NULL,
+    pairs INTEGER NOT NULL,
+    PRIMARY KEY (run_id, row_start, col_start)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS dedupe_pairs (
+    run_id INTEGER NOT NULL REFERENCES dedupe_runs(run_id) ON DELETE CASCADE,
+    question_a INTEGER NOT NULL,
+    question_b INTEGER NOT NULL,
+    score REAL NOT NULL,
+    PRIMARY KEY (run_id, question_a, question_b)
+) WITHOUT ROWID;
+
+-- one row per cluster member; status is for the reviewer ('pending', 'kept', 'merged', ...)
+CREATE TABLE IF NOT EXISTS dedupe_clusters (
+    run_id INTEGER NOT NULL REFERENCES dedupe_runs(run_id) ON DELETE CASCADE,
+    cluster_id INTEGER NOT NULL,
+    question_id INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    PRIMARY KEY (run_id, cluster_id, question_id)
+) WITHOUT ROWID;
+
+-- load_clusters() maps both ends of each pair to their cluster
+CREATE INDEX IF NOT EXISTS dedupe_clusters_question_idx
+ON dedupe_clusters(run_id, question_id, cluster_id);
+"""
+
+# Set in each worker by _init_worker
+_embeddings = None
+
+
+def _init_worker(npy_path: str) -> None:
+    global _embeddings
+    _embeddings = np.load(npy_path, mmap_mode="r")
+
+
+def _scan_tile(
+    row_start: int, col_start: int, tile_rows: int, threshold: float
+) -> tuple[int, int, np.ndarray, np.ndarray, np.ndarray]:
+    """Pairs (i, j, score), as global row indices with i < j, for one tile."""
+    rows = np.asarray(_embeddings[row_start : row_start + tile_rows])
+    cols = np.asarray(_embeddings[col_start : col_start + tile_rows])
+    block = rows @ cols.T
+    i, j = np.nonzero(block >= threshold)
+    if row_start == col_start:
+        keep = j > i
+        i, j = i[keep], j[keep]
+    return row_start, col_start, i + row_start, j + col_start, block[i, j]
+
+
+def create_dedupe_tables(conn: sqlite3.Connection) -> None:
+    conn.executescript(DEDUPE_SCHEMA)
+
+
+def _catalog(conn: sqlite3.Connection, model: str) -> tuple[np.ndarray, np.ndarray, str]:
+    """
+    (ids, embeddings, catalog_hash) for every question, ordered by id.
+
+    The hash covers ids and question texts, so an edited question doesn't
+    resume a run scored against its old embedding.
+    """
+    rows = conn.execute("SELECT id, question FROM questions ORDER BY id;").fetchall()
+    ids = np.array([row[0] for row in rows], dtype=np.int64)
+    digest = hashlib.sha1(ids.tobytes())  # noqa: S324
+    for _, question in rows:
+        digest.update((question or "").encode("utf-8") + b"\0")
+    store = EmbeddingStore(conn, model)
+    embeddings = store.embeddings(
+        ids.tolist(), [row[1] for row in rows], lambda texts: encode(texts, name=model)
+    )
+    return ids, embeddings, digest.hexdigest()
+
+
+def _start_or_resume(
+    conn: sqlite3.Connection,
+    model: str,
+    threshold: float,
+    tile_rows: int,
+    ids: np.ndarray,
+    catalog_hash: str,
+    n_tiles: int,
+    resume: bool,
+) -> int:
+    """The unfinished run with identical inputs, or a new one."""
+    if resume:
+        row = conn.execute(
+            """
+            SELECT run_id FROM dedupe_runs
+            WHERE finished_at IS NULL
+              AND model = ? AND threshold = ? AND tile_rows = ? AND catalog_hash = ?
+            ORDER BY run_id DESC
+            LIMIT 1;
+            """,
+            (model, threshold, tile_rows, catalog_hash),
+        ).fetchone()
+        if row:
+            return row[0]
+    with conn:
+        cur = conn.execute(
+            """
+            INSERT INTO dedupe_runs
+                (model, threshold, tile_rows, catalog_hash, n_questions, n_tiles)
+            VALUES (?, ?, ?, ?, ?, ?);
+            """,
+            (model, threshold, tile_rows, catalog_hash, len(ids), n_tiles),
+        )
+    return cur.lastrowid
+
+
+def _build_clusters(conn: sqlite3.Connection, run_id: int, ids: np.ndarray) -> None:
+    pairs = np.array(
+        conn.execute(
+            "SELECT question_a, question_b FROM dedupe_pairs WHERE run_id = ?;", (run_id,)
+        ).fetchall(),
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    labels = connected_components(
+        len(ids), np.searchsorted(ids, pairs[:, 0]), np.searchsorted(ids, pairs[:, 1])
+    )
+    roots, sizes = np.unique(labels, return_counts=True)
+    cluster_of = {root: n for n, root in enumerate(roots[sizes >= 2].tolist(), start=1)}
+    with conn:
+        conn.execute("DELETE FROM dedupe_clusters WHERE run_id = ?;", (run_id,))
+        conn.executemany(
+            "INSERT INTO dedupe_clusters (run_id, cluster_id, question_id) VALUES (?, ?, ?);",
+            (
+                (run_id, cluster_of[label], qid)
+                for qid, label in zip(ids.tolist(), labels.tolist(), strict=True)
+                if label in cluster_of
+            ),
+        )
+        conn.execute(
+            """
+            UPDATE dedupe_runs
+            SET finished_at = strftime('%Y-%m-%dT%H:%M:%SZ', 'now')
+            WHERE run_id = ?;
+            """,
+            (run_id,),
+        )
+
+
+def _save_tile(
+    conn: sqlite3.Connection,
+    run_id: int,
+    row_start: int,
+    col_start: int,
+    ids_a: np.ndarray,
+    ids_b: np.ndarray,
+    scores: np.ndarray,
+) -> None:
+    """Store a tile's pairs and mark it done, atomically."""
+    with conn:
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO dedupe_pairs (run_id, question_a, question_b, score)
+            VALUES (?, ?, ?, ?);
+            """,
+            zip(
+                [run_id] * len(ids_a),
+                ids_a.tolist(),
+                ids_b.tolist(),
+                np.round(scores, 4).tolist(),
+                strict=True,
+            ),
+        )
+        conn.execute(
+            "INSERT INTO dedupe_tiles (run_id, row_start, col_start, pairs) VALUES (?, ?, ?, ?);",
+            (run_id, row_start, col_start, len(ids_a)),
+        )
+
+
+def scan_catalog(
+    conn: sqlite3.Connection,
+    threshold: float = 0.85,
+    model: str = DEFAULT_MODEL,
+    tile_rows: int = TILE_ROWS,
+    workers: int = WORKERS,
+    resume: bool = True,
+    progress: Callable[[int, int], None] | None = None,
+) -> int:
+    """
+    Run (or finish) a whole-catalog scan; returns its run_id.
+
+    Args:
+        threshold (float): cosine similarity cut-off (0-1)
+        tile_rows (int): rows per tile side
+        workers (int): worker processes, 0 = one per CPU
+        resume (bool): continue the latest unfinished run with the same
+            model/threshold/tile size over the same questions (ids and texts)
+        progress: called with (tiles_done, tiles_total) after each tile
+    """
+    create_dedupe_tables(conn)
+    ids, embeddings, catalog_hash = _catalog(conn, model)
+    starts = range(0, len(ids), tile_rows)
+    tiles = [(r, c) for r in starts for c in starts if c >= r]
+    run_id = _start_or_resume(
+        conn, model, threshold, tile_rows, ids, catalog_hash, len(tiles), resume
+    )
+
+    done = {
+        (row[0], row[1])
+        for row in conn.execute(
+            "SELECT row_start, col_start FROM dedupe_tiles WHERE run_id = ?;", (run_id,)
+        )
+    }
+    todo = [tile for tile in tiles if tile not in done]
+
+    if todo:
+        with tempfile.TemporaryDirectory() as tmp:
+            npy_path = os.path.join(tmp, "embeddings.npy")
+            np.save(npy_path, np.ascontiguousarray(embeddings, dtype=np.float32))
+            del embeddings
+
+            with ProcessPoolExecutor(
+                max_workers=workers or os.cpu_count(),
+                initializer=_init_worker,
+                initargs=(npy_path,),
+            ) as pool:
+                futures = [pool.submit(_scan_tile, r, c, tile_rows, threshold) for r, c in todo]
+                try:
+                    for future in as_completed(futures):
+                        r, c, i, j, scores = future.result()
+                        _save_tile(conn, run_id, r, c, ids[i], ids[j], scores)
+                        done.add((r, c))
+                        if progress:
+                            progress(len(done), len(tiles))
+                except BaseException:
+                    # don't wait for queued tiles on Ctrl-C; finished ones are saved
+                    pool.shutdown(cancel_futures=True)
+                    raise
+
+    _build_clusters(conn, run_id, ids)
+    return run_id
+
+
+def load_clusters(conn: sqlite3.Connection, run_id: int) -> list[dict]:
+    """
+    Clusters of a finished run, largest first.
+
+    Returns:
+        list of {"cluster_id", "topics", "max_score", "questions": [...]}
+        where each question is id/topic/question/answer/status
+    """
+    cur = conn.execute(
+        """
+        SELECT c.cluster_id, q.id, q.topic, q.question, q.answer, c.status
+        FROM dedupe_clusters c
+        JOIN questions q ON q.id = c.question_id
+        WHERE c.run_id = ?
+        ORDER BY c.cluster_id, q.id;
+        """,
+        (run_id,),
+    )
+    clusters = {}
+    for cluster_id, qid, topic, question, answer, status in cur:
+        cluster = clusters.setdefault(cluster_id, {"cluster_id": cluster_id, "questions": []})
+        cluster["questions"].append(
+            {"id": qid, "topic": topic, "question": question, "answer": answer, "status": status}
+        )
+
+    best = dict(
+        conn.execute(
+            """
+            SELECT ca.cluster_id, MAX(p.score)
+            FROM dedupe_pairs p
+            JOIN dedupe_clusters ca
+                ON ca.run_id = p.run_id AND ca.question_id = p.question_a
+            JOIN dedupe_clusters cb
+                ON cb.run_id = p.run_id AND cb.question_id = p.question_b
+               AND cb.cluster_id = ca.cluster_id
+            WHERE p.run_id = ?
+            GROUP BY ca.cluster_id;
+            """,
+            (run_id,),
+        ).fetchall()
+    )
+    for cluster in clusters.values():
+        cluster["topics"] = sorted({q["topic"] or "" for q in cluster["questions"]})
+        cluster["max_score"] = best.get(cluster["cluster_id"])
+    return sorted(clusters.values(), key=lambda c: -len(c["questions"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan the whole catalog for duplicates.")
+    parser.add_argument("db_path", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.85)
+    parser.add_argument("--tile-rows", type=int, default=TILE_ROWS)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--fresh", action="store_true", help="start a new run, don't resume")
+    args = parser.parse_args()
+
+    def report(done, total):
+        print(f"\r🔎 {done}/{total} tiles", end="", flush=True)
+
+    conn = sqlite3.connect(args.db_path)
+    run_id = scan_catalog(
+        conn,
+        threshold=args.threshold,
+        tile_rows=args.tile_rows,
+        workers=args.workers,
+        resume=not args.fresh,
+        progress=report,
+    )
+    clusters = load_clusters(conn, run_id)
+    conn.close()
+
+    cross_topic = sum(len(c["topics"]) > 1 for c in clusters)
+    print(f"\n✅ Run {run_id}: {len(clusters)} clusters ({cross_topic} span several topics)")
+
+
+if __name__ == "__main__":
+    main()
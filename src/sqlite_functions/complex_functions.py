@@ -1,11 +1,10 @@
-from collections import deque
-from pathlib import Path
 import sqlite3
 
-import numpy as np
-from sentence_transformers import SentenceTransformer
-
-DB_PATH = Path(__file__).parent.parent.parent / "data" / "database.db"
+from src.sqlite_functions.basic_functions import DB_PATH
+from src.sqlite_functions.catalog_dedupe import load_clusters, scan_catalog
+from src.sqlite_functions.embedding_model import DEFAULT_MODEL, encode
+from src.sqlite_functions.embedding_store import EmbeddingStore
+from src.sqlite_functions.similarity import duplicate_groups
 
 
 def normalize_text(x: str) -> str:
@@ -23,9 +22,8 @@ def check_for_duplicates(topic: str, threshold: float = 0.6) -> list:
     Returns:
         list of clusters, where each cluster is a list of dicts with id/question/answer
     """
-    model = SentenceTransformer("all-MiniLM-L6-v2")
-
-    with sqlite3.connect(DB_PATH) as conn:
+    conn = sqlite3.connect(DB_PATH)
+    try:
         cursor = conn.cursor()
         cursor.execute(
             "SELECT id, question, answer FROM questions WHERE topic = ?",
@@ -33,55 +31,33 @@ def check_for_duplicates(topic: str, threshold: float = 0.6) -> list:
         )
         rows = cursor.fetchall()
 
-    if not rows:
-        print(f"No questions found for topic: {topic}")
-        return []
-
-    ids = [row[0] for row in rows]
-    questions = [row[1] for row in rows]
-    answers = [row[2] for row in rows]
-
-    # Compute embeddings (normalized so dot = cosine similarity)
-    embeddings = model.encode(questions, normalize_embeddings=True)
-    embeddings = np.asarray(embeddings, dtype=np.float32)
-
-    # Cosine similarity matrix
-    sim_matrix = embeddings @ embeddings.T
-    n = len(rows)
-
-    # Build adjacency graph
-    adj = [[] for _ in range(n)]
-    for i in range(n):
-        for j in range(i + 1, n):
-            score = float(sim_matrix[i, j])
-            if score >= threshold:
-                adj[i].append(j)
-                adj[j].append(i)
-
-    # Find connected components (clusters)
-    visited = [False] * n
-    clusters = []
-    for i in range(n):
-        if visited[i] or not adj[i]:
-            continue
-        comp = []
-        q = deque([i])
-        visited[i] = True
-        while q:
-            u = q.popleft()
-            comp.append(
-                {
-                    "id": ids[u],
-                    "question": questions[u],
-                    "answer": answers[u],
-                }
-            )
-            for v in adj[u]:
-                if not visited[v]:
-                    visited[v] = True
-                    q.append(v)
-        if len(comp) >= 2:  # only keep real clusters
-            clusters.append(comp)
+        if not rows:
+            print(f"No questions found for topic: {topic}")
+            return []
+
+        ids = [row[0] for row in rows]
+        questions = [row[1] for row in rows]
+        answers = [row[2] for row in rows]
+
+        # Embeddings (normalized so dot = cosine similarity), reused across runs
+        # (the model is only loaded if some question has no stored vector)
+        store = EmbeddingStore(conn, DEFAULT_MODEL)
+        embeddings = store.embeddings(ids, questions, encode)
+    finally:
+        conn.close()
+
+    # Thresholded, blocked cosine similarity + connected components
+    clusters = [
+        [
+            {
+                "id": ids[u],
+                "question": questions[u],
+                "answer": answers[u],
+            }
+            for u in group
+        ]
+        for group in duplicate_groups(embeddings, threshold)
+    ]
 
     # Print clusters for review
     for ci, comp in enumerate(clusters, start=1):
@@ -92,6 +68,29 @@ def check_for_duplicates(topic: str, threshold: float = 0.6) -> list:
     return clusters
 
 
+def check_catalog_for_duplicates(threshold: float = 0.85, workers: int = 0) -> list:
+    """
+    Find duplicate clusters across the whole database, regardless of topic.
+
+    Runs catalog_dedupe.scan_catalog on a process pool and resumes an
+    interrupted scan with the same settings.
+
+    Args:
+        threshold (float): Cosine similarity threshold (0-1).
+        workers (int): Worker processes, 0 = one per CPU.
+
+    Returns:
+        list of clusters (largest first), each a dict with cluster_id, topics,
+        max_score and questions (id/topic/question/answer/status dicts)
+    """
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        run_id = scan_catalog(conn, threshold=threshold, workers=workers)
+        return load_clusters(conn, run_id)
+    finally:
+        conn.close()
+
+
 def set_likelihood(question_id: int, likelihood: int):
     """Update likelihood for a specific question."""
     if likelihood < 1 or likelihood > 5:
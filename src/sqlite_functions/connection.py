@@ -0,0 +1,291 @@
+from contextvars import ContextVar
+import os
+from pathlib import Path
+import queue
+import sqlite3
+import threading
+import time
+import weakref
+
+from src.sqlite_functions import slow_query_log
+
+# -------------------------
+# Tunables (env overridable)
+# -------------------------
+
+POOL_SIZE = int(os.getenv("TRIVIA_DB_POOL_SIZE", "8"))
+BUSY_TIMEOUT_MS = int(os.getenv("TRIVIA_DB_BUSY_TIMEOUT_MS", "5000"))
+CACHE_SIZE_KIB = int(os.getenv("TRIVIA_DB_CACHE_SIZE_KIB", "16384"))
+MMAP_SIZE = int(os.getenv("TRIVIA_DB_MMAP_SIZE", str(128 * 1024 * 1024)))
+
+
+class QueryStats:
+    """Statements run and seconds spent in SQLite while tracking is on (see track_queries)."""
+
+    __slots__ = ("count", "seconds", "label")
+
+    def __init__(self, label: str | None = None):
+        self.count = 0
+        self.seconds = 0.0
+        self.label = label
+
+
+# stats for the request running in this thread / context, None when not tracking
+_query_stats: ContextVar[QueryStats | None] = ContextVar("trivia_query_stats", default=None)
+
+
+def track_queries(label: str | None = None) -> QueryStats:
+    """
+    Start counting statements run through PooledConnection in the current context.
+
+    Args:
+        label (str | None): what is running them (e.g. the endpoint), for the slow-query log
+    """
+    stats = QueryStats(label)
+    _query_stats.set(stats)
+    return stats
+
+
+def stop_tracking_queries() -> None:
+    _query_stats.set(None)
+
+
+def tracked(iterable, stats: QueryStats):
+    """
+    Iterate `iterable` with `stats` as the current QueryStats.
+
+    For streamed response bodies, which run after the request's tracking
+    has stopped. The stats are only current while an item is produced, and
+    closing this generator closes `iterable`.
+    """
+    it = iter(iterable)
+    try:
+        while True:
+            token = _query_stats.set(stats)
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            finally:
+                _query_stats.reset(token)
+            yield item
+    finally:
+        if hasattr(it, "close"):
+            it.close()
+
+
+class _TimedCursor(sqlite3.Cursor):
+    """
+    Cursor that times its statement's execute and fetch*() calls.
+
+    The time goes to the current QueryStats, if any, and once the
+    statement's running total passes the threshold it is written to the
+    slow-query log (once per statement). SQLite does most of a query's
+    work while rows are stepped through, so fetch time counts too. Rows
+    pulled by plain iteration are not timed, which keeps the per-row path
+    in C.
+    """
+
+    def _start(self, sql, params, stats, slow_log) -> None:
+        self.sql = sql
+        self.params = params
+        self.stats = stats
+        self.slow_log = slow_log
+        self.rows = None
+        self.elapsed = 0.0
+        self.logged = False
+        if stats is not None:
+            stats.count += 1
+
+    def _timed(self, method, *args):
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            if self.stats is not None:
+                self.stats.seconds += elapsed
+            self.elapsed += elapsed
+            if (
+                self.slow_log is not None
+                and not self.logged
+                and self.elapsed >= self.slow_log.threshold
+            ):
+                self.logged = True
+                self.slow_log.record(
+                    self.connection,
+                    self.sql,
+                    self.params,
+                    self.elapsed,
+                    endpoint=self.stats.label if self.stats is not None else None,
+                    rows=self.rows,
+                )
+
+    def execute(self, sql, parameters=(), /):
+        return self._timed(super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters, /):
+        if self.slow_log is None:
+            return self._timed(super().executemany, sql, seq_of_parameters)
+
+        # keep the first row (for EXPLAIN) and a count without materializing the input
+        self.rows = 0
+
+        def counted():
+            for row in seq_of_parameters:
+                if self.rows == 0:
+                    self.params = row
+                self.rows += 1
+                yield row
+
+        return self._timed(super().executemany, sql, counted())
+
+    def fetchone(self):
+        return self._timed(super().fetchone)
+
+    def fetchmany(self, size=None):
+        return self._timed(super().fetchmany, self.arraysize if size is None else size)
+
+    def fetchall(self):
+        return self._timed(super().fetchall)
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    sqlite3 connection that goes back to its pool on close().
+
+    Routes keep their existing `conn = get_db() ... conn.close()` shape;
+    close() just hands the connection back instead of tearing it down.
+    """
+
+    pool = None
+    # True while a caller holds it; a second close() must not return it twice
+    checked_out = False
+
+    def close(self) -> None:
+        if self.pool is None:
+            super().close()
+        elif self.checked_out:
+            self.checked_out = False
+            self.pool.release(self)
+
+    def really_close(self) -> None:
+        super().close()
+
+    def _tracked_cursor(self, sql, params) -> _TimedCursor | None:
+        """A timing cursor if metrics or the slow-query log want this statement, else None."""
+        stats = _query_stats.get()
+        slow_log = slow_query_log.slow_log
+        if stats is None and slow_log is None:
+            return None
+        cur = self.cursor(_TimedCursor)
+        cur._start(sql, params, stats, slow_log)
+        return cur
+
+    def execute(self, sql, parameters=(), /):
+        cur = self._tracked_cursor(sql, parameters)
+        if cur is None:
+            return super().execute(sql, parameters)
+        return cur.execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters, /):
+        cur = self._tracked_cursor(sql, None)
+        if cur is None:
+            return super().executemany(sql, seq_of_parameters)
+        return cur.executemany(sql, seq_of_parameters)
+
+
+# Pools to empty in a forked child; weak, so dropped pools (tests, benchmarks)
+# and their connections can still be garbage collected
+_live_pools = weakref.WeakSet()
+
+
+def _after_fork_in_child() -> None:
+    for pool in list(_live_pools):
+        pool._after_fork()
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+class ConnectionPool:
+    """
+    Small LIFO pool of long-lived SQLite connections.
+
+    Every connection is opened once with WAL journaling and the pragmas
+    below, then reused across requests. A pool size of 0 turns pooling
+    off (connect/close per call), which is handy for benchmarking.
+    """
+
+    def __init__(self, db_path: Path, size: int = POOL_SIZE):
+        self.db_path = Path(db_path)
+        self.size = size
+        self._idle = queue.LifoQueue(maxsize=max(size, 1))
+        self._wal_lock = threading.Lock()
+        self._wal_ready = False
+        # SQLite connections must not cross fork(); children start with an empty pool
+        self._inherited = []
+        _live_pools.add(self)
+
+    def _after_fork(self) -> None:
+        # keep the parent's connections referenced (not closed) so their file
+        # handles and locks aren't touched from the child
+        while True:
+            try:
+                self._inherited.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+    def _connect(self) -> PooledConnection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False,
+            factory=PooledConnection,
+        )
+        conn.row_factory = sqlite3.Row
+
+        # journal_mode is persistent in the DB file, only set it once per pool
+        with self._wal_lock:
+            if not self._wal_ready:
+                conn.execute("PRAGMA journal_mode = WAL;")
+                self._wal_ready = True
+
+        conn.execute("PRAGMA foreign_keys = ON;")
+        conn.execute("PRAGMA synchronous = NORMAL;")
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS};")
+        conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KIB};")
+        conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE};")
+        conn.execute("PRAGMA temp_store = MEMORY;")
+
+        if self.size > 0:
+            conn.pool = self
+        return conn
+
+    def acquire(self) -> PooledConnection:
+        """Hand out an idle connection, opening a new one if none is free."""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        conn.checked_out = True
+        return conn
+
+    def release(self, conn: PooledConnection) -> None:
+        """Return a connection to the pool (or close it if the pool is full)."""
+        if conn.in_transaction:
+            # never leak a half-finished transaction into the next request
+            conn.rollback()
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.really_close()
+
+    def close_all(self) -> None:
+        """Close every idle connection."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            conn.really_close()
@@ -0,0 +1,64 @@
+"""
+Process-wide, lazily loaded sentence-embedding model.
+
+sentence_transformers (and torch) are imported on the first encode() call,
+not at import time, so CLIs that never embed stay fast to start. The model
+is built once per process and per name, then reused by every caller.
+"""
+
+import os
+import threading
+
+import numpy as np
+
+DEFAULT_MODEL = os.getenv("TRIVIA_EMBED_MODEL", "all-MiniLM-L6-v2")
+
+# Sentences per forward pass
+BATCH_SIZE = int(os.getenv("TRIVIA_EMBED_BATCH_SIZE", "64"))
+
+# torch intra-op threads; 0 leaves torch's default (one per core)
+NUM_THREADS = int(os.getenv("TRIVIA_EMBED_THREADS", "0"))
+
+_lock = threading.Lock()
+_models = {}
+
+
+def get_model(name: str = DEFAULT_MODEL):
+    """The shared SentenceTransformer for `name`, loading it on first use."""
+    model = _models.get(name)
+    if model is not None:
+        return model
+    with _lock:
+        if name not in _models:
+            from sentence_transformers import SentenceTransformer
+            import torch
+
+            if NUM_THREADS > 0:
+                torch.set_num_threads(NUM_THREADS)
+            _models[name] = SentenceTransformer(name, device="cpu")
+        return _models[name]
+
+
+def encode(
+    texts: list[str],
+    name: str = DEFAULT_MODEL,
+    batch_size: int = BATCH_SIZE,
+) -> np.ndarray:
+    """
+    L2-normalized float32 embeddings, one row per text.
+
+    Args:
+        texts (list[str]): sentences to embed
+        name (str): model name, see get_model()
+        batch_size (int): sentences per forward pass
+    """
+    if not texts:
+        return np.empty((0, 0), dtype=np.float32)
+    vectors = get_model(name).encode(
+        texts,
+        batch_size=batch_size,
+        normalize_embeddings=True,
+        convert_to_numpy=True,
+        show_progress_bar=False,
+    )
+    return np.asarray(vectors, dtype=np.float32)
@@ -0,0 +1,150 @@
+"""
+Persistent question embeddings keyed by question id + content hash.
+
+Vectors live in SQLite as raw float16/float32 blobs next to the questions
+they describe. A row is reused only if both the model name and the hash of
+the question text still match; editing a question (e.g. via modify_entry)
+also drops its row through a trigger. Each run therefore encodes only new
+or edited questions.
+"""
+
+from collections.abc import Callable, Sequence
+import hashlib
+import json
+import os
+import sqlite3
+
+import numpy as np
+
+STORE_DTYPE = os.getenv("TRIVIA_EMBED_DTYPE", "float16")
+
+EMBEDDING_SCHEMA = """
+CREATE TABLE IF NOT EXISTS question_embeddings (
+    question_id INTEGER PRIMARY KEY,
+    model TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    dim INTEGER NOT NULL,
+    dtype TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    FOREIGN KEY (question_id) REFERENCES questions(id) ON DELETE CASCADE
+);
+
+CREATE TRIGGER IF NOT EXISTS question_embeddings_invalidate
+AFTER UPDATE OF question ON questions
+WHEN OLD.question IS NOT NEW.question
+BEGIN
+    DELETE FROM question_embeddings WHERE question_id = NEW.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS question_embeddings_cleanup
+AFTER DELETE ON questions
+BEGIN
+    DELETE FROM question_embeddings WHERE question_id = OLD.id;
+END;
+"""
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha1((text or "").encode("utf-8")).hexdigest()  # noqa: S324
+
+
+class EmbeddingStore:
+    """
+    Read-through cache of sentence embeddings in the question database.
+
+    Args:
+        conn (sqlite3.Connection): open connection to the trivia database
+        model_name (str): embeddings from any other model are treated as stale
+        dtype (str): storage type, "float16" (half the size) or "float32"
+    """
+
+    def __init__(self, conn: sqlite3.Connection, model_name: str, dtype: str = STORE_DTYPE):
+        self.conn = conn
+        self.model_name = model_name
+        self.dtype = np.dtype(dtype)
+        conn.executescript(EMBEDDING_SCHEMA)
+
+    def load(self, ids: Sequence[int]) -> dict[int, tuple[str, bytes, str]]:
+        """Stored (content_hash, blob, dtype) for the given ids and this model."""
+        cur = self.conn.execute(
+            """
+            SELECT question_id, content_hash, vector, dtype
+            FROM question_embeddings
+            WHERE model = ?
+              AND question_id IN (SELECT value FROM json_each(?));
+            """,
+            (self.model_name, json.dumps(list(ids))),
+        )
+        return {row[0]: (row[1], row[2], row[3]) for row in cur}
+
+    def save(self, ids: Sequence[int], texts: Sequence[str], vectors: np.ndarray) -> None:
+        vectors = np.ascontiguousarray(vectors, dtype=self.dtype)
+        rows = (
+            (
+                qid,
+                self.model_name,
+                content_hash(text),
+                vectors.shape[1],
+                self.dtype.name,
+                vec.tobytes(),
+            )
+            for qid, text, vec in zip(ids, texts, vectors, strict=True)
+        )
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT INTO question_embeddings
+                    (question_id, model, content_hash, dim, dtype, vector)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(question_id) DO UPDATE SET
+                    model = excluded.model,
+                    content_hash = excluded.content_hash,
+                    dim = excluded.dim,
+                    dtype = excluded.dtype,
+                    vector = excluded.vector;
+                """,
+                rows,
+            )
+
+    def embeddings(
+        self,
+        ids: Sequence[int],
+        texts: Sequence[str],
+        encode: Callable[[list[str]], np.ndarray],
+    ) -> np.ndarray:
+        """
+        Embeddings for `texts` (row i belongs to ids[i]) as a float32 matrix.
+
+        Only questions without a fresh stored vector are passed to `encode`.
+        Stored blobs are joined and viewed with np.frombuffer, so loading
+        costs one memcpy for the whole batch rather than a Python object
+        per float.
+        """
+        stored = self.load(ids)
+
+        fresh = {}
+        stale_idx = []
+        for i, (qid, text) in enumerate(zip(ids, texts, strict=True)):
+            hit = stored.get(qid)
+            if hit and hit[0] == content_hash(text) and hit[2] == self.dtype.name:
+                fresh[i] = hit[1]
+            else:
+                stale_idx.append(i)
+
+        encoded = None
+        if stale_idx:
+            encoded = np.asarray(encode([texts[i] for i in stale_idx]), dtype=np.float32)
+            self.save([ids[i] for i in stale_idx], [texts[i] for i in stale_idx], encoded)
+
+        if not fresh:
+            return encoded if encoded is not None else np.empty((0, 0), dtype=np.float32)
+
+        fresh_idx = sorted(fresh)
+        cached = np.frombuffer(b"".join(fresh[i] for i in fresh_idx), dtype=self.dtype)
+        cached = cached.reshape(len(fresh_idx), -1)
+
+        out = np.empty((len(ids), cached.shape[1]), dtype=np.float32)
+        out[fresh_idx] = cached
+        if encoded is not None:
+            out[stale_idx] = encoded
+        return out
@@ -0,0 +1,214 @@
+"""
+Per-(user, topic) progress counters kept in sync with the progress table by triggers.
+
+progress_summary holds correct/wrong/total counts so the stats, user home
+and admin pages read O(topics) rows instead of aggregating every progress
+row on each view. Questions without a topic are stored under '' (read
+them back with NULLIF(topic, '')).
+
+Check or rebuild from the command line:
+
+    python src/sqlite_functions/progress_summary.py database/database.db [--rebuild]
+"""
+
+import argparse
+import sqlite3
+
+SUMMARY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS progress_summary (
+    user_name VARCHAR(100) NOT NULL,
+    topic TEXT NOT NULL,
+    correct_count INTEGER NOT NULL DEFAULT 0,
+    wrong_count INTEGER NOT NULL DEFAULT 0,
+    total_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_name, topic)
+) WITHOUT ROWID;
+"""
+
+# Shared trigger bodies: add NEW's row to its (user, topic) bucket / take OLD's away
+_ADD_NEW = """
+    INSERT INTO progress_summary (user_name, topic, correct_count, wrong_count, total_count)
+    SELECT NEW.user_name, IFNULL(q.topic, ''), NEW.status = 'correct', NEW.status = 'wrong', 1
+    FROM questions q
+    WHERE q.id = NEW.question_id
+    ON CONFLICT(user_name, topic) DO UPDATE SET
+        correct_count = correct_count + excluded.correct_count,
+        wrong_count = wrong_count + excluded.wrong_count,
+        total_count = total_count + 1;
+"""
+
+_REMOVE_OLD = """
+    UPDATE progress_summary
+    SET correct_count = correct_count - (OLD.status = 'correct'),
+        wrong_count = wrong_count - (OLD.status = 'wrong'),
+        total_count = total_count - 1
+    WHERE user_name = OLD.user_name
+      AND topic = (SELECT IFNULL(topic, '') FROM questions WHERE id = OLD.question_id);
+    DELETE FROM progress_summary WHERE user_name = OLD.user_name AND total_count <= 0;
+"""
+
+SUMMARY_TRIGGERS = f"""
+CREATE TRIGGER IF NOT EXISTS progress_summary_insert
+AFTER INSERT ON progress
+BEGIN
+    {_ADD_NEW}
+END;
+
+CREATE TRIGGER IF NOT EXISTS progress_summary_delete
+AFTER DELETE ON progress
+BEGIN
+    {_REMOVE_OLD}
+END;
+
+CREATE TRIGGER IF NOT EXISTS progress_summary_update
+AFTER UPDATE OF user_name, question_id, status ON progress
+WHEN OLD.status IS NOT NEW.status
+  OR OLD.user_name IS NOT NEW.user_name
+  OR OLD.question_id IS NOT NEW.question_id
+BEGIN
+    {_REMOVE_OLD}
+    {_ADD_NEW}
+END;
+
+-- Runs before the ON DELETE CASCADE removes the progress rows; by then the
+-- question is gone, so progress_summary_delete finds no topic and does nothing.
+CREATE TRIGGER IF NOT EXISTS progress_summary_question_delete
+BEFORE DELETE ON questions
+BEGIN
+    UPDATE progress_summary
+    SET correct_count = correct_count - (
+            SELECT COUNT(*) FROM progress p
+            WHERE p.question_id = OLD.id
+              AND p.user_name = progress_summary.user_name
+              AND p.status = 'correct'),
+        wrong_count = wrong_count - (
+            SELECT COUNT(*) FROM progress p
+            WHERE p.question_id = OLD.id
+              AND p.user_name = progress_summary.user_name
+              AND p.status = 'wrong'),
+        total_count = total_count - (
+            SELECT COUNT(*) FROM progress p
+            WHERE p.question_id = OLD.id
+              AND p.user_name = progress_summary.user_name)
+    WHERE topic = IFNULL(OLD.topic, '')
+      AND user_name IN (SELECT user_name FROM progress WHERE question_id = OLD.id);
+    DELETE FROM progress_summary WHERE total_count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS progress_summary_question_topic
+AFTER UPDATE OF topic ON questions
+WHEN OLD.topic IS NOT NEW.topic
+BEGIN
+    UPDATE progress_summary
+    SET correct_count = correct_count - (
+            SELECT COUNT(*) FROM progress p
+            WHERE p.question_id = OLD.id
+              AND p.user_name = progress_summary.user_name
+              AND p.status = 'correct'),
+        wrong_count = wrong_count - (
+            SELECT COUNT(*) FROM progress p
+            WHERE p.question_id = OLD.id
+              AND p.user_name = progress_summary.user_name
+              AND p.status = 'wrong'),
+        total_count = total_count - (
+            SELECT COUNT(*) FROM progress p
+            WHERE p.question_id = OLD.id
+              AND p.user_name = progress_summary.user_name)
+    WHERE topic = IFNULL(OLD.topic, '')
+      AND user_name IN (SELECT user_name FROM progress WHERE question_id = OLD.id);
+    DELETE FROM progress_summary WHERE total_count <= 0;
+
+    INSERT INTO progress_summary (user_name, topic, correct_count, wrong_count, total_count)
+    SELECT p.user_name, IFNULL(NEW.topic, ''),
+           SUM(p.status = 'correct'), SUM(p.status = 'wrong'), COUNT(*)
+    FROM progress p
+    WHERE p.question_id = NEW.id
+    GROUP BY p.user_name
+    ON CONFLICT(user_name, topic) DO UPDATE SET
+        correct_count = correct_count + excluded.correct_count,
+        wrong_count = wrong_count + excluded.wrong_count,
+        total_count = total_count + excluded.total_count;
+END;
+"""  # noqa: S608
+
+# The summary as it should be, straight from the source tables
+_EXPECTED_SQL = """
+    SELECT
+        p.user_name AS user_name,
+        IFNULL(q.topic, '') AS topic,
+        SUM(CASE WHEN p.status = 'correct' THEN 1 ELSE 0 END) AS correct_count,
+        SUM(CASE WHEN p.status = 'wrong' THEN 1 ELSE 0 END) AS wrong_count,
+        COUNT(*) AS total_count
+    FROM progress p
+    JOIN questions q ON q.id = p.question_id
+    GROUP BY p.user_name, IFNULL(q.topic, '')
+"""
+
+
+def create_progress_summary(conn: sqlite3.Connection) -> None:
+    """Create the summary table + triggers, backfilling it the first time."""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'progress_summary';"
+    ).fetchone()
+    conn.execute(SUMMARY_SCHEMA)
+    conn.executescript(SUMMARY_TRIGGERS)
+    if not exists:
+        rebuild_progress_summary(conn)
+
+
+def rebuild_progress_summary(conn: sqlite3.Connection) -> None:
+    """Recompute the whole summary table from progress + questions."""
+    with conn:
+        conn.execute("DELETE FROM progress_summary;")
+        conn.execute(
+            f"""
+            INSERT INTO progress_summary (user_name, topic, correct_count, wrong_count, total_count)
+            {_EXPECTED_SQL};
+            """  # noqa: S608
+        )
+
+
+def check_progress_summary(conn: sqlite3.Connection) -> list[tuple]:
+    """
+    Compare the summary table against a fresh aggregate.
+
+    Returns:
+        list of (user_name, topic) keys whose counts disagree (empty if consistent)
+    """
+    summary = (
+        "SELECT user_name, topic, correct_count, wrong_count, total_count FROM progress_summary"
+    )
+    cur = conn.execute(
+        f"""
+        SELECT user_name, topic FROM ({_EXPECTED_SQL} EXCEPT {summary})
+        UNION
+        SELECT user_name, topic FROM ({summary} EXCEPT {_EXPECTED_SQL});
+        """  # noqa: S608
+    )
+    return sorted({(row[0], row[1]) for row in cur.fetchall()})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check or rebuild progress_summary.")
+    parser.add_argument("db_path")
+    parser.add_argument("--rebuild", action="store_true", help="rebuild if out of sync")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db_path)
+    create_progress_summary(conn)
+    mismatches = check_progress_summary(conn)
+
+    if not mismatches:
+        print("✅ progress_summary is consistent.")
+    else:
+        print(f"⚠️ {len(mismatches)} (user, topic) rows out of sync.")
+        for user_name, topic in mismatches[:20]:
+            print(f"  {user_name!r} / {topic!r}")
+        if args.rebuild:
+            rebuild_progress_summary(conn)
+            print("✅ progress_summary rebuilt.")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Per-user progress generation counter, bumped by triggers on every progress write.
+
+The user-facing pages (user home, stats, the stats question lists) build
+their ETags from it, so a repeat request can be answered with
+304 Not Modified after one primary-key lookup. A user without a row has
+never written progress and is at version 0.
+"""
+
+import sqlite3
+
+VERSION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS progress_version (
+    user_name VARCHAR(100) PRIMARY KEY,
+    version INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def _bump(ref: str) -> str:
+    return f"""
+    INSERT INTO progress_version (user_name, version) VALUES ({ref}.user_name, 1)
+    ON CONFLICT(user_name) DO UPDATE SET version = version + 1;
+    """  # noqa: S608
+
+
+VERSION_TRIGGERS = f"""
+CREATE TRIGGER IF NOT EXISTS progress_version_insert
+AFTER INSERT ON progress
+BEGIN
+    {_bump("NEW")}
+END;
+
+CREATE TRIGGER IF NOT EXISTS progress_version_update
+AFTER UPDATE ON progress
+BEGIN
+    {_bump("NEW")}
+END;
+
+CREATE TRIGGER IF NOT EXISTS progress_version_delete
+AFTER DELETE ON progress
+BEGIN
+    {_bump("OLD")}
+END;
+"""
+
+
+def create_progress_version(conn: sqlite3.Connection) -> None:
+    conn.execute(VERSION_SCHEMA)
+    conn.executescript(VERSION_TRIGGERS)
+
+
+def progress_version(conn: sqlite3.Connection, user_name: str) -> int:
+    row = conn.execute(
+        "SELECT version FROM progress_version WHERE user_name = ?;", (user_name,)
+    ).fetchone()
+    return row[0] if row else 0
@@ -0,0 +1,135 @@
+import atexit
+from collections.abc import Callable, Iterable
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+FLUSH_ROWS = int(os.getenv("TRIVIA_PROGRESS_FLUSH_ROWS", "500"))
+FLUSH_SECONDS = float(os.getenv("TRIVIA_PROGRESS_FLUSH_SECONDS", "2.0"))
+
+# Rows for unknown question ids are skipped instead of failing the whole batch
+UPSERT_PROGRESS_SQL = """
+    INSERT INTO progress (user_name, question_id, status, updated_at)
+    SELECT ?, ?, ?, ?
+    WHERE EXISTS (SELECT 1 FROM questions WHERE id = ?)
+    ON CONFLICT(user_name, question_id)
+    DO UPDATE SET
+        status = excluded.status,
+        updated_at = excluded.updated_at;
+"""
+
+
+def utc_timestamp() -> str:
+    """Same format as SQLite's CURRENT_TIMESTAMP."""
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+
+
+def upsert_progress(conn: sqlite3.Connection, rows: Iterable[tuple[str, int, str, str]]) -> int:
+    """
+    Apply many (user_name, question_id, status, updated_at) upserts in one transaction.
+
+    Returns:
+        int: number of rows written (unknown question ids are skipped)
+    """
+    params = ((user, qid, status, ts, qid) for user, qid, status, ts in rows)
+    with conn:
+        cur = conn.executemany(UPSERT_PROGRESS_SQL, params)
+    return cur.rowcount
+
+
+class ProgressWriteBehind:
+    """
+    Buffers progress upserts in memory and writes them in batches.
+
+    Repeated updates to the same (user_name, question_id) collapse to the
+    latest one. The buffer is flushed by a background thread once it holds
+    `max_rows` entries or its oldest entry is `max_delay` seconds old, and
+    once more at interpreter exit. Anything still buffered is lost if the
+    process is killed, so this is opt-in.
+    """
+
+    def __init__(
+        self,
+        get_conn: Callable[[], sqlite3.Connection],
+        max_rows: int = FLUSH_ROWS,
+        max_delay: float = FLUSH_SECONDS,
+    ):
+        self.get_conn = get_conn
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self._pending = {}
+        self._oldest = None
+        self._cond = threading.Condition()
+        self._thread = None
+        self._closed = False
+
+    def submit(self, user_name: str, updates: Iterable[tuple[int, str]]) -> None:
+        ts = utc_timestamp()
+        with self._cond:
+            for qid, status in updates:
+                self._pending[(user_name, qid)] = (status, ts)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="progress-write-behind", daemon=True
+                )
+                self._thread.start()
+                atexit.register(self.close)
+            if len(self._pending) >= self.max_rows:
+                self._cond.notify()
+
+    def _take(self) -> list[tuple[str, int, str, str]]:
+        rows = [(user, qid, status, ts) for (user, qid), (status, ts) in self._pending.items()]
+        self._pending = {}
+        self._oldest = None
+        return rows
+
+    def flush(self) -> int:
+        with self._cond:
+            rows = self._take()
+        return self._write(rows)
+
+    def _write(self, rows: list) -> int:
+        if not rows:
+            return 0
+        conn = self.get_conn()
+        try:
+            return upsert_progress(conn, rows)
+        except sqlite3.Error:
+            logger.exception("Dropping %d buffered progress updates", len(rows))
+            return 0
+        finally:
+            conn.close()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed:
+                    if len(self._pending) >= self.max_rows:
+                        break
+                    if self._oldest is not None:
+                        remaining = self._oldest + self.max_delay - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    else:
+                        self._cond.wait()
+                rows = self._take()
+                closed = self._closed
+            self._write(rows)
+            if closed:
+                return
+
+    def close(self) -> None:
+        """Stop the background thread and flush whatever is left."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=self.max_delay + 5)
+        self.flush()
@@ -0,0 +1,266 @@
+"""
+Leitner-box spaced-repetition scheduler backed by SQLite.
+
+Each (user, topic, question) gets a row in review_schedule with a box and a
+due time. Marking a card correct promotes it one box and pushes it out by
+that box's interval; marking it wrong drops it back to box 1, due now.
+Triggers on progress keep the schedule current, whichever code path wrote
+the progress row.
+
+The (user_name, topic, due_at, likelihood DESC, jitter) index is the
+per-user priority queue: picking the next n due cards is an ordered index
+range scan, O(log N + n), regardless of topic size.
+"""
+
+from collections import deque
+import json
+import os
+import sqlite3
+import time
+
+# Leitner boxes: 0 = never seen, 1 = missed (due immediately), 2..5 = learned
+MAX_BOX = 5
+BOX_INTERVALS = {
+    1: 0,
+    2: 1 * 86400,
+    3: 3 * 86400,
+    4: 7 * 86400,
+    5: 21 * 86400,
+}
+
+# Due reviews served before each never-seen card when both are waiting
+REVIEWS_PER_NEW = max(int(os.getenv("TRIVIA_REVIEWS_PER_NEW", "1")), 1)
+
+_NOW = "CAST(strftime('%s', 'now') AS INTEGER)"
+_JITTER = "(abs(random()) % 1000000)"
+
+
+def _interval_case(box_expr: str) -> str:
+    whens = " ".join(f"WHEN {box} THEN {secs}" for box, secs in BOX_INTERVALS.items())
+    return f"(CASE {box_expr} {whens} ELSE 0 END)"
+
+
+# box a card lands in after NEW.status, given its current `box`
+_PROMOTED = f"MIN(MAX(box, 1) + 1, {MAX_BOX})"
+
+# Move NEW's card into the box its status earns and set the matching due time
+_RESCHEDULE_NEW = f"""
+    INSERT INTO review_schedule (user_name, topic, question_id, box, due_at, likelihood, jitter)
+    SELECT NEW.user_name, IFNULL(q.topic, ''), q.id,
+           CASE NEW.status WHEN 'correct' THEN 2 WHEN 'wrong' THEN 1 ELSE 0 END,
+           CASE NEW.status
+               WHEN 'correct' THEN {_NOW} + {BOX_INTERVALS[2]}
+               WHEN 'wrong' THEN {_NOW}
+               ELSE 0
+           END,
+           IFNULL(q.likelihood, 3), {_JITTER}
+    FROM questions q
+    WHERE q.id = NEW.question_id
+    ON CONFLICT(user_name, topic, question_id) DO UPDATE SET
+        box = CASE NEW.status WHEN 'correct' THEN {_PROMOTED} WHEN 'wrong' THEN 1 ELSE 0 END,
+        due_at = CASE NEW.status
+            WHEN 'correct' THEN {_NOW} + {_interval_case(_PROMOTED)}
+            WHEN 'wrong' THEN {_NOW}
+            ELSE 0
+        END;
+"""  # noqa: S608
+
+SCHEDULE_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS review_schedule (
+    user_name VARCHAR(100) NOT NULL,
+    topic TEXT NOT NULL,
+    question_id INTEGER NOT NULL,
+    box INTEGER NOT NULL DEFAULT 0,
+    due_at INTEGER NOT NULL DEFAULT 0,
+    likelihood INTEGER NOT NULL DEFAULT 3,
+    jitter INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_name, topic, question_id),
+    FOREIGN KEY (question_id) REFERENCES questions(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS review_schedule_due_idx
+ON review_schedule(user_name, topic, due_at, likelihood DESC, jitter);
+
+CREATE INDEX IF NOT EXISTS review_schedule_question_idx
+ON review_schedule(question_id);
+
+CREATE TRIGGER IF NOT EXISTS review_schedule_progress_insert
+AFTER INSERT ON progress
+BEGIN
+    {_RESCHEDULE_NEW}
+END;
+
+-- fires for every upsert of an existing row, so repeat 'correct' marks keep promoting
+CREATE TRIGGER IF NOT EXISTS review_schedule_progress_update
+AFTER UPDATE OF status ON progress
+BEGIN
+    {_RESCHEDULE_NEW}
+END;
+
+-- a progress reset puts the card back to "never seen"
+CREATE TRIGGER IF NOT EXISTS review_schedule_progress_delete
+AFTER DELETE ON progress
+BEGIN
+    UPDATE review_schedule
+    SET box = 0, due_at = 0
+    WHERE user_name = OLD.user_name
+      AND topic = (SELECT IFNULL(topic, '') FROM questions WHERE id = OLD.question_id)
+      AND question_id = OLD.question_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS review_schedule_question_update
+AFTER UPDATE OF topic, likelihood ON questions
+BEGIN
+    UPDATE review_schedule
+    SET topic = IFNULL(NEW.topic, ''),
+        likelihood = IFNULL(NEW.likelihood, 3)
+    WHERE question_id = NEW.id;
+END;
+"""  # noqa: S608
+
+
+def create_schedule(conn: sqlite3.Connection) -> None:
+    """Create the schedule tables, indexes and progress triggers."""
+    conn.executescript(SCHEDULE_SCHEMA)
+
+
+_MISSING_SQL = """
+    FROM questions q
+    LEFT JOIN progress p
+        ON p.user_name = :user_name AND p.question_id = q.id
+    WHERE q.topic = :topic
+      AND NOT EXISTS (
+          SELECT 1 FROM review_schedule s
+          WHERE s.user_name = :user_name AND s.topic = q.topic AND s.question_id = q.id
+      )
+"""
+
+
+def _seed(conn: sqlite3.Connection, user_name: str, topic: str) -> None:
+    """
+    Copy the topic's questions that have no review_schedule row yet for the user.
+
+    An anti-join over the topic index, so it also picks up questions moved
+    into the topic or added with lower ids. The write transaction is only
+    opened when something is missing. Existing progress is honoured:
+    correct cards start in box 2 (due a day after they were marked), wrong
+    ones in box 1.
+    """
+    params = {"user_name": user_name, "topic": topic}
+    missing = conn.execute(
+        f"SELECT EXISTS (SELECT 1 {_MISSING_SQL});",  # noqa: S608
+        params,
+    ).fetchone()[0]
+    if not missing:
+        return
+
+    with conn:
+        conn.execute(
+            f"""
+            INSERT OR IGNORE INTO review_schedule
+                (user_name, topic, question_id, box, due_at, likelihood, jitter)
+            SELECT
+                :user_name, q.topic, q.id,
+                CASE p.status WHEN 'correct' THEN 2 WHEN 'wrong' THEN 1 ELSE 0 END,
+                CASE p.status
+                    WHEN 'correct' THEN CAST(strftime('%s', p.updated_at) AS INTEGER)
+                                        + {BOX_INTERVALS[2]}
+                    WHEN 'wrong' THEN CAST(strftime('%s', p.updated_at) AS INTEGER)
+                    ELSE 0
+                END,
+                IFNULL(q.likelihood, 3), {_JITTER}
+            {_MISSING_SQL};
+            """,  # noqa: S608
+            params,
+        )
+
+
+def _cards(conn: sqlite3.Connection, due_range: str, params: dict) -> list[dict]:
+    cur = conn.execute(
+        f"""
+        SELECT q.id, q.question, q.answer, q.likelihood, s.box
+        FROM review_schedule s
+        JOIN questions q ON q.id = s.question_id
+        WHERE s.user_name = :user_name
+          AND s.topic = :topic
+          AND {due_range}
+          AND s.question_id NOT IN (SELECT value FROM json_each(:exclude))
+        ORDER BY s.due_at, s.likelihood DESC, s.jitter
+        LIMIT :n;
+        """,  # noqa: S608
+        params,
+    )
+    return [
+        {
+            "id": row[0],
+            "question": row[1],
+            "answer": row[2],
+            "likelihood": row[3],
+            "box": row[4],
+        }
+        for row in cur.fetchall()
+    ]
+
+
+def interleave(reviews: list, new: list, n: int, reviews_per_new: int = REVIEWS_PER_NEW) -> list:
+    """
+    Merge due reviews and new cards: `reviews_per_new` reviews, then one new card.
+
+    Reviews lead, since missed cards are the most urgent. Once either list
+    runs out the other fills the rest, up to n cards.
+    """
+    reviews, new = deque(reviews), deque(new)
+    merged = []
+    while len(merged) < n and (reviews or new):
+        for _ in range(reviews_per_new):
+            if reviews and len(merged) < n:
+                merged.append(reviews.popleft())
+        if new and len(merged) < n:
+            merged.append(new.popleft())
+    return merged
+
+
+def next_cards(
+    conn: sqlite3.Connection,
+    user_name: str,
+    topic: str,
+    n: int = 10,
+    exclude: list[int] | tuple[int, ...] = (),
+) -> tuple[list[dict], int]:
+    """
+    The next `n` cards for a user in a topic.
+
+    Due reviews (missed cards and learned ones whose interval is up) are
+    ordered by due time, then likelihood (highest first), then a random
+    per-card tiebreak; never-seen cards by likelihood, then the tiebreak.
+    The two are merged by interleave(). Cards in `exclude` (e.g. ones
+    already on screen) are skipped.
+
+    Returns:
+        (cards, due) where due is the total number of cards due now
+    """
+    _seed(conn, user_name, topic)
+    now = int(time.time())
+    params = {
+        "user_name": user_name,
+        "topic": topic,
+        "now": now,
+        "exclude": json.dumps(list(exclude)),
+        "n": n,
+    }
+
+    # new cards sit at due_at 0; both halves are ordered ranges of review_schedule_due_idx
+    reviews = _cards(conn, "s.due_at > 0 AND s.due_at <= :now", params)
+    new = _cards(conn, "s.due_at = 0", params)
+    cards = interleave(reviews, new, n)
+
+    due = conn.execute(
+        """
+        SELECT COUNT(*)
+        FROM review_schedule
+        WHERE user_name = ? AND topic = ? AND due_at <= ?;
+        """,
+        (user_name, topic, now),
+    ).fetchone()[0]
+
+    return cards, due
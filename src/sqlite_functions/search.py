@@ -0,0 +1,179 @@
+"""
+FTS5 full-text index over questions, kept in sync by triggers.
+
+questions_fts is an external-content table: it stores only the inverted
+index and reads question/answer/topic text back from questions, so the
+catalog is not duplicated on disk. It also keeps 2- and 3-character
+prefix indexes, so the short trailing prefix of a search-as-you-type
+query is a single index lookup instead of a merge over every term it
+starts.
+
+Only queries with at most RANK_CANDIDATES matches are bm25-ranked. bm25
+has to score every match (and walk each term's whole doclist for its
+IDF), which for a one- or two-letter prefix is most of the catalog, so
+broader queries return their first matches in id order instead. The
+trade-off: while a query is that unselective its results are not sorted
+by relevance; typing another letter or word usually narrows it enough
+to be ranked again.
+"""
+
+import os
+import re
+import sqlite3
+
+from markupsafe import escape
+
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts USING fts5(
+    question,
+    answer,
+    topic,
+    content = 'questions',
+    content_rowid = 'id',
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS questions_fts_insert
+AFTER INSERT ON questions
+BEGIN
+    INSERT INTO questions_fts (rowid, question, answer, topic)
+    VALUES (NEW.id, NEW.question, NEW.answer, NEW.topic);
+END;
+
+CREATE TRIGGER IF NOT EXISTS questions_fts_delete
+AFTER DELETE ON questions
+BEGIN
+    INSERT INTO questions_fts (questions_fts, rowid, question, answer, topic)
+    VALUES ('delete', OLD.id, OLD.question, OLD.answer, OLD.topic);
+END;
+
+CREATE TRIGGER IF NOT EXISTS questions_fts_update
+AFTER UPDATE OF question, answer, topic ON questions
+BEGIN
+    INSERT INTO questions_fts (questions_fts, rowid, question, answer, topic)
+    VALUES ('delete', OLD.id, OLD.question, OLD.answer, OLD.topic);
+    INSERT INTO questions_fts (rowid, question, answer, topic)
+    VALUES (NEW.id, NEW.question, NEW.answer, NEW.topic);
+END;
+"""
+
+# Queries matching more questions than this are returned unranked, in id order
+RANK_CANDIDATES = int(os.getenv("TRIVIA_SEARCH_RANK_CANDIDATES", "1000"))
+
+# bm25 column weights: question text matters most, topic only as a filter
+BM25_WEIGHTS = (10.0, 5.0, 0.0)
+
+# Control characters used as highlight markers, swapped for <mark> after escaping
+_OPEN, _CLOSE = "\x02", "\x03"
+_TOKEN = re.compile(r"\w+")
+
+
+def create_search_index(conn: sqlite3.Connection) -> None:
+    """Create the FTS table + triggers, building the index the first time."""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'questions_fts';"
+    ).fetchone()
+    conn.executescript(SEARCH_SCHEMA)
+    if not exists:
+        rebuild_search_index(conn)
+
+
+def rebuild_search_index(conn: sqlite3.Connection) -> None:
+    """Re-derive the whole FTS index from the questions table."""
+    with conn:
+        conn.execute("INSERT INTO questions_fts (questions_fts) VALUES ('rebuild');")
+
+
+def build_match_query(text: str, topic: str | None = None) -> str | None:
+    """
+    Turn free text into a safe FTS5 MATCH expression.
+
+    Every word becomes a quoted term (so user input can't inject FTS
+    syntax) and the last one is a prefix match, for search-as-you-type.
+    Terms are ANDed and restricted to the question/answer columns.
+
+    Returns:
+        the MATCH string, or None if the text has no searchable words
+    """
+    tokens = _TOKEN.findall(text or "")
+    if not tokens:
+        return None
+    terms = [f'"{tok}"' for tok in tokens]
+    terms[-1] += "*"
+    query = "{question answer} : (" + " ".join(terms) + ")"
+    if topic:
+        topic_terms = " ".join(f'"{tok}"' for tok in _TOKEN.findall(topic))
+        if topic_terms:
+            query += f" AND topic : ({topic_terms})"
+    return query
+
+
+def _highlighted(text: str) -> str:
+    return str(escape(text or "")).replace(_OPEN, "<mark>").replace(_CLOSE, "</mark>")
+
+
+def search_questions(
+    conn: sqlite3.Connection, text: str, topic: str | None = None, limit: int = 20
+) -> list[dict]:
+    """
+    bm25-ranked matches with HTML-escaped, <mark>-highlighted question/answer.
+
+    Queries with more than RANK_CANDIDATES matches come back in id order
+    with a score of None (see the module docstring).
+
+    Args:
+        text (str): free-text query
+        topic (str | None): only return questions in exactly this topic
+        limit (int): max results
+    """
+    match = build_match_query(text, topic)
+    if match is None:
+        return []
+
+    # counting stops at the cap, so this stays cheap however broad the query is
+    candidates = conn.execute(
+        """
+        SELECT COUNT(*) FROM (
+            SELECT rowid FROM questions_fts WHERE questions_fts MATCH ? LIMIT ?
+        );
+        """,
+        (match, RANK_CANDIDATES + 1),
+    ).fetchone()[0]
+    if candidates <= RANK_CANDIDATES:
+        rank = f"bm25(questions_fts, {', '.join(map(str, BM25_WEIGHTS))})"
+        order = "rank"
+    else:
+        rank, order = "NULL", "questions_fts.rowid"
+
+    cur = conn.execute(
+        f"""
+        SELECT
+            q.id,
+            q.topic,
+            q.question,
+            q.answer,
+            highlight(questions_fts, 0, '{_OPEN}', '{_CLOSE}') AS question_hl,
+            highlight(questions_fts, 1, '{_OPEN}', '{_CLOSE}') AS answer_hl,
+            {rank} AS rank
+        FROM questions_fts
+        JOIN questions q ON q.id = questions_fts.rowid
+        WHERE questions_fts MATCH :match
+          AND (:topic IS NULL OR q.topic = :topic)
+        ORDER BY {order}
+        LIMIT :limit;
+        """,  # noqa: S608
+        {"match": match, "topic": topic or None, "limit": limit},
+    )
+    return [
+        {
+            "id": row[0],
+            "topic": row[1],
+            "question": row[2],
+            "answer": row[3],
+            "question_highlighted": _highlighted(row[4]),
+            "answer_highlighted": _highlighted(row[5]),
+            "score": None if row[6] is None else round(-row[6], 4),
+        }
+        for row in cur.fetchall()
+    ]
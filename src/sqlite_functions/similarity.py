@@ -0,0 +1,107 @@
+"""
+Blocked cosine-similarity search and connected components in NumPy.
+
+The full n x n similarity matrix is never materialized: rows are compared
+block by block against the rows after them (upper triangle only), and each
+block is thresholded with a mask straight into (i, j) edge arrays. Memory
+is bounded by `max_block_bytes` plus the edges found, so a 200k-question
+catalog fits in a few hundred MB instead of 160 GB.
+"""
+
+from collections.abc import Iterator
+import os
+
+import numpy as np
+
+# Upper bound on a single similarity block, in bytes (float32)
+MAX_BLOCK_BYTES = int(os.getenv("TRIVIA_DEDUPE_BLOCK_BYTES", str(64 * 1024 * 1024)))
+
+
+def _block_rows(n: int, max_block_bytes: int) -> int:
+    return max(1, min(n, max_block_bytes // (4 * max(n, 1))))
+
+
+def iter_similar_pairs(
+    embeddings: np.ndarray,
+    threshold: float,
+    max_block_bytes: int = MAX_BLOCK_BYTES,
+) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Yield (i, j, score) arrays for every pair i < j with cosine >= threshold.
+
+    Args:
+        embeddings (np.ndarray): (n, d) L2-normalized vectors
+        threshold (float): cosine similarity cut-off (0-1)
+        max_block_bytes (int): memory cap for one block of the similarity matrix
+    """
+    emb = np.ascontiguousarray(embeddings, dtype=np.float32)
+    n = emb.shape[0]
+    step = _block_rows(n, max_block_bytes)
+    for start in range(0, n, step):
+        stop = min(start + step, n)
+        block = emb[start:stop] @ emb[start:].T  # rows start..stop vs cols start..n
+        # within the diagonal square keep only j > i
+        rows, cols = np.nonzero(block >= threshold)
+        keep = cols > rows
+        rows, cols = rows[keep], cols[keep]
+        if rows.size:
+            yield rows + start, cols + start, block[rows, cols]
+
+
+def similar_pairs(
+    embeddings: np.ndarray,
+    threshold: float,
+    max_block_bytes: int = MAX_BLOCK_BYTES,
+) -> tuple[np.ndarray, np.ndarray]:
+    """All (i, j) index pairs above the threshold, as two int64 arrays."""
+    parts = list(iter_similar_pairs(embeddings, threshold, max_block_bytes))
+    if not parts:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    return (
+        np.concatenate([p[0] for p in parts]).astype(np.int64),
+        np.concatenate([p[1] for p in parts]).astype(np.int64),
+    )
+
+
+def connected_components(n: int, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+    """
+    Label each of n nodes with the smallest node index in its component.
+
+    Vectorized union-find: every round hooks the larger root of each edge
+    onto the smaller one (np.minimum.at), then flattens the forest with
+    pointer jumping, until both ends of every edge share a root. Takes
+    O(log n) rounds of O(n + edges) array work.
+    """
+    parent = np.arange(n, dtype=np.int64)
+    if len(i) == 0:
+        return parent
+    while True:
+        pi, pj = parent[i], parent[j]
+        if np.array_equal(pi, pj):
+            return parent
+        np.minimum.at(parent, np.maximum(pi, pj), np.minimum(pi, pj))
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+
+
+def duplicate_groups(
+    embeddings: np.ndarray,
+    threshold: float,
+    max_block_bytes: int = MAX_BLOCK_BYTES,
+) -> list[np.ndarray]:
+    """
+    Indices of each group of 2+ mutually connected similar embeddings.
+
+    Returns:
+        list of index arrays, ordered by their smallest index
+    """
+    n = len(embeddings)
+    i, j = similar_pairs(embeddings, threshold, max_block_bytes)
+    labels = connected_components(n, i, j)
+    order = np.argsort(labels, kind="stable")
+    _, starts, counts = np.unique(labels[order], return_index=True, return_counts=True)
+    return [order[s : s + c] for s, c in zip(starts, counts, strict=True) if c >= 2]
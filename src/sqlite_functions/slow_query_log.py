@@ -0,0 +1,238 @@
+"""
+Opt-in slow-query log for the pooled connections behind get_db().
+
+With TRIVIA_SLOW_QUERY_MS set, any statement whose execute + fetch time
+passes the threshold is written as one JSON line to a rotating log file:
+the whitespace-normalized SQL, the shapes of its bound parameters (types
+and lengths, never values), the endpoint that ran it and its
+EXPLAIN QUERY PLAN. Plans are cached per statement so a hot slow query
+isn't re-explained on every hit.
+
+Rank statements by total time with:
+
+    python src/sqlite_functions/slow_query_log.py
+    python src/sqlite_functions/slow_query_log.py logs/slow_queries.log* --top 10 --plans
+"""
+
+import argparse
+from collections import OrderedDict, defaultdict
+import datetime
+import glob
+import json
+import logging
+from logging.handlers import RotatingFileHandler
+import os
+from pathlib import Path
+import sqlite3
+import threading
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+# Statements slower than this are logged; 0 turns the log off
+SLOW_QUERY_MS = float(os.getenv("TRIVIA_SLOW_QUERY_MS", "0"))
+
+# "{pid}" in the path gives every gunicorn worker its own file
+LOG_PATH = os.getenv("TRIVIA_SLOW_QUERY_LOG", str(BASE_DIR / "logs" / "slow_queries.log"))
+LOG_MAX_BYTES = int(os.getenv("TRIVIA_SLOW_QUERY_LOG_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUPS = int(os.getenv("TRIVIA_SLOW_QUERY_LOG_BACKUPS", "5"))
+
+PLAN_CACHE_SIZE = 256
+
+
+def normalize_sql(sql: str) -> str:
+    return " ".join(sql.split())
+
+
+def _value_shape(value) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, str):
+        return f"str[{len(value)}]"
+    if isinstance(value, bytes | bytearray | memoryview):
+        return f"blob[{len(value)}]"
+    return type(value).__name__
+
+
+def param_shape(params) -> list | dict:
+    """Types (and lengths for text/blobs) of bound parameters, without their values."""
+    if params is None:
+        return []
+    if isinstance(params, dict):
+        return {name: _value_shape(value) for name, value in params.items()}
+    return [_value_shape(value) for value in params]
+
+
+class SlowQueryLog:
+    """
+    Writes slow statements, with their query plans, to a rotating JSON-lines file.
+
+    Args:
+        threshold_ms (float): log statements at least this slow
+        path (str): log file; "{pid}" is replaced by the process id
+        max_bytes (int): rotate once the file reaches this size
+        backups (int): rotated files to keep
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float,
+        path: str = LOG_PATH,
+        max_bytes: int = LOG_MAX_BYTES,
+        backups: int = LOG_BACKUPS,
+    ):
+        self.threshold = threshold_ms / 1000
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+        self._plans = OrderedDict()
+        self._logger = None
+
+    def _get_logger(self) -> logging.Logger:
+        # created on first use, i.e. after gunicorn has forked, so {pid} is the worker's
+        with self._lock:
+            if self._logger is None:
+                path = Path(self.path.format(pid=os.getpid()))
+                path.parent.mkdir(parents=True, exist_ok=True)
+                handler = RotatingFileHandler(
+                    path, maxBytes=self.max_bytes, backupCount=self.backups, encoding="utf-8"
+                )
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                logger = logging.getLogger(f"{__name__}.{id(self)}")
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                logger.addHandler(handler)
+                self._logger = logger
+            return self._logger
+
+    def plan(self, conn: sqlite3.Connection, sql: str, params) -> list[str] | None:
+        """EXPLAIN QUERY PLAN as indented lines, cached per statement text."""
+        key = normalize_sql(sql)
+        with self._lock:
+            if key in self._plans:
+                self._plans.move_to_end(key)
+                return self._plans[key]
+        try:
+            # bypass PooledConnection.execute so the EXPLAIN itself isn't traced
+            rows = sqlite3.Connection.execute(
+                conn, f"EXPLAIN QUERY PLAN {sql}", params or ()
+            ).fetchall()
+        except sqlite3.Error:
+            return None
+        depth = {0: -1}
+        lines = []
+        for node_id, parent, _, detail in rows:
+            depth[node_id] = depth.get(parent, -1) + 1
+            lines.append("  " * depth[node_id] + detail)
+        with self._lock:
+            self._plans[key] = lines
+            if len(self._plans) > PLAN_CACHE_SIZE:
+                self._plans.popitem(last=False)
+        return lines
+
+    def record(
+        self,
+        conn: sqlite3.Connection,
+        sql: str,
+        params,
+        seconds: float,
+        endpoint: str | None = None,
+        rows: int | None = None,
+    ) -> None:
+        """
+        Log one slow statement.
+
+        Args:
+            params: bound parameters (the first row for executemany)
+            rows (int | None): parameter rows, for executemany
+        """
+        entry = {
+            "ts": datetime.datetime.now(datetime.UTC).isoformat(timespec="milliseconds"),
+            "ms": round(seconds * 1000, 3),
+            "sql": normalize_sql(sql),
+            "params": param_shape(params),
+            "endpoint": endpoint,
+            "plan": self.plan(conn, sql, params),
+        }
+        if rows is not None:
+            entry["rows"] = rows
+        self._get_logger().info(json.dumps(entry))
+
+
+# The process-wide log used by PooledConnection, or None when disabled
+slow_log = SlowQueryLog(SLOW_QUERY_MS) if SLOW_QUERY_MS > 0 else None
+
+
+# -------------------------
+# Summary CLI
+# -------------------------
+
+
+def read_entries(paths: list[str]):
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+def summarize(entries) -> list[dict]:
+    """Group log entries by statement and rank them by total time."""
+    groups = defaultdict(list)
+    for entry in entries:
+        groups[entry["sql"]].append(entry)
+    summary = []
+    for sql, group in groups.items():
+        times = sorted(e["ms"] for e in group)
+        summary.append(
+            {
+                "sql": sql,
+                "count": len(times),
+                "total_ms": sum(times),
+                "mean_ms": sum(times) / len(times),
+                "p95_ms": times[min(len(times) - 1, int(len(times) * 0.95))],
+                "max_ms": times[-1],
+                "endpoints": sorted({e["endpoint"] for e in group if e.get("endpoint")}),
+                "plan": group[-1].get("plan"),
+            }
+        )
+    summary.sort(key=lambda s: s["total_ms"], reverse=True)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank logged slow queries by total time.")
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        help="log files (default: TRIVIA_SLOW_QUERY_LOG and its rotated backups)",
+    )
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--plans", action="store_true", help="print each statement's query plan")
+    parser.add_argument("--width", type=int, default=100, help="truncate SQL to this many chars")
+    args = parser.parse_args()
+
+    paths = args.paths or sorted(glob.glob(LOG_PATH.replace("{pid}", "*") + "*"))
+    if not paths:
+        print(f"ℹ️ No slow-query log found at {LOG_PATH}")
+        return
+
+    summary = summarize(read_entries(paths))
+    print(f"{'total ms':>10} {'count':>6} {'mean ms':>9} {'p95 ms':>9} {'max ms':>9}  sql")
+    for s in summary[: args.top]:
+        sql = s["sql"] if len(s["sql"]) <= args.width else s["sql"][: args.width - 3] + "..."
+        print(
+            f"{s['total_ms']:>10.1f} {s['count']:>6} {s['mean_ms']:>9.1f} "
+            f"{s['p95_ms']:>9.1f} {s['max_ms']:>9.1f}  {sql}"
+        )
+        if s["endpoints"]:
+            print(f"{'':>48}endpoints: {', '.join(s['endpoints'])}")
+        if args.plans and s["plan"]:
+            for line in s["plan"]:
+                print(f"{'':>48}{line}")
+
+
+if __name__ == "__main__":
+    main()
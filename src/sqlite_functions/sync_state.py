@@ -0,0 +1,116 @@
+"""
+Notion sync bookkeeping: a last_edited_time watermark and processed pages.
+
+The watermark lets a sync ask Notion only for pages edited since the last
+run. Because Notion timestamps are coarse, the query uses on_or_after, and
+pages seen at exactly the watermark are filtered out again by id.
+Recording archived_at lets pages be archived straight from this table,
+without querying Notion for them.
+"""
+
+import json
+import sqlite3
+
+SYNC_STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS notion_sync_state (
+    data_source_id TEXT PRIMARY KEY,
+    watermark TEXT,
+    updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS notion_synced_pages (
+    page_id TEXT PRIMARY KEY,
+    data_source_id TEXT NOT NULL,
+    last_edited_time TEXT NOT NULL,
+    synced_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%SZ', 'now')),
+    archived_at TEXT
+);
+
+CREATE INDEX IF NOT EXISTS notion_synced_pages_unarchived_idx
+ON notion_synced_pages(data_source_id) WHERE archived_at IS NULL;
+"""
+
+
+def create_sync_state(conn: sqlite3.Connection) -> None:
+    conn.executescript(SYNC_STATE_SCHEMA)
+
+
+def get_watermark(conn: sqlite3.Connection, data_source_id: str) -> str | None:
+    """Latest last_edited_time already synced, or None before the first sync."""
+    row = conn.execute(
+        "SELECT watermark FROM notion_sync_state WHERE data_source_id = ?;",
+        (data_source_id,),
+    ).fetchone()
+    return row[0] if row else None
+
+
+def processed_pages(conn: sqlite3.Connection, page_ids: list[str]) -> set[str]:
+    """The subset of `page_ids` a previous sync already handled."""
+    cur = conn.execute(
+        """
+        SELECT page_id FROM notion_synced_pages
+        WHERE page_id IN (SELECT value FROM json_each(?));
+        """,
+        (json.dumps(list(page_ids)),),
+    )
+    return {row[0] for row in cur}
+
+
+def record_synced(
+    conn: sqlite3.Connection, data_source_id: str, pages: list[tuple[str, str]]
+) -> None:
+    """
+    Remember (page_id, last_edited_time) pairs and advance the watermark.
+
+    The watermark only ever moves forward.
+    """
+    if not pages:
+        return
+    with conn:
+        conn.executemany(
+            """
+            INSERT INTO notion_synced_pages (page_id, data_source_id, last_edited_time)
+            VALUES (?, ?, ?)
+            ON CONFLICT(page_id) DO UPDATE SET last_edited_time = excluded.last_edited_time;
+            """,
+            [(page_id, data_source_id, edited) for page_id, edited in pages],
+        )
+        conn.execute(
+            """
+            INSERT INTO notion_sync_state (data_source_id, watermark)
+            VALUES (?, ?)
+            ON CONFLICT(data_source_id) DO UPDATE SET
+                watermark = MAX(IFNULL(watermark, ''), excluded.watermark),
+                updated_at = excluded.updated_at;
+            """,
+            (data_source_id, max(edited for _, edited in pages)),
+        )
+
+
+def unarchived_pages(conn: sqlite3.Connection, data_source_id: str) -> list[str]:
+    cur = conn.execute(
+        """
+        SELECT page_id FROM notion_synced_pages
+        WHERE data_source_id = ? AND archived_at IS NULL;
+        """,
+        (data_source_id,),
+    )
+    return [row[0] for row in cur]
+
+
+def record_archived(conn: sqlite3.Connection, page_ids: list[str]) -> None:
+    with conn:
+        conn.execute(
+            """
+            UPDATE notion_synced_pages
+            SET archived_at = strftime('%Y-%m-%dT%H:%M:%SZ', 'now')
+            WHERE page_id IN (SELECT value FROM json_each(?));
+            """,
+            (json.dumps(list(page_ids)),),
+        )
+
+
+def reset_sync_state(conn: sqlite3.Connection, data_source_id: str) -> None:
+    """Forget the watermark so the next sync rescans every unsynced page."""
+    with conn:
+        conn.execute("DELETE FROM notion_sync_state WHERE data_source_id = ?;", (data_source_id,))
@@ -2,16 +2,51 @@ import os
 from pathlib import Path
 import random
 import sqlite3
+import sys
+import time
+import zlib
 
 from flask import (
     Flask,
+    Response,
+    abort,
+    g,
     jsonify,
+    make_response,
     redirect,
     render_template,
     request,
     url_for,
 )
 
+# Ensure the project root (parent of 'src') is on sys.path when run as a script
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.grading import FUZZY_THRESHOLD, AnswerIndex, grade  # noqa: E402
+from src.metrics import CONTENT_TYPE, METRICS_ENABLED, RequestMetrics  # noqa: E402
+from src.sqlite_functions import slow_query_log  # noqa: E402
+from src.sqlite_functions.catalog_cache import CatalogCache, catalog_version  # noqa: E402
+from src.sqlite_functions.connection import (  # noqa: E402
+    ConnectionPool,
+    stop_tracking_queries,
+    track_queries,
+    tracked,
+)
+from src.sqlite_functions.progress_summary import create_progress_summary  # noqa: E402
+from src.sqlite_functions.progress_version import (  # noqa: E402
+    create_progress_version,
+    progress_version,
+)
+from src.sqlite_functions.progress_writer import (  # noqa: E402
+    ProgressWriteBehind,
+    upsert_progress,
+    utc_timestamp,
+)
+from src.sqlite_functions.scheduler import create_schedule, next_cards  # noqa: E402
+from src.sqlite_functions.search import create_search_index, search_questions  # noqa: E402
+
 # -------------------------
 # Basic Flask / DB setup
 # -------------------------
@@ -25,6 +60,52 @@ app = Flask(__name__, template_folder="templates")
 app.config["SECRET_KEY"] = os.getenv("TRIVIA_SECRET_KEY", "dev-secret-key")
 DB_PATH = Path(os.getenv("TRIVIA_DB_PATH", DEFAULT_DB_PATH))
 
+# Long-lived, WAL-mode connections shared by every request
+db_pool = ConnectionPool(DB_PATH)
+
+# Topics / question lists, invalidated by the catalog_version triggers
+catalog = CatalogCache()
+
+# Normalized answers for grading, rebuilt when the catalog changes
+answer_index = AnswerIndex()
+
+# Per-endpoint latency / status / DB query histograms served at /metrics
+metrics = RequestMetrics()
+
+# Optional write-behind buffer for progress upserts (TRIVIA_PROGRESS_WRITE_BEHIND=1)
+progress_queue = None
+if os.getenv("TRIVIA_PROGRESS_WRITE_BEHIND") == "1":
+    progress_queue = ProgressWriteBehind(get_conn=lambda: get_db())
+
+# Max number of (question_id, status) pairs accepted by /update_progress/batch/
+MAX_PROGRESS_BATCH = 1000
+
+PROGRESS_STATUSES = ("correct", "wrong", "unanswered")
+
+# Max answers graded per /api/check_answers/ call
+MAX_ANSWER_BATCH = 1000
+
+# Cards rendered with the study page / max cards per /api/next/ call
+STUDY_BATCH = 20
+MAX_NEXT_CARDS = 100
+
+# Max results per /api/search/ call
+MAX_SEARCH_RESULTS = 100
+
+# /api/questions/ paging + streaming
+MAX_PAGE_SIZE = 1000
+STREAM_BATCH_ROWS = 200
+
+# /api/stats/<user>/questions/ page sizes (the stats page's lazy per-topic lists)
+STATS_PAGE_SIZE = 50
+MAX_STATS_PAGE_SIZE = 200
+
+# Catalog responses may be reused this long before revalidating (ETag -> 304)
+CATALOG_MAX_AGE = int(os.getenv("TRIVIA_CATALOG_MAX_AGE", "0"))
+CATALOG_CACHE_CONTROL = f"public, max-age={CATALOG_MAX_AGE}, must-revalidate"
+# Per-user pages and shuffled lists: browser-only, revalidated on every use
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
 
 def normalize_user_name(raw):
     """Strip whitespace and ensure we always have a simple string."""
@@ -32,16 +113,13 @@ def normalize_user_name(raw):
 
 
 def get_db():
-    """Open a new SQLite connection. Caller must close it."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON;")
-    return conn
+    """Borrow a pooled SQLite connection. Caller must close it (returns it to the pool)."""
+    return db_pool.acquire()
 
 
 def init_db():
     """
-    Ensure the progress table + unique index exist.
+    Ensure the progress table, its unique index and the lookup indexes exist.
 
     Matches your Django model: user_name, question_id, status, updated_at.
     (questions table already exists from your original DB.) :contentReference[oaicite:0]{index=0}
@@ -71,10 +149,207 @@ def init_db():
         """
     )
 
+    # topic lookups: index/study/api listings and the reset_topic_progress subquery
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS questions_topic_idx
+        ON questions(topic);
+        """
+    )
+
+    # per-user status lookups: stats/user_home totals, missed mode, the study anti-join
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS progress_user_status_question_idx
+        ON progress(user_name, status, question_id);
+        """
+    )
+
+    # stats detail lists: one user's rows per status, newest first, keyset-paged
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS progress_user_status_updated_idx
+        ON progress(user_name, status, updated_at, question_id);
+        """
+    )
+
+    # FK child index so ON DELETE CASCADE from questions doesn't scan progress
+    cur.execute(
+        """
+        CREATE INDEX IF NOT EXISTS progress_question_idx
+        ON progress(question_id);
+        """
+    )
+
+    # catalog generation counter, bumped on every questions write (see CatalogCache)
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS catalog_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        );
+        """
+    )
+    cur.execute("INSERT OR IGNORE INTO catalog_version (id, version) VALUES (1, 0);")
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        cur.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS questions_bump_version_{event.lower()}
+            AFTER {event} ON questions
+            BEGIN
+                UPDATE catalog_version SET version = version + 1 WHERE id = 1;
+            END;
+            """  # noqa: S608
+        )
+
+    # per-(user, topic) counters for stats/user_home/admin_overview, trigger-maintained
+    create_progress_summary(conn)
+
+    # per-user generation counter behind the user pages' ETags
+    create_progress_version(conn)
+
+    # Leitner-box review schedule behind study mode=all and /api/next/
+    create_schedule(conn)
+
+    # FTS5 index over question/answer text for /api/search/
+    create_search_index(conn)
+
     conn.commit()
     conn.close()
 
 
+def warm_caches():
+    """Load topics, every topic's questions and the answer index into memory."""
+    conn = get_db()
+    for topic in catalog.topics(conn):
+        catalog.questions(conn, topic)
+    conn.close()
+    answer_index.warm(get_db)
+
+
+def create_app():
+    """
+    App factory for production servers (see gunicorn.conf.py).
+
+    Runs schema setup and cache warm-up once. With gunicorn's preload_app
+    this happens in the master before workers fork, so every worker starts
+    with the catalog already in (copy-on-write shared) memory.
+    """
+    init_db()
+    warm_caches()
+    # no SQLite connection may survive into the forked workers
+    db_pool.close_all()
+    app.config["TRIVIA_READY"] = True
+    return app
+
+
+# -------------------------
+# Request metrics
+# -------------------------
+
+
+def start_request_metrics():
+    g.request_started = time.perf_counter()
+    # the endpoint labels this request's statements in the slow-query log
+    g.query_stats = track_queries(request.endpoint)
+
+
+def record_request_metrics(response):
+    """
+    Record latency, status and the request's SQLite statement count/time.
+
+    A streamed body runs its queries after this hook, so those responses
+    keep tracking into the same stats while they are sent, and are
+    recorded when the server closes them.
+    """
+    started = g.pop("request_started", None)
+    if started is None:
+        return response
+    stats = g.query_stats
+    # read now: the request context may be gone by the time a stream closes
+    endpoint, method = request.endpoint or "unmatched", request.method
+
+    def observe():
+        metrics.observe(
+            endpoint,
+            method,
+            response.status_code,
+            time.perf_counter() - started,
+            stats.count,
+            stats.seconds,
+        )
+
+    if response.is_streamed:
+        response.response = tracked(response.response, stats)
+        if METRICS_ENABLED:
+            response.call_on_close(observe)
+    elif METRICS_ENABLED:
+        observe()
+    return response
+
+
+def end_request_metrics(exc):
+    stop_tracking_queries()
+
+
+if METRICS_ENABLED or slow_query_log.slow_log is not None:
+    app.before_request(start_request_metrics)
+    app.after_request(record_request_metrics)
+    app.teardown_request(end_request_metrics)
+
+
+# -------------------------
+# Conditional GET (ETags)
+# -------------------------
+
+
+def _code_fingerprint():
+    """CRC of the app's code and templates, so a deploy changes every ETag."""
+    crc = 0
+    for path in sorted(Path(__file__).resolve().parent.rglob("*")):
+        if path.suffix in (".py", ".html"):
+            crc = zlib.crc32(path.read_bytes(), crc)
+    return f"{crc:08x}"
+
+
+ETAG_PREFIX = os.getenv("TRIVIA_BUILD_ID") or _code_fingerprint()
+
+
+def catalog_etag(conn, *parts):
+    """ETag for a response built only from the questions table, or None if unversioned."""
+    version = catalog_version(conn)
+    if version is None:
+        return None
+    return "-".join(str(p) for p in (ETAG_PREFIX, f"c{version}", *parts))
+
+
+def user_etag(conn, user_name):
+    """ETag for a user's page: their progress version plus the catalog version."""
+    etag = catalog_etag(conn)
+    if etag is None:
+        return None
+    return f"{etag}-u{progress_version(conn, user_name)}"
+
+
+def not_modified(etag, cache_control, weak=False):
+    """
+    A 304 if the client's If-None-Match already covers `etag`, else None.
+
+    Routes call this before doing the real work, so a revalidation costs
+    only the version lookups.
+    """
+    if etag is None or not request.if_none_match.contains_weak(etag):
+        return None
+    return add_validators(Response(status=304), etag, cache_control, weak)
+
+
+def add_validators(response, etag, cache_control, weak=False):
+    if etag is not None:
+        response.set_etag(etag, weak=weak)
+        response.headers["Cache-Control"] = cache_control
+    return response
+
+
 # -------------------------
 # HTML routes (pages)
 # -------------------------
@@ -88,13 +363,15 @@ def index():
     Shows distinct topics from the questions table.
     """
     conn = get_db()
-    cur = conn.execute(
-        "SELECT DISTINCT topic FROM questions WHERE topic IS NOT NULL ORDER BY topic;"
-    )
-    topics = [row["topic"] for row in cur.fetchall()]
+    etag = catalog_etag(conn)
+    if (cached := not_modified(etag, CATALOG_CACHE_CONTROL)) is not None:
+        conn.close()
+        return cached
+    topics = catalog.topics(conn)
     conn.close()
 
-    return render_template("index.html", topics=topics)
+    response = make_response(render_template("index.html", topics=topics))
+    return add_validators(response, etag, CATALOG_CACHE_CONTROL)
 
 
 @app.route("/study/<topic>/enter/")
@@ -113,7 +390,8 @@ def study(topic):
       - ?mode=all (default) OR mode=missed
 
     mode=all:
-      - all questions for the topic, minus those marked 'correct'
+      - the next STUDY_BATCH due cards from the spaced-repetition scheduler;
+        the page pulls more from /api/next/ as it runs low
 
     mode=missed:
       - only questions currently marked 'wrong' for this user & topic
@@ -155,31 +433,10 @@ def study(topic):
                     "likelihood": row["likelihood"],
                 }
             )
+        due = len(questions)
     else:
-        # All questions for this topic, excluding ones the user already got correct
-        q_cur = conn.execute(
-            "SELECT id, question, answer, likelihood FROM questions WHERE topic = ?;",
-            (topic,),
-        )
-        for row in q_cur.fetchall():
-            qid = row["id"]
-            p_cur = conn.execute(
-                """
-                SELECT status
-                FROM progress
-                WHERE user_name = ? AND question_id = ? AND status = 'correct';
-                """,
-                (user_name, qid),
-            )
-            if p_cur.fetchone() is None:
-                questions.append(
-                    {
-                        "id": row["id"],
-                        "question": row["question"],
-                        "answer": row["answer"],
-                        "likelihood": row["likelihood"],
-                    }
-                )
+        # Only the first few due cards; the page asks /api/next/ for more
+        questions, due = next_cards(conn, user_name, topic, n=STUDY_BATCH)
 
     conn.close()
 
@@ -187,128 +444,87 @@ def study(topic):
         "study.html",
         topic=topic,
         questions=questions,
+        due=due,
+        batch_size=STUDY_BATCH,
         user=user_name,
         mode=mode,
     )
 
 
-@app.route("/stats/<user_name>/")
-def stats(user_name):
-    """
-    Stats page for a user:
-      - overall totals
-      - per-topic breakdown
-      - lists of questions (correct / wrong) per topic
+def progress_overview(conn, user_name):
     """
-    user_name = normalize_user_name(user_name)
-    conn = get_db()
+    Overall totals + per-topic breakdown for a user, read from progress_summary.
 
-    # Overall totals
-    cur = conn.execute(
-        """
-        SELECT
-            SUM(CASE WHEN status = 'correct' THEN 1 ELSE 0 END) AS correct_count,
-            SUM(CASE WHEN status = 'wrong' THEN 1 ELSE 0 END) AS wrong_count,
-            COUNT(*) AS total_count
-        FROM progress
-        WHERE user_name = ?;
-        """,
-        (user_name,),
-    )
-    overall_row = cur.fetchone()
-
-    if not overall_row or overall_row["total_count"] is None:
-        overall = None
-    else:
-        total = overall_row["total_count"]
-        correct = overall_row["correct_count"] or 0
-        wrong = overall_row["wrong_count"] or 0
-        completion = (correct / total * 100.0) if total else 0.0
-        overall = {
-            "total": total,
-            "correct": correct,
-            "wrong": wrong,
-            "completion": completion,
-        }
-
-    # Per-topic breakdown
+    Returns:
+        (overall dict or None, list of per-topic dicts)
+    """
     cur = conn.execute(
         """
         SELECT
-            q.topic AS topic,
-            SUM(CASE WHEN p.status = 'correct' THEN 1 ELSE 0 END) AS correct_count,
-            SUM(CASE WHEN p.status = 'wrong' THEN 1 ELSE 0 END) AS wrong_count,
-            COUNT(*) AS total_count
-        FROM progress p
-        JOIN questions q ON q.id = p.question_id
-        WHERE p.user_name = ?
-        GROUP BY q.topic
-        ORDER BY q.topic;
+            NULLIF(topic, '') AS topic,
+            correct_count,
+            wrong_count,
+            total_count
+        FROM progress_summary
+        WHERE user_name = ?
+        ORDER BY topic;
         """,
         (user_name,),
     )
     topic_rows = [
         {
             "topic": row["topic"],
-            "correct": row["correct_count"] or 0,
-            "wrong": row["wrong_count"] or 0,
-            "total": row["total_count"] or 0,
+            "correct": row["correct_count"],
+            "wrong": row["wrong_count"],
+            "total": row["total_count"],
         }
         for row in cur.fetchall()
     ]
 
-    # Detailed questions by topic & status
-    cur = conn.execute(
-        """
-        SELECT
-            q.id AS question_id,
-            q.topic AS topic,
-            q.question AS question_text,
-            q.answer AS answer_text,
-            p.status AS status,
-            p.updated_at AS updated_at
-        FROM progress p
-        JOIN questions q ON q.id = p.question_id
-        WHERE p.user_name = ?
-        ORDER BY q.topic ASC, p.updated_at DESC;
-        """,
-        (user_name,),
-    )
+    total = sum(row["total"] for row in topic_rows)
+    correct = sum(row["correct"] for row in topic_rows)
+    wrong = sum(row["wrong"] for row in topic_rows)
+    completion = (correct / total * 100.0) if total else 0.0
+    overall = {
+        "total": total,
+        "correct": correct,
+        "wrong": wrong,
+        "completion": completion,
+    }
+
+    return overall, topic_rows
 
-    by_topic = {}
-    for row in cur.fetchall():
-        topic = row["topic"] or "Untitled"
-        if topic not in by_topic:
-            by_topic[topic] = {
-                "correct": [],
-                "wrong": [],
-                "unanswered": [],
-            }
-        status = row["status"]
-        if status not in by_topic[topic]:
-            status_key = "unanswered"
-        else:
-            status_key = status
-
-        by_topic[topic][status_key].append(
-            {
-                "id": row["question_id"],
-                "question": row["question_text"],
-                "answer": row["answer_text"],
-                "status": row["status"],
-                "updated_at": row["updated_at"],
-            }
-        )
+
+@app.route("/stats/<user_name>/")
+def stats(user_name):
+    """
+    Stats page for a user:
+      - overall totals
+      - per-topic breakdown
+      - per-topic correct / wrong question lists, fetched page by page from
+        /api/stats/<user_name>/questions/ as the user expands them
+    """
+    user_name = normalize_user_name(user_name)
+    conn = get_db()
+    etag = user_etag(conn, user_name)
+    if (cached := not_modified(etag, PRIVATE_CACHE_CONTROL)) is not None:
+        conn.close()
+        return cached
+
+    overall, topic_rows = progress_overview(conn, user_name)
 
     conn.close()
 
-    return render_template(
-        "stats.html",
-        user_name=user_name,
-        overall=overall,
-        topic_rows=topic_rows,
-        by_topic=by_topic,
+    response = make_response(
+        render_template(
+            "stats.html",
+            user_name=user_name,
+            overall=overall,
+            topic_rows=topic_rows,
+            page_size=STATS_PAGE_SIZE,
+        )
     )
+    return add_validators(response, etag, PRIVATE_CACHE_CONTROL)
 
 
 @app.route("/user/<user_name>/")
@@ -321,68 +537,24 @@ def user_home(user_name):
     """
     user_name = normalize_user_name(user_name)
     conn = get_db()
+    etag = user_etag(conn, user_name)
+    if (cached := not_modified(etag, PRIVATE_CACHE_CONTROL)) is not None:
+        conn.close()
+        return cached
 
-    # Overall summary (reuse stats logic)
-    cur = conn.execute(
-        """
-        SELECT
-            SUM(CASE WHEN status = 'correct' THEN 1 ELSE 0 END) AS correct_count,
-            SUM(CASE WHEN status = 'wrong' THEN 1 ELSE 0 END) AS wrong_count,
-            COUNT(*) AS total_count
-        FROM progress
-        WHERE user_name = ?;
-        """,
-        (user_name,),
-    )
-    overall_row = cur.fetchone()
-    if not overall_row or overall_row["total_count"] is None:
-        overall = None
-    else:
-        total = overall_row["total_count"]
-        correct = overall_row["correct_count"] or 0
-        wrong = overall_row["wrong_count"] or 0
-        completion = (correct / total * 100.0) if total else 0.0
-        overall = {
-            "total": total,
-            "correct": correct,
-            "wrong": wrong,
-            "completion": completion,
-        }
-
-    # Per-topic breakdown
-    cur = conn.execute(
-        """
-        SELECT
-            q.topic AS topic,
-            SUM(CASE WHEN p.status = 'correct' THEN 1 ELSE 0 END) AS correct_count,
-            SUM(CASE WHEN p.status = 'wrong' THEN 1 ELSE 0 END) AS wrong_count,
-            COUNT(*) AS total_count
-        FROM progress p
-        JOIN questions q ON q.id = p.question_id
-        WHERE p.user_name = ?
-        GROUP BY q.topic
-        ORDER BY q.topic;
-        """,
-        (user_name,),
-    )
-    topic_rows = [
-        {
-            "topic": row["topic"],
-            "correct": row["correct_count"] or 0,
-            "wrong": row["wrong_count"] or 0,
-            "total": row["total_count"] or 0,
-        }
-        for row in cur.fetchall()
-    ]
+    overall, topic_rows = progress_overview(conn, user_name)
 
     conn.close()
 
-    return render_template(
-        "user_home.html",
-        user_name=user_name,
-        overall=overall,
-        topic_rows=topic_rows,
+    response = make_response(
+        render_template(
+            "user_home.html",
+            user_name=user_name,
+            overall=overall,
+            topic_rows=topic_rows,
+        )
     )
+    return add_validators(response, etag, PRIVATE_CACHE_CONTROL)
 
 
 @app.route("/reset_progress/<user_name>/", methods=["POST"])
@@ -436,27 +608,74 @@ def update_progress():
     if not (user_name and question_id and status):
         return jsonify({"success": False, "error": "Missing fields"}), 400
 
-    if status not in ("correct", "wrong", "unanswered"):
+    if status not in PROGRESS_STATUSES:
         return jsonify({"success": False, "error": "Invalid status"}), 400
 
-    conn = get_db()
-    conn.execute(
-        """
-        INSERT INTO progress (user_name, question_id, status, updated_at)
-        VALUES (?, ?, ?, CURRENT_TIMESTAMP)
-        ON CONFLICT(user_name, question_id)
-        DO UPDATE SET
-            status = excluded.status,
-            updated_at = CURRENT_TIMESTAMP;
-        """,
-        (user_name, question_id, status),
-    )
-    conn.commit()
-    conn.close()
+    save_progress(user_name, [(question_id, status)])
 
     return jsonify({"success": True, "status": status})
 
 
+@app.route("/update_progress/batch/", methods=["POST"])
+def update_progress_batch():
+    """
+    Upsert many progress rows for one user in a single transaction.
+
+    Body: {"user_name": "...", "updates": [{"question_id": 1, "status": "correct"}, ...]}
+
+    "count" in the response is the number of rows written; updates for
+    unknown question ids are skipped.
+    """
+    data = request.get_json(force=True) or {}
+    user_name = normalize_user_name(data.get("user_name"))
+    updates = data.get("updates")
+
+    if not (user_name and isinstance(updates, list)):
+        return jsonify({"success": False, "error": "Missing fields"}), 400
+
+    if len(updates) > MAX_PROGRESS_BATCH:
+        return jsonify({"success": False, "error": "Too many updates"}), 400
+
+    pairs = []
+    for item in updates:
+        if not isinstance(item, dict):
+            return jsonify({"success": False, "error": "Invalid update"}), 400
+        question_id = item.get("question_id")
+        status = item.get("status")
+        # bool is an int subclass: true/false are not question ids 1 and 0
+        valid_id = isinstance(question_id, int) and not isinstance(question_id, bool)
+        if not (valid_id and status):
+            return jsonify({"success": False, "error": "Missing fields"}), 400
+        if status not in PROGRESS_STATUSES:
+            return jsonify({"success": False, "error": "Invalid status"}), 400
+        pairs.append((question_id, status))
+
+    written = save_progress(user_name, pairs)
+    if written is None:
+        # write-behind: accepted, but not written (or checked) yet
+        return jsonify({"success": True, "queued": len(pairs)})
+
+    return jsonify({"success": True, "count": written})
+
+
+def save_progress(user_name, pairs) -> int | None:
+    """
+    Write (question_id, status) pairs now, or hand them to the write-behind queue.
+
+    Returns:
+        int | None: rows written (unknown question ids are skipped), or None if queued
+    """
+    if progress_queue is not None:
+        progress_queue.submit(user_name, pairs)
+        return None
+
+    ts = utc_timestamp()
+    conn = get_db()
+    written = upsert_progress(conn, ((user_name, qid, status, ts) for qid, status in pairs))
+    conn.close()
+    return written
+
+
 # -------------------------
 # JSON API endpoints
 # (equivalents of your DRF views)
@@ -467,41 +686,322 @@ def update_progress():
 def api_get_questions():
     """
     GET all questions (like your Django get_questions).
+
+    ?after_id=<id>&limit=<n>  -> one keyset page (ids > after_id, ascending);
+                                 the next cursor is in X-Next-After-Id / Link
+    ?format=ndjson            -> one JSON object per line instead of an array
+
+    Without limit the whole catalog is streamed row by row. Responses are
+    gzip/deflate compressed on the fly when the client asks for it, and
+    carry a catalog-version ETag (one per encoding).
+    """
+    try:
+        after_id = int(request.args.get("after_id", 0))
+        limit = request.args.get("limit")
+        limit = None if limit is None else min(max(int(limit), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({"error": "after_id and limit must be integers"}), 400
+
+    ndjson = request.args.get("format") == "ndjson"
+    encoding = negotiate_encoding()
+    headers = {"Vary": "Accept-Encoding"}
+
+    conn = get_db()
+    # the encoding is part of the tag: gzip and identity bodies are different bytes
+    etag = catalog_etag(conn, encoding or "identity")
+    if (cached := not_modified(etag, CATALOG_CACHE_CONTROL)) is not None:
+        conn.close()
+        cached.headers["Vary"] = "Accept-Encoding"
+        return cached
+
+    if limit is None:
+        conn.close()
+        rows = stream_questions(after_id)
+    else:
+        # a page is bounded, so read it (plus one row to see if there's more) up front
+        page = conn.execute(
+            """
+            SELECT id, question, answer, likelihood
+            FROM questions
+            WHERE id > ?
+            ORDER BY id
+            LIMIT ?;
+            """,
+            (after_id, limit + 1),
+        ).fetchall()
+        conn.close()
+
+        page = [question_dict(row) for row in page]
+        if len(page) > limit:
+            page = page[:limit]
+            next_after_id = page[-1]["id"]
+            args = {"after_id": next_after_id, "limit": limit}
+            if ndjson:
+                args["format"] = "ndjson"
+            headers["X-Next-After-Id"] = str(next_after_id)
+            headers["Link"] = f'<{url_for("api_get_questions", **args)}>; rel="next"'
+        rows = iter(page)
+
+    if ndjson:
+        body = (app.json.dumps(row) + "\n" for row in rows)
+        mimetype = "application/x-ndjson"
+    else:
+        body = json_array_stream(rows)
+        mimetype = "application/json"
+
+    if encoding:
+        headers["Content-Encoding"] = encoding
+
+    response = Response(compress_stream(body, encoding), mimetype=mimetype, headers=headers)
+    return add_validators(response, etag, CATALOG_CACHE_CONTROL)
+
+
+def question_dict(row):
+    return {
+        "id": row["id"],
+        "question": row["question"],
+        "answer": row["answer"],
+        "likelihood": row["likelihood"],
+    }
+
+
+def stream_questions(after_id=0):
+    """Yield question dicts in id order without materializing the table."""
+    conn = get_db()
+    try:
+        cur = conn.execute(
+            """
+            SELECT id, question, answer, likelihood
+            FROM questions
+            WHERE id > ?
+            ORDER BY id;
+            """,
+            (after_id,),
+        )
+        while batch := cur.fetchmany(STREAM_BATCH_ROWS):
+            for row in batch:
+                yield question_dict(row)
+    finally:
+        conn.close()
+
+
+def json_array_stream(items):
+    """Serialize an iterable as a JSON array, one element at a time."""
+    yield "["
+    for i, item in enumerate(items):
+        yield ("," if i else "") + app.json.dumps(item)
+    yield "]"
+
+
+def negotiate_encoding():
+    """Pick gzip/deflate from Accept-Encoding, or None for identity."""
+    if not request.headers.get("Accept-Encoding"):
+        return None
+    return request.accept_encodings.best_match(["gzip", "deflate"])
+
+
+def compress_stream(chunks, encoding):
+    """
+    Encode text chunks and, if requested, compress them incrementally.
+
+    Output is sync-flushed every STREAM_BATCH_ROWS chunks so clients get
+    their first bytes early instead of after the whole body is compressed.
+    """
+    if encoding is None:
+        for chunk in chunks:
+            yield chunk.encode()
+        return
+
+    # wbits: 16+ -> gzip container, plain -> zlib stream (HTTP "deflate")
+    wbits = 16 + zlib.MAX_WBITS if encoding == "gzip" else zlib.MAX_WBITS
+    compressor = zlib.compressobj(6, zlib.DEFLATED, wbits)
+    for i, chunk in enumerate(chunks, start=1):
+        data = compressor.compress(chunk.encode())
+        if i % STREAM_BATCH_ROWS == 0:
+            data += compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+@app.route("/api/next/<topic>/<user_name>/", methods=["GET"])
+def api_next_cards(topic, user_name):
     """
+    Next due cards from the spaced-repetition scheduler.
+
+    ?n=<count>         how many cards (default 10, max MAX_NEXT_CARDS)
+    ?exclude=1,2,3     ids the client already holds
+    """
+    user_name = normalize_user_name(user_name)
+    if not user_name:
+        return jsonify({"error": "Missing user"}), 400
+
+    try:
+        n = min(max(int(request.args.get("n", 10)), 1), MAX_NEXT_CARDS)
+        exclude = [int(x) for x in request.args.get("exclude", "").split(",") if x.strip()]
+    except ValueError:
+        return jsonify({"error": "n and exclude must be integers"}), 400
+
     conn = get_db()
-    cur = conn.execute("SELECT id, question, answer, likelihood FROM questions;")
-    results = [
+    cards, due = next_cards(conn, user_name, topic, n=n, exclude=exclude)
+    conn.close()
+
+    return jsonify({"topic": topic, "user_name": user_name, "cards": cards, "due": due})
+
+
+@app.route("/api/check_answer/<int:qid>/", methods=["POST"])
+def api_check_answer(qid):
+    """
+    Check answer against the in-memory answer index (fuzzy, normalized).
+
+    Body: {"answer": "...", "threshold": 85 (optional, 0-100)}
+    """
+    data = request.get_json(force=True) or {}
+    threshold = answer_threshold(data)
+    if threshold is None:
+        return jsonify({"correct": False, "message": "Invalid threshold"}), 400
+
+    variants = answer_index.variants(get_db, qid)
+    if variants is None:
+        return jsonify({"correct": False, "message": "Invalid question"}), 404
+
+    correct, score = grade(data.get("answer") or "", variants, threshold)
+    return jsonify({"correct": correct, "score": score})
+
+
+@app.route("/api/check_answers/", methods=["POST"])
+def api_check_answers():
+    """
+    Grade many answers in one call.
+
+    Body: {"answers": [{"question_id": 1, "answer": "..."}, ...], "threshold": 85 (optional)}
+    """
+    data = request.get_json(force=True) or {}
+    answers = data.get("answers")
+    threshold = answer_threshold(data)
+
+    if not isinstance(answers, list):
+        return jsonify({"success": False, "error": "Missing fields"}), 400
+    if len(answers) > MAX_ANSWER_BATCH:
+        return jsonify({"success": False, "error": "Too many answers"}), 400
+    if threshold is None:
+        return jsonify({"success": False, "error": "Invalid threshold"}), 400
+
+    results = []
+    for item in answers:
+        if not isinstance(item, dict):
+            return jsonify({"success": False, "error": "Invalid answer"}), 400
+        qid = item.get("question_id")
+        # bool is an int subclass; lists/dicts would be unhashable in the index lookup
+        valid_id = isinstance(qid, int) and not isinstance(qid, bool)
+        variants = answer_index.variants(get_db, qid) if valid_id else None
+        if variants is None:
+            results.append({"question_id": qid, "correct": False, "message": "Invalid question"})
+            continue
+        correct, score = grade(item.get("answer") or "", variants, threshold)
+        results.append({"question_id": qid, "correct": correct, "score": score})
+
+    return jsonify({"success": True, "results": results})
+
+
+def answer_threshold(data):
+    """Per-request fuzzy threshold (0-100), the configured default, or None if invalid."""
+    raw = data.get("threshold", FUZZY_THRESHOLD)
+    if isinstance(raw, bool) or not isinstance(raw, int | float) or not 0 <= raw <= 100:
+        return None
+    return float(raw)
+
+
+@app.route("/api/stats/<user_name>/questions/", methods=["GET"])
+def api_stats_questions(user_name):
+    """
+    One page of a user's correct or wrong questions in a topic, newest first.
+
+    ?topic=<name>      topic ("" for questions without one)
+    ?status=<status>   correct | wrong
+    ?after=<cursor>    the previous page's next_after
+    ?limit=<n>         page size (default STATS_PAGE_SIZE, max MAX_STATS_PAGE_SIZE)
+    """
+    user_name = normalize_user_name(user_name)
+    topic = request.args.get("topic", "")
+    status = request.args.get("status")
+    if status not in ("correct", "wrong"):
+        return jsonify({"error": "status must be correct or wrong"}), 400
+
+    try:
+        limit = min(max(int(request.args.get("limit", STATS_PAGE_SIZE)), 1), MAX_STATS_PAGE_SIZE)
+        after = request.args.get("after")
+        cursor = None
+        if after:
+            # "<updated_at>|<question_id>" of the last row already shown
+            updated_at, _, question_id = after.rpartition("|")
+            cursor = (updated_at, int(question_id))
+    except ValueError:
+        return jsonify({"error": "Invalid limit or after"}), 400
+
+    keyset = "AND (p.updated_at, p.question_id) < (?, ?)" if cursor else ""
+    conn = get_db()
+    etag = user_etag(conn, user_name)
+    if (cached := not_modified(etag, PRIVATE_CACHE_CONTROL)) is not None:
+        conn.close()
+        return cached
+    rows = conn.execute(
+        f"""
+        SELECT q.id, q.question, q.answer, p.updated_at
+        FROM progress p
+        JOIN questions q ON q.id = p.question_id
+        WHERE p.user_name = ?
+          AND p.status = ?
+          AND IFNULL(q.topic, '') = ?
+          {keyset}
+        ORDER BY p.updated_at DESC, p.question_id DESC
+        LIMIT ?;
+        """,  # noqa: S608
+        (user_name, status, topic, *(cursor or ()), limit + 1),
+    ).fetchall()
+    conn.close()
+
+    items = [
         {
             "id": row["id"],
             "question": row["question"],
             "answer": row["answer"],
-            "likelihood": row["likelihood"],
+            "updated_at": row["updated_at"],
         }
-        for row in cur.fetchall()
+        for row in rows[:limit]
     ]
-    conn.close()
-    return jsonify(results)
+    next_after = None
+    if len(rows) > limit:
+        next_after = f"{items[-1]['updated_at']}|{items[-1]['id']}"
 
+    response = jsonify({"topic": topic, "status": status, "items": items, "next_after": next_after})
+    return add_validators(response, etag, PRIVATE_CACHE_CONTROL)
 
-@app.route("/api/check_answer/<int:qid>/", methods=["POST"])
-def api_check_answer(qid):
+
+@app.route("/api/search/", methods=["GET"])
+def api_search():
     """
-    Check answer against DB.
+    Full-text search over questions and answers.
+
+    ?q=<text>          words to match (last word is a prefix match)
+    ?topic=<name>      only this topic
+    ?limit=<n>         max results (default 20)
     """
-    data = request.get_json(force=True) or {}
-    user_answer = (data.get("answer") or "").strip().lower()
+    text = (request.args.get("q") or "").strip()
+    topic = (request.args.get("topic") or "").strip() or None
+    try:
+        limit = min(max(int(request.args.get("limit", 20)), 1), MAX_SEARCH_RESULTS)
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+
+    if not text:
+        return jsonify({"error": "Missing q"}), 400
 
     conn = get_db()
-    cur = conn.execute("SELECT answer FROM questions WHERE id = ?;", (qid,))
-    row = cur.fetchone()
+    results = search_questions(conn, text, topic=topic, limit=limit)
     conn.close()
 
-    if row is None:
-        return jsonify({"correct": False, "message": "Invalid question"}), 404
-
-    correct_answer = (row["answer"] or "").strip().lower()
-    correct = user_answer == correct_answer
-    return jsonify({"correct": correct})
+    return jsonify({"query": text, "topic": topic, "results": results})
 
 
 @app.route("/api/topics/", methods=["GET"])
@@ -510,37 +1010,34 @@ def api_get_topics():
     List unique topics.
     """
     conn = get_db()
-    cur = conn.execute("SELECT DISTINCT topic FROM questions WHERE topic IS NOT NULL;")
-    topics = sorted(row["topic"] for row in cur.fetchall())
+    etag = catalog_etag(conn)
+    if (cached := not_modified(etag, CATALOG_CACHE_CONTROL)) is not None:
+        conn.close()
+        return cached
+    topics = catalog.topics(conn)
     conn.close()
-    return jsonify(topics)
+    return add_validators(jsonify(topics), etag, CATALOG_CACHE_CONTROL)
 
 
 @app.route("/api/questions/<topic_name>/", methods=["GET"])
 def api_get_questions_by_topic(topic_name):
     """
     Shuffled questions for a topic.
+
+    The ETag is weak: every response is a fresh shuffle, but any of them is
+    an equally good copy while the catalog is unchanged.
     """
     conn = get_db()
-    cur = conn.execute(
-        "SELECT id, question, answer, likelihood FROM questions WHERE topic = ?;",
-        (topic_name,),
-    )
-    rows = list(cur.fetchall())
+    etag = catalog_etag(conn)
+    if (cached := not_modified(etag, PRIVATE_CACHE_CONTROL, weak=True)) is not None:
+        conn.close()
+        return cached
+    # copy: the cached list is shared between requests
+    data = list(catalog.questions(conn, topic_name))
     conn.close()
 
-    random.shuffle(rows)
-
-    data = [
-        {
-            "id": row["id"],
-            "question": row["question"],
-            "answer": row["answer"],
-            "likelihood": row["likelihood"],
-        }
-        for row in rows
-    ]
-    return jsonify(data)
+    random.shuffle(data)
+    return add_validators(jsonify(data), etag, PRIVATE_CACHE_CONTROL, weak=True)
 
 
 # -------------------------
@@ -568,10 +1065,10 @@ def admin_overview():
         """
         SELECT
             user_name,
-            SUM(CASE WHEN status = 'correct' THEN 1 ELSE 0 END) AS correct_count,
-            SUM(CASE WHEN status = 'wrong' THEN 1 ELSE 0 END) AS wrong_count,
-            COUNT(*) AS total_count
-        FROM progress
+            SUM(correct_count) AS correct_count,
+            SUM(wrong_count) AS wrong_count,
+            SUM(total_count) AS total_count
+        FROM progress_summary
         GROUP BY user_name
         ORDER BY user_name;
         """
@@ -596,10 +1093,48 @@ def admin_overview():
     )
 
 
+# -------------------------
+# Metrics
+# -------------------------
+
+
+@app.route("/metrics")
+def metrics_endpoint():
+    """
+    Prometheus scrape endpoint, summed over all gunicorn workers (see gunicorn.conf.py).
+    """
+    if not METRICS_ENABLED:
+        abort(404)
+    return Response(metrics.render(), content_type=CONTENT_TYPE)
+
+
+# -------------------------
+# Health checks
+# -------------------------
+
+
+@app.route("/health/ready/")
+def health_ready():
+    """
+    Readiness probe: 200 once create_app() has finished and the DB answers.
+    """
+    if not app.config.get("TRIVIA_READY"):
+        return jsonify({"ready": False, "error": "Starting up"}), 503
+
+    try:
+        conn = get_db()
+        conn.execute("SELECT version FROM catalog_version WHERE id = 1;").fetchone()
+        conn.close()
+    except sqlite3.Error as exc:
+        return jsonify({"ready": False, "error": str(exc)}), 503
+
+    return jsonify({"ready": True})
+
+
 # -------------------------
 # Entry point
 # -------------------------
 
 if __name__ == "__main__":
-    init_db()
-    app.run(debug=os.environ["ENV"] == "dev")
+    create_app()
+    app.run(debug=os.environ.get("ENV") == "dev")
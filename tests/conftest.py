@@ -0,0 +1,43 @@
+from pathlib import Path
+import shutil
+import sqlite3
+
+import pytest
+
+from src import trivia_web
+from src.grading import AnswerIndex
+from src.sqlite_functions.catalog_cache import CatalogCache
+from src.sqlite_functions.connection import ConnectionPool
+
+
+@pytest.fixture
+def db_path(tmp_path) -> Path:
+    """A throwaway copy of the bundled database."""
+    path = tmp_path / "database.db"
+    shutil.copy(trivia_web.DEFAULT_DB_PATH, path)
+    return path
+
+
+@pytest.fixture
+def app(db_path, monkeypatch):
+    """trivia_web pointed at the copy, schema set up and caches empty."""
+    monkeypatch.setattr(trivia_web, "db_pool", ConnectionPool(db_path))
+    monkeypatch.setattr(trivia_web, "catalog", CatalogCache())
+    monkeypatch.setattr(trivia_web, "answer_index", AnswerIndex())
+    trivia_web.create_app()
+    yield trivia_web.app
+    trivia_web.db_pool.close_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def conn(app, db_path):
+    """Plain connection to the set-up copy, for assertions and fixtures."""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    yield conn
+    conn.close()
@@ -0,0 +1,96 @@
+"""LSH candidate generation and the insert-time duplicate checker."""
+
+import sqlite3
+import zlib
+
+import numpy as np
+import pytest
+
+from src.sqlite_functions import ann_index
+from src.sqlite_functions.ann_index import DuplicateChecker, LSHIndex
+
+DIM = 32
+
+
+def unit(vectors: np.ndarray) -> np.ndarray:
+    return (vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)).astype(np.float32)
+
+
+def fake_encode(texts, name=None):
+    """Deterministic per-text vectors: equal texts embed identically."""
+    return unit(
+        np.stack(
+            [np.random.default_rng(zlib.crc32(t.encode())).standard_normal(DIM) for t in texts]
+        )
+    )
+
+
+@pytest.fixture
+def index():
+    rng = np.random.default_rng(1)
+    index = LSHIndex(DIM, model="fake")
+    # past the first reindex, plus a few rows left in the unsorted tail
+    index.add(np.arange(2000), unit(rng.standard_normal((2000, DIM))))
+    index.add(np.arange(2000, 2010), unit(rng.standard_normal((10, DIM))))
+    assert index._n_sorted < len(index)
+    return index
+
+
+def near(vector: np.ndarray, noise: float, seed: int) -> np.ndarray:
+    return unit(vector + noise * np.random.default_rng(seed).standard_normal(DIM))
+
+
+def test_query_finds_near_copies_in_sorted_rows_and_tail(index):
+    found = 0
+    for qid in (*range(0, 2000, 40), *range(2000, 2010)):
+        vector = near(index.vectors[qid].astype(np.float32), 0.05, qid)
+        hits = index.query(vector, threshold=0.85)
+        found += bool(hits) and hits[0][0] == qid
+    assert found >= 0.9 * 60
+
+
+def test_candidates_are_the_rows_sharing_a_signature(index):
+    vector = near(index.vectors[7].astype(np.float32), 0.05, 7)
+    code = index._hash(vector[None, :])[0]
+    colliding = set(index.ids[(index.codes == code).any(axis=1)].tolist())
+
+    # a threshold of -1 returns every candidate that was rescored
+    hits = index.query(vector, threshold=-1.0, k=len(index))
+
+    assert {qid for qid, _ in hits} == colliding
+    assert 7 in colliding and len(colliding) < len(index) // 4
+
+
+def test_query_respects_threshold_and_k(index):
+    vector = index.vectors[3].astype(np.float32)
+    hits = index.query(vector, threshold=0.85, k=1)
+    assert len(hits) == 1 and hits[0][1] >= 0.85
+    assert index.query(unit(-vector), threshold=0.85) == []
+
+
+def test_remove_and_save_load_roundtrip(index, tmp_path):
+    vector = index.vectors[5].astype(np.float32)
+    index.remove(np.array([5]))
+    assert all(qid != 5 for qid, _ in index.query(vector, threshold=0.5))
+
+    path = tmp_path / "x.ann.npz"
+    index.save(path)
+    loaded = LSHIndex.load(path)
+    other = index.vectors[6].astype(np.float32)
+    assert loaded.model == "fake" and len(loaded) == len(index)
+    assert loaded.query(other, 0.85) == index.query(other, 0.85)
+
+
+def test_checker_finds_existing_question_and_skips_new_one(db_path, monkeypatch):
+    monkeypatch.setattr(ann_index, "encode", fake_encode)
+    conn = sqlite3.connect(db_path)
+    existing = conn.execute("SELECT id, topic, question FROM questions WHERE id = 164;").fetchone()
+    checker = DuplicateChecker(ann_index.index_path_for(db_path), model="fake")
+
+    matches, vector = checker.check(conn, existing[2])
+    assert [m["id"] for m in matches][:1] == [164]
+    assert checker.index_path.exists() and vector.shape == (DIM,)
+
+    assert checker.check(conn, existing[2], topic="Some other topic")[0] == []
+    assert checker.check(conn, "A question nobody has asked yet?")[0] == []
+    conn.close()
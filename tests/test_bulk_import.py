@@ -0,0 +1,155 @@
+"""Natural-key migration, bulk upserts, single inserts and the bulk delete CLI."""
+
+import json
+import sqlite3
+import sys
+
+import pytest
+
+from src.scripts import questions_io
+from src.sqlite_functions import basic_functions
+from src.sqlite_functions.basic_functions import (
+    create_natural_key,
+    insert_question,
+    insert_questions,
+    upsert_questions,
+)
+
+
+@pytest.fixture
+def db(app, db_path, monkeypatch):
+    """basic_functions pointed at the app's set-up copy (triggers and all), natural key migrated."""
+    monkeypatch.setattr(basic_functions, "DB_PATH", db_path)
+    conn = sqlite3.connect(db_path)
+    create_natural_key(conn)
+    yield conn
+    conn.close()
+
+
+def count(conn, where="1", params=()) -> int:
+    return conn.execute(f"SELECT COUNT(*) FROM questions WHERE {where};", params).fetchone()[0]  # noqa: S608
+
+
+def test_upsert_needs_the_migration(db_path, monkeypatch):
+    monkeypatch.setattr(basic_functions, "DB_PATH", db_path)
+    with pytest.raises(ValueError, match="migrate"):
+        upsert_questions([{"topic": "T", "question": "Q?", "answer": "A"}])
+
+
+def test_upsert_dedupes_null_topics(db):
+    rows = [{"topic": None, "question": "Topicless?", "answer": "A"}]
+    assert upsert_questions(rows) == (1, 1)
+    assert upsert_questions([{**rows[0], "answer": "B"}]) == (1, 1)
+
+    assert count(db, "topic IS NULL AND question = 'Topicless?'") == 1
+    answer = db.execute("SELECT answer FROM questions WHERE topic IS NULL;").fetchone()[0]
+    assert answer == "B"
+
+
+def test_upsert_counts_only_question_rows(db):
+    rows = [{"topic": "Bulk", "question": f"Q{i}?", "answer": "A"} for i in range(3)]
+    assert upsert_questions(rows) == (3, 3)
+
+    rows[0]["answer"] = "B"
+    assert upsert_questions(rows) == (3, 1)
+    assert upsert_questions(rows, update_existing=False) == (3, 0)
+
+
+def test_invalid_row_rolls_back_the_whole_import(db):
+    before = count(db)
+    rows = [{"topic": "Bulk", "question": f"Q{i}?", "answer": "A"} for i in range(25)]
+    rows.append({"topic": "Bulk", "question": "Bad?", "answer": "A", "likelihood": "9"})
+
+    with pytest.raises(ValueError, match="row 26: likelihood"):
+        upsert_questions(rows, batch_size=10)
+
+    assert count(db) == before
+
+
+def test_insert_question_returns_existing_id_on_conflict(db):
+    existing = db.execute("SELECT id, topic, question FROM questions WHERE id = 164;").fetchone()
+
+    assert insert_question(existing[1], existing[2], "another answer", duplicate_check="off") == 164
+    assert count(db, "topic = ? AND question = ?", existing[1:]) == 1
+
+
+@pytest.mark.parametrize(("stored", "given"), [("", None), (None, "")])
+def test_insert_question_finds_conflict_across_null_and_empty_topic(db, stored, given):
+    db.execute(
+        "INSERT INTO questions (topic, question, answer) VALUES (?, 'Blank?', 'A');", (stored,)
+    )
+    db.commit()
+    qid = db.execute("SELECT id FROM questions WHERE question = 'Blank?';").fetchone()[0]
+
+    assert insert_question(given, "Blank?", "A", duplicate_check="off") == qid
+    assert count(db, "question = 'Blank?'") == 1
+
+
+def test_insert_questions_skips_existing_null_topic_rows(db):
+    first = insert_questions([(None, "Loose?", "A")], duplicate_check="off")
+    again = insert_questions([(None, "Loose?", "A")], duplicate_check="off")
+    forced = insert_questions([(None, "Loose?", "A")], dedupe=False, duplicate_check="off")
+
+    assert len(first) == 1 and again == [] and forced == []
+    assert count(db, "question = 'Loose?'") == 1
+
+
+def test_migration_refuses_duplicates(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "INSERT INTO questions (topic, question, answer) SELECT topic, question, answer FROM questions WHERE id = 164;"
+    )
+    conn.commit()
+    with pytest.raises(ValueError, match="duplicate"):
+        create_natural_key(conn)
+    conn.close()
+
+
+def delete_cli(monkeypatch, db_path, *args):
+    monkeypatch.setattr(basic_functions, "DB_PATH", db_path)  # main() repoints it
+    monkeypatch.setattr(sys, "argv", ["questions_io.py", "--db", str(db_path), "delete", *args])
+    questions_io.main()
+
+
+def test_delete_is_a_dry_run_without_yes(db, db_path, monkeypatch, capsys):
+    before = count(db)
+    delete_cli(monkeypatch, db_path, "--topic", "Star Wars")
+
+    assert count(db) == before
+    assert "Would delete (dry run, pass --yes)" in capsys.readouterr().out
+
+
+def test_delete_matches_all_filters_and_cascades(db, db_path, monkeypatch, capsys):
+    db.execute("INSERT INTO progress (user_name, question_id, status) VALUES ('u', 170, 'wrong');")
+    db.commit()
+    topic = db.execute("SELECT topic FROM questions WHERE id = 170;").fetchone()[0]
+    expected = {
+        row[0]
+        for row in db.execute(
+            "SELECT id FROM questions WHERE topic = ? AND question LIKE '%the%';", (topic,)
+        )
+    }
+    assert 170 in expected
+
+    delete_cli(monkeypatch, db_path, "--topic", topic, "--question-like", "%the%", "--yes")
+
+    assert f"Deleted: {len(expected)} question(s)" in capsys.readouterr().out
+    remaining = db.execute(
+        "SELECT COUNT(*) FROM questions WHERE id IN (SELECT value FROM json_each(?));",
+        (json.dumps(sorted(expected)),),
+    ).fetchone()[0]
+    assert remaining == 0
+    assert count(db, "topic = ?", (topic,)) > 0
+    assert db.execute("SELECT COUNT(*) FROM progress WHERE question_id = 170;").fetchone()[0] == 0
+
+
+def test_delete_by_ids(db, db_path, monkeypatch):
+    delete_cli(monkeypatch, db_path, "--ids", "164,165", "--yes")
+    assert count(db, "id IN (164, 165)") == 0
+
+
+def test_delete_refuses_to_run_without_filters(db, db_path, monkeypatch):
+    before = count(db)
+    with pytest.raises(SystemExit, match="at least one filter"):
+        delete_cli(monkeypatch, db_path, "--yes")
+    assert count(db) == before
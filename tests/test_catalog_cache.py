@@ -0,0 +1,107 @@
+"""CatalogCache serves repeat lookups from memory and drops them on any catalog write."""
+
+import sqlite3
+import threading
+
+from src.sqlite_functions.catalog_cache import CatalogCache
+
+TOPIC = "Star Wars"
+
+
+def traced_lookup(conn, cache, topic=TOPIC):
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        rows = cache.questions(conn, topic)
+    finally:
+        conn.set_trace_callback(None)
+    return rows, [s for s in statements if "FROM questions" in s]
+
+
+def test_repeat_lookup_is_served_from_memory(conn):
+    cache = CatalogCache()
+    first, reads = traced_lookup(conn, cache)
+    assert len(first) == 23 and len(reads) == 1
+
+    again, reads = traced_lookup(conn, cache)
+    assert again is first
+    assert reads == []
+
+
+def test_questions_write_invalidates(conn):
+    cache = CatalogCache()
+    before, _ = traced_lookup(conn, cache)
+
+    conn.execute(
+        "INSERT INTO questions (topic, question, answer) VALUES (?, 'New?', 'Yes');", (TOPIC,)
+    )
+    conn.commit()
+
+    after, reads = traced_lookup(conn, cache)
+    assert len(reads) == 1
+    assert len(after) == len(before) + 1
+
+
+def test_row_budget_evicts_least_recent(conn):
+    topics = [row[0] for row in conn.execute("SELECT DISTINCT topic FROM questions LIMIT 3;")]
+    sizes = [len(CatalogCache().questions(conn, t)) for t in topics]
+    cache = CatalogCache(max_rows=sizes[1] + sizes[2])
+
+    for topic in topics:
+        cache.questions(conn, topic)
+
+    _, reads = traced_lookup(conn, cache, topics[0])
+    assert len(reads) == 1
+    _, reads = traced_lookup(conn, cache, topics[2])
+    assert reads == []
+
+
+def test_unknown_topics_cannot_grow_the_cache_unbounded(conn):
+    cache = CatalogCache(max_rows=10)
+    for i in range(1000):
+        assert cache.questions(conn, f"no such topic {i}") == ()
+
+    assert len(cache._questions) <= 10
+    assert cache._rows == len(cache._questions)
+
+
+class BlockingConn:
+    """Connection wrapper whose query for one topic waits until released."""
+
+    def __init__(self, conn, topic):
+        self.conn = conn
+        self.topic = topic
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def execute(self, sql, params=()):
+        if params == (self.topic,):
+            self.entered.set()
+            self.release.wait(5)
+        return self.conn.execute(sql, params)
+
+
+def test_a_miss_does_not_block_other_readers(db_path, conn):
+    cache = CatalogCache()
+    cached = cache.questions(conn, TOPIC)
+    other = next(t for t in cache.topics(conn) if t != TOPIC)
+
+    slow = BlockingConn(sqlite3.connect(db_path, check_same_thread=False), other)
+    fresh = sqlite3.connect(db_path, check_same_thread=False)
+    miss = threading.Thread(target=cache.questions, args=(slow, other))
+    miss.start()
+    try:
+        assert slow.entered.wait(5)
+        # the miss is parked inside its query; a hit must still be served
+        hits = []
+        hit = threading.Thread(target=lambda: hits.append(cache.questions(fresh, TOPIC)))
+        hit.start()
+        hit.join(1)
+        assert not hit.is_alive() and hits[0] is cached
+    finally:
+        slow.release.set()
+        miss.join()
+        slow.conn.close()
+        fresh.close()
+
+    assert len(cache.questions(conn, other)) > 0
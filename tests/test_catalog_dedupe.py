@@ -0,0 +1,49 @@
+"""Resume bookkeeping and cluster loading of the whole-catalog duplicate scan."""
+
+import numpy as np
+
+from src.sqlite_functions import catalog_dedupe
+from src.sqlite_functions.catalog_dedupe import create_dedupe_tables, load_clusters
+
+
+def fake_encode(texts, name=None):
+    rng = np.random.default_rng(len(texts))
+    vectors = rng.standard_normal((len(texts), 8)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_catalog_hash_changes_when_a_question_is_edited(conn, monkeypatch):
+    monkeypatch.setattr(catalog_dedupe, "encode", fake_encode)
+    ids, _, before = catalog_dedupe._catalog(conn, "fake")
+
+    conn.execute("UPDATE questions SET question = question || ' (edited)' WHERE id = 164;")
+    conn.commit()
+    edited_ids, _, after = catalog_dedupe._catalog(conn, "fake")
+
+    assert np.array_equal(ids, edited_ids)
+    assert before != after
+
+
+def test_max_score_only_counts_pairs_inside_the_cluster(conn):
+    create_dedupe_tables(conn)
+    conn.execute(
+        """
+        INSERT INTO dedupe_runs (run_id, model, threshold, tile_rows, catalog_hash,
+                                 n_questions, n_tiles)
+        VALUES (1, 'fake', 0.8, 64, 'x', 4, 1);
+        """
+    )
+    conn.executemany(
+        "INSERT INTO dedupe_clusters (run_id, cluster_id, question_id) VALUES (1, ?, ?);",
+        [(1, 164), (1, 165), (2, 166), (2, 167)],
+    )
+    # a stale pair whose ends sit in different clusters must not count
+    conn.executemany(
+        "INSERT INTO dedupe_pairs (run_id, question_a, question_b, score) VALUES (1, ?, ?, ?);",
+        [(164, 165, 0.9), (166, 167, 0.86), (164, 166, 0.99)],
+    )
+    conn.commit()
+
+    scores = {c["cluster_id"]: c["max_score"] for c in load_clusters(conn, 1)}
+
+    assert scores == {1: 0.9, 2: 0.86}
@@ -0,0 +1,55 @@
+import gc
+import os
+import weakref
+
+from src.sqlite_functions.connection import ConnectionPool
+
+
+def test_close_twice_returns_connection_once(db_path):
+    pool = ConnectionPool(db_path, size=4)
+    conn = pool.acquire()
+    conn.close()
+    conn.close()
+
+    assert pool._idle.qsize() == 1
+    first, second = pool.acquire(), pool.acquire()
+    assert first is not second
+    pool.close_all()
+
+
+def test_release_rolls_back_open_transaction(db_path):
+    pool = ConnectionPool(db_path, size=1)
+    conn = pool.acquire()
+    conn.execute("DELETE FROM questions;")
+    assert conn.in_transaction
+    conn.close()
+
+    conn = pool.acquire()
+    assert conn.execute("SELECT COUNT(*) FROM questions;").fetchone()[0] > 0
+    conn.close()
+    pool.close_all()
+
+
+def test_dropped_pool_is_garbage_collected(db_path):
+    pool = ConnectionPool(db_path, size=2)
+    pool.acquire().close()
+    ref = weakref.ref(pool)
+
+    del pool
+    gc.collect()
+
+    assert ref() is None
+
+
+def test_forked_child_starts_with_an_empty_pool(db_path):
+    pool = ConnectionPool(db_path, size=2)
+    pool.acquire().close()
+
+    pid = os.fork()
+    if pid == 0:  # child: report through the exit code, never return into pytest
+        os._exit(0 if pool._idle.empty() and len(pool._inherited) == 1 else 1)
+    _, status = os.waitpid(pid, 0)
+
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert pool._idle.qsize() == 1
+    pool.close_all()
@@ -0,0 +1,62 @@
+"""Conditional GET: ETags, 304s and what invalidates them."""
+
+import pytest
+
+USER = "alice"
+
+
+def revalidate(client, url, etag, **headers):
+    return client.get(url, headers={"If-None-Match": etag, **headers})
+
+
+@pytest.mark.parametrize("url", ["/api/topics/", "/api/questions/", f"/user/{USER}/"])
+def test_matching_etag_gets_304(client, url):
+    first = client.get(url)
+    etag = first.headers["ETag"]
+
+    again = revalidate(client, url, etag)
+
+    assert first.status_code == 200 and etag
+    assert again.status_code == 304
+    assert again.data == b""
+    assert again.headers["ETag"] == etag
+
+
+def test_catalog_write_changes_the_catalog_tag(client, conn):
+    etag = client.get("/api/topics/").headers["ETag"]
+
+    conn.execute("INSERT INTO questions (topic, question, answer) VALUES ('T', 'New?', 'A');")
+    conn.commit()
+
+    resp = revalidate(client, "/api/topics/", etag)
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
+
+
+def test_progress_write_changes_only_that_users_tag(client):
+    etag = client.get(f"/user/{USER}/").headers["ETag"]
+    other = client.get("/user/bob/").headers["ETag"]
+
+    resp = client.post(
+        "/update_progress/batch/",
+        json={"user_name": USER, "updates": [{"question_id": 164, "status": "correct"}]},
+    )
+    assert resp.status_code == 200
+
+    assert revalidate(client, f"/user/{USER}/", etag).status_code == 200
+    assert client.get(f"/user/{USER}/").headers["ETag"] != etag
+    assert revalidate(client, "/user/bob/", other).status_code == 304
+
+
+def test_gzip_and_identity_get_different_tags(client):
+    url = "/api/questions/"
+    identity = client.get(url, headers={"Accept-Encoding": "identity"}).headers["ETag"]
+    gzipped = client.get(url, headers={"Accept-Encoding": "gzip"})
+    gzip_tag = gzipped.headers["ETag"]
+
+    assert gzipped.headers["Content-Encoding"] == "gzip"
+    assert identity != gzip_tag
+    # a cached gzip body doesn't validate an identity request, or the reverse
+    assert revalidate(client, url, gzip_tag, **{"Accept-Encoding": "identity"}).status_code == 200
+    assert revalidate(client, url, identity, **{"Accept-Encoding": "gzip"}).status_code == 200
+    assert revalidate(client, url, gzip_tag, **{"Accept-Encoding": "gzip"}).status_code == 304
@@ -0,0 +1,97 @@
+"""Answer normalization, variants and grading against the bundled answers."""
+
+import pytest
+
+from src.grading import answer_variants, grade, normalize_answer
+
+
+def test_normalize_answer():
+    assert normalize_answer("The Twenty-One Pilots!") == "21 pilots"
+    assert normalize_answer("Beyoncé & Jay-Z") == "beyonce and jay z"
+    assert normalize_answer("1,000,000") == "1000000"
+
+
+@pytest.mark.parametrize("answer", ["A", "The", "An"])
+def test_article_only_answers_never_normalize_to_empty(answer):
+    assert normalize_answer(answer) == answer.lower()
+    assert grade(answer, answer_variants(answer)) == (True, 100.0)
+
+
+@pytest.mark.parametrize("answer", ["1/2", "24/7", "AC/DC"])
+def test_unspaced_slash_is_one_answer(answer):
+    variants = answer_variants(answer)
+    assert variants == (normalize_answer(answer),)
+    assert grade(answer, variants)[0]
+
+
+def test_spaced_slash_gives_alternatives():
+    variants = answer_variants("Vader / Anakin")
+    assert variants[0] == "vader anakin"
+    assert grade("anakin", variants)[0]
+    assert grade("Vader", variants)[0]
+
+
+def test_parenthesized_part_is_optional():
+    variants = answer_variants("Hermione (Granger)")
+    assert grade("hermione granger", variants)[0]
+    assert grade("Hermione", variants)[0]
+
+
+def test_numbers_must_match_exactly():
+    assert not grade("7", answer_variants("24/7"))[0]
+    assert grade("twenty-one", answer_variants("21"))[0]
+    assert not grade("22", answer_variants("21"))[0]
+
+
+@pytest.mark.parametrize(
+    ("submitted", "answer"),
+    [
+        ("Season 2", "Season 3"),
+        ("November 9, 1983", "November 6, 1983"),
+        ("Police Academy 4", "Police Academy 3"),
+        ("Flight 632", "Flight 623"),
+        ("March 23", "March 22"),
+        ("World War 1", "World War 2"),
+        ("Apollo 11", "Apollo 13"),
+    ],
+)
+def test_numbers_inside_answers_must_match_exactly(submitted, answer):
+    assert not grade(submitted, answer_variants(answer))[0]
+
+
+def test_numbers_inside_answers_still_allow_typos():
+    assert grade("Apolo 13", answer_variants("Apollo 13"))[0]
+    assert grade("november 6 1983", answer_variants("November 6, 1983"))[0]
+    assert grade("World War Two", answer_variants("World War 2"))[0]
+
+
+# stored answers that are lists of several required names
+@pytest.mark.parametrize("qid", [74, 121, 279, 320, 354, 375, 422, 425, 493])
+def test_semicolon_lists_require_the_whole_list(conn, qid):
+    answer = conn.execute("SELECT answer FROM questions WHERE id = ?;", (qid,)).fetchone()[0]
+    variants = answer_variants(answer)
+
+    assert variants == (normalize_answer(answer),)
+    assert grade(answer, variants) == (True, 100.0)
+    assert not grade(answer.split(";")[0], variants)[0]
+
+
+def test_check_answers_rejects_malformed_question_ids(client):
+    answers = [
+        {"question_id": [1], "answer": "x"},
+        {"question_id": {"id": 1}, "answer": "x"},
+        {"question_id": True, "answer": "x"},
+        {"question_id": "74", "answer": "x"},
+        {"question_id": 422, "answer": "Neil; Susan"},
+    ]
+    resp = client.post("/api/check_answers/", json={"answers": answers})
+
+    assert resp.status_code == 200
+    results = resp.get_json()["results"]
+    assert [r.get("message") for r in results[:4]] == ["Invalid question"] * 4
+    assert results[4]["correct"] is True
+
+
+def test_check_answers_rejects_non_dict_items(client):
+    resp = client.post("/api/check_answers/", json={"answers": [[422, "Neil"]]})
+    assert resp.status_code == 400
@@ -0,0 +1,27 @@
+"""The CLI and Notion sync entry points: light imports and the right database."""
+
+import subprocess
+import sys
+
+import pytest
+
+from src import trivia_web
+from src.sqlite_functions import basic_functions, complex_functions
+
+
+@pytest.mark.parametrize(
+    "module", ["src.sqlite_functions.basic_functions", "src.scripts.notion_sync"]
+)
+def test_imports_without_numpy(module):
+    # sys.modules[name] = None makes any import of it fail, as if uninstalled
+    code = f"import sys; sys.modules['numpy'] = None; import {module}"
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", code], capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+
+
+def test_cli_and_sync_use_the_web_app_database():
+    assert basic_functions.DB_PATH == trivia_web.DB_PATH
+    assert complex_functions.DB_PATH == trivia_web.DB_PATH
+    assert basic_functions.DB_PATH.exists()
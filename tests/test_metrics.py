@@ -0,0 +1,99 @@
+"""Request metrics: off by default, and streamed responses count their queries."""
+
+import os
+import re
+import subprocess
+import sys
+
+from src import metrics, trivia_web
+from src.sqlite_functions.connection import QueryStats, _query_stats, tracked
+
+# run with TRIVIA_METRICS=1: the hooks are registered at import time
+SCRIPT = """
+from src import metrics, trivia_web
+trivia_web.create_app()
+client = trivia_web.app.test_client()
+
+def get(url):
+    resp = client.get(url)
+    resp.get_data()
+    resp.close()
+
+# open the pool's connections first: their setup PRAGMAs count as queries too
+for url in ("/api/questions/", "/api/questions/?limit=1000") * 2:
+    get(url)
+for url in ("/api/questions/", "/api/questions/?limit=1000"):
+    trivia_web.metrics = metrics.RequestMetrics()
+    for _ in range(3):
+        get(url)
+    print(trivia_web.metrics.render())
+    print("----")
+"""
+
+
+# one gunicorn worker: records a request, then renders /metrics
+WORKER = """
+from src.metrics import RequestMetrics
+metrics = RequestMetrics()
+metrics.observe("api_get_topics", "GET", 200, 0.01, 2, 0.001)
+print(metrics.render())
+"""
+
+
+def test_metrics_are_off_by_default(client):
+    if "TRIVIA_METRICS" not in os.environ:
+        assert not metrics.METRICS_ENABLED
+        assert client.get("/metrics").status_code == 404
+
+
+def test_tracked_sets_stats_only_while_producing_items():
+    stats = QueryStats()
+    seen = []
+
+    def body():
+        for i in range(3):
+            seen.append(_query_stats.get())
+            yield i
+
+    assert list(tracked(body(), stats)) == [0, 1, 2]
+    assert seen == [stats] * 3
+    assert _query_stats.get() is None
+
+
+def test_streamed_response_queries_are_recorded(db_path):
+    env = {**os.environ, "TRIVIA_METRICS": "1", "TRIVIA_DB_PATH": str(db_path)}
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", SCRIPT],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=trivia_web.BASE_DIR,
+    )
+    assert result.returncode == 0, result.stderr
+
+    def queries(text):
+        pattern = r'^trivia_db_queries_per_request_sum\{endpoint="api_get_questions"\} (\S+)$'
+        return float(re.search(pattern, text, re.MULTILINE).group(1))
+
+    streamed, paged = result.stdout.split("----")[:2]
+    # the streamed catalog runs the same two statements as a buffered page of it
+    assert queries(streamed) == queries(paged) == 2 * 3
+
+
+def test_workers_share_metrics_through_the_multiprocess_dir(tmp_path):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    totals = []
+    for _ in range(3):
+        result = subprocess.run(  # noqa: S603
+            [sys.executable, "-c", WORKER],
+            capture_output=True,
+            text=True,
+            env=env,
+            cwd=trivia_web.BASE_DIR,
+        )
+        assert result.returncode == 0, result.stderr
+        pattern = r'^trivia_http_requests_total\{endpoint="api_get_topics".*\} (\S+)$'
+        totals.append(float(re.search(pattern, result.stdout, re.MULTILINE).group(1)))
+
+    # each process reports every process's requests so far, exited ones included
+    assert totals == [1, 2, 3]
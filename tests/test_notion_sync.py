@@ -0,0 +1,140 @@
+"""Notion sync against the offline fake client: pagination, backoff and the watermark."""
+
+import sqlite3
+import sys
+import time
+
+import pytest
+
+from src.scripts import notion_sync
+from src.scripts.fake_notion import FakeNotionClient, FakeRateLimited, make_page
+from src.sqlite_functions import basic_functions
+from src.sqlite_functions.sync_state import create_sync_state, get_watermark, record_synced
+
+
+def fake_client(pages, **kwargs) -> FakeNotionClient:
+    return FakeNotionClient(pages, **{"latency": 0, "rate": 1000, "burst": 1000, **kwargs})
+
+
+class Flaky:
+    """Fails with the given errors in turn, then returns "ok"."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+class HTTPError(Exception):
+    def __init__(self, status):
+        super().__init__(status)
+        self.status = status
+
+
+def test_query_all_follows_cursors():
+    client = fake_client([make_page(i) for i in range(250)])
+
+    pages = list(notion_sync.query_all(notion_sync.UNSYNCED, client))
+
+    assert [p["id"] for p in pages] == [f"page-{i}" for i in range(250)]
+    assert client.calls == 3  # 100 + 100 + 50
+
+
+def test_backoff_waits_out_retry_after():
+    call = Flaky(FakeRateLimited(0.05), FakeRateLimited(0.05))
+    started = time.monotonic()
+
+    assert notion_sync.with_backoff(call) == "ok"
+    assert call.calls == 3
+    assert time.monotonic() - started >= 0.1
+
+
+def test_backoff_retries_server_errors_but_not_client_errors():
+    assert notion_sync._retry_delay(HTTPError(404), 0) is None
+    assert 0 < notion_sync._retry_delay(HTTPError(503), 0) <= 0.5
+    assert notion_sync._retry_delay(FakeRateLimited(1.5), 0) == 1.5
+
+    call = Flaky(HTTPError(400))
+    with pytest.raises(HTTPError):
+        notion_sync.with_backoff(call)
+    assert call.calls == 1
+
+
+def test_backoff_gives_up_after_max_retries(monkeypatch):
+    monkeypatch.setattr(notion_sync, "MAX_RETRIES", 2)
+    call = Flaky(*(FakeRateLimited(0.001) for _ in range(5)))
+
+    with pytest.raises(FakeRateLimited):
+        notion_sync.with_backoff(call)
+    assert call.calls == 3
+
+
+def test_concurrent_updates_survive_rate_limits():
+    client = fake_client([make_page(i) for i in range(20)], rate=100, burst=3)
+
+    updated = notion_sync.update_pages(
+        [f"page-{i}" for i in range(20)],
+        client,
+        workers=4,
+        properties={"Synced": {"checkbox": True}},
+    )
+
+    assert updated == 20
+    assert client.rate_limited > 0
+    assert all(p["properties"]["Synced"]["checkbox"] for p in client.store.values())
+
+
+def test_watermark_only_moves_forward(conn):
+    create_sync_state(conn)
+    record_synced(conn, "ds", [("a", "2025-01-02T00:00:00.000Z")])
+    record_synced(conn, "ds", [("b", "2025-01-01T00:00:00.000Z")])
+
+    assert get_watermark(conn, "ds") == "2025-01-02T00:00:00.000Z"
+
+
+def test_fetch_since_watermark_skips_older_pages():
+    client = fake_client([make_page(i) for i in range(10)])
+    since = make_page(6)["last_edited_time"]
+
+    found = notion_sync.fetch_new_questions(client, since)
+
+    assert [q.page_id for q in found] == ["page-6", "page-7", "page-8", "page-9"]
+
+
+def test_main_syncs_each_page_once(db_path, monkeypatch):
+    client = fake_client([make_page(i) for i in range(5)])
+    monkeypatch.setattr(notion_sync, "get_client", lambda: client)
+    monkeypatch.setattr(notion_sync, "DB_PATH", db_path)
+    monkeypatch.setattr(basic_functions, "DB_PATH", db_path)
+    monkeypatch.setattr(sys, "argv", ["notion_sync.py"])
+    conn = sqlite3.connect(db_path)
+
+    def synced():
+        return conn.execute(
+            "SELECT COUNT(*) FROM questions WHERE topic = 'Fake Topic';"
+        ).fetchone()[0]
+
+    notion_sync.main()
+    assert synced() == 5
+    assert (
+        get_watermark(conn, notion_sync.get_data_source_id(client))
+        == make_page(4)["last_edited_time"]
+    )
+    assert all(p["archived"] for p in client.store.values())
+
+    # a page at exactly the watermark that was already handled comes back
+    # from the on_or_after query, but is filtered out by id (not by its text)
+    page = client.store["page-4"]
+    page["archived"] = False
+    page["properties"]["Synced"] = {"checkbox": False}
+    page["properties"]["Question"] = {"title": [{"text": {"content": "Reworded?"}}]}
+    client.store["page-9"] = make_page(9)
+    notion_sync.main()
+
+    assert synced() == 6
+    conn.close()
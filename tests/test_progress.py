@@ -0,0 +1,29 @@
+"""Progress writes report what actually reached the database."""
+
+import pytest
+
+USER = "alice"
+
+
+def test_batch_count_skips_unknown_questions(client, conn):
+    updates = [
+        {"question_id": 164, "status": "correct"},
+        {"question_id": 165, "status": "wrong"},
+        {"question_id": 999_999, "status": "wrong"},
+    ]
+    resp = client.post("/update_progress/batch/", json={"user_name": USER, "updates": updates})
+
+    assert resp.get_json() == {"success": True, "count": 2}
+    rows = conn.execute("SELECT COUNT(*) FROM progress WHERE user_name = ?;", (USER,)).fetchone()
+    assert rows[0] == 2
+
+
+@pytest.mark.parametrize("question_id", ["164", True, False, 164.0])
+def test_batch_rejects_non_int_question_ids(client, conn, question_id):
+    updates = [{"question_id": question_id, "status": "correct"}]
+    resp = client.post("/update_progress/batch/", json={"user_name": USER, "updates": updates})
+    assert resp.status_code == 400
+    assert (
+        conn.execute("SELECT COUNT(*) FROM progress WHERE user_name = ?;", (USER,)).fetchone()[0]
+        == 0
+    )
@@ -0,0 +1,124 @@
+"""
+The hot route queries must be index lookups, not table scans.
+
+Statements are captured from the routes themselves (via the SQLite trace
+callback, with parameters already bound) and re-run under
+EXPLAIN QUERY PLAN.
+"""
+
+import re
+
+import pytest
+
+from src import trivia_web
+from src.sqlite_functions.catalog_cache import CatalogCache
+
+TOPIC = "Star Wars"
+USER = "alice"
+
+# plan steps that are fine to "scan": one-row constants and json_each() lists
+_HARMLESS_SCAN = re.compile(r"^SCAN (CONSTANT ROW|json_each)")
+_INDEXED = re.compile(r"USING (COVERING )?INDEX|USING (INTEGER )?PRIMARY KEY")
+
+
+@pytest.fixture
+def traced(app, monkeypatch):
+    """Every statement the routes run from here on, with parameters bound."""
+    statements = []
+    acquire = trivia_web.db_pool.acquire
+
+    def get_db():
+        conn = acquire()
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(trivia_web, "get_db", get_db)
+    return statements
+
+
+@pytest.fixture
+def progress(client):
+    """USER has wrong and correct answers in TOPIC."""
+    updates = [
+        {"question_id": qid, "status": "wrong" if qid % 2 else "correct"} for qid in range(164, 187)
+    ]
+    resp = client.post("/update_progress/batch/", json={"user_name": USER, "updates": updates})
+    assert resp.status_code == 200
+
+
+def statement(statements: list[str], pattern: str) -> str:
+    found = [s for s in statements if re.search(pattern, s)]
+    assert found, f"no statement matched {pattern!r}"
+    return found[-1]
+
+
+def assert_indexed(conn, sql: str, index: str | None = None) -> list[str]:
+    lines = [row[3].strip() for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+    scans = [line for line in lines if line.startswith("SCAN") and not _HARMLESS_SCAN.match(line)]
+    assert not scans, f"full scan {scans} in plan {lines} for: {sql}"
+    assert any(_INDEXED.search(line) for line in lines), lines
+    if index:
+        assert any(index in line for line in lines), f"{index} not used: {lines}"
+    return lines
+
+
+def test_study_missed_uses_status_index(client, conn, progress, traced):
+    client.get(f"/study/{TOPIC}/?user={USER}&mode=missed")
+    sql = statement(traced, r"p\.status = 'wrong'")
+    assert_indexed(conn, sql, "progress_user_status_")
+
+
+def test_topic_questions_use_topic_index(conn):
+    # create_app() warms the shared cache, so load through a cold one
+    traced = []
+    conn.set_trace_callback(traced.append)
+    CatalogCache().questions(conn, TOPIC)
+    conn.set_trace_callback(None)
+    sql = statement(traced, r"FROM questions WHERE topic = ")
+    assert_indexed(conn, sql, "questions_topic_idx")
+
+
+def test_stats_summary_reads_primary_key(client, conn, progress, traced):
+    client.get(f"/stats/{USER}/")
+    sql = statement(traced, r"FROM progress_summary\s+WHERE user_name = ")
+    assert_indexed(conn, sql)
+
+
+def test_stats_question_list_is_covering_range(client, conn, progress, traced):
+    client.get(f"/api/stats/{USER}/questions/?status=wrong&topic={TOPIC}&limit=5")
+    sql = statement(traced, r"ORDER BY p\.updated_at DESC")
+    lines = assert_indexed(conn, sql, "progress_user_status_updated_idx")
+    assert not any("TEMP B-TREE" in line for line in lines), lines
+
+
+def test_reset_topic_uses_indexes(client, conn, progress, traced):
+    client.post(f"/reset_progress/{USER}/{TOPIC}/")
+    sql = statement(traced, r"DELETE FROM progress")
+    assert_indexed(conn, sql, "questions_topic_idx")
+
+
+def test_next_cards_use_schedule_index(client, conn, progress, traced):
+    client.get(f"/api/next/{TOPIC}/{USER}/?n=5")
+    sql = statement(traced, r"FROM review_schedule s")
+    assert_indexed(conn, sql)
+
+
+def test_admin_overview_reads_summary_in_key_order(client, conn, progress, traced):
+    client.get("/admin/overview/")
+    sql = statement(traced, r"FROM progress_summary\s+GROUP BY user_name")
+    lines = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+    assert not any("TEMP B-TREE" in line for line in lines), lines
+
+
+def test_schedule_seed_check_is_an_anti_join_on_keys(client, conn, traced):
+    client.get(f"/api/next/{TOPIC}/{USER}/?n=5")
+    sql = statement(traced, r"SELECT EXISTS \(SELECT 1")
+    lines = assert_indexed(conn, sql, "questions_topic_idx")
+    assert any("SEARCH s USING PRIMARY KEY" in line for line in lines), lines
+
+
+def test_due_reviews_are_an_ordered_range(client, conn, progress, traced):
+    client.get(f"/api/next/{TOPIC}/{USER}/?n=5")
+    sql = statement(traced, r"s\.due_at > 0")
+    lines = assert_indexed(conn, sql, "review_schedule_due_idx")
+    assert not any("TEMP B-TREE" in line for line in lines), lines
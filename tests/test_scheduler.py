@@ -0,0 +1,54 @@
+"""Seeding and card ordering of the Leitner scheduler."""
+
+from src.sqlite_functions.scheduler import interleave, next_cards
+
+USER = "alice"
+TOPIC = "Star Wars"
+
+
+def scheduled(conn, topic=TOPIC) -> set[int]:
+    cur = conn.execute(
+        "SELECT question_id FROM review_schedule WHERE user_name = ? AND topic = ?;",
+        (USER, topic),
+    )
+    return {row[0] for row in cur}
+
+
+def test_seed_picks_up_questions_moved_into_a_seeded_topic(conn):
+    next_cards(conn, USER, TOPIC)
+    assert scheduled(conn) == set(range(164, 187))
+
+    # id 2 is below every Star Wars id, so a high-water mark would never see it
+    conn.execute("UPDATE questions SET topic = ? WHERE id = 2;", (TOPIC,))
+    conn.commit()
+    next_cards(conn, USER, TOPIC)
+
+    assert 2 in scheduled(conn)
+
+
+def test_seed_skips_the_write_when_nothing_is_missing(conn):
+    next_cards(conn, USER, TOPIC)
+    statements = []
+    conn.set_trace_callback(statements.append)
+    next_cards(conn, USER, TOPIC)
+    conn.set_trace_callback(None)
+
+    assert not any(s.lstrip().startswith(("INSERT", "BEGIN")) for s in statements)
+
+
+def test_missed_cards_are_interleaved_with_new_ones(client, conn):
+    missed = [164, 165, 166]
+    updates = [{"question_id": qid, "status": "wrong"} for qid in missed]
+    client.post("/update_progress/batch/", json={"user_name": USER, "updates": updates})
+
+    cards, due = next_cards(conn, USER, TOPIC, n=6)
+
+    assert due == 23
+    assert [card["id"] in missed for card in cards] == [True, False] * 3
+
+
+def test_interleave_ratio_and_fill():
+    reviews, new = ["r1", "r2", "r3"], ["n1", "n2", "n3"]
+    assert interleave(reviews, new, 6, reviews_per_new=2) == ["r1", "r2", "n1", "r3", "n2", "n3"]
+    assert interleave([], new, 2) == ["n1", "n2"]
+    assert interleave(reviews, [], 5) == reviews
@@ -0,0 +1,50 @@
+"""FTS5 search: prefix indexes, sync triggers and results."""
+
+import re
+
+from src.sqlite_functions import search
+from src.sqlite_functions.search import search_questions
+
+_WORD = re.compile(r"\w+")
+
+
+def fts_sql(conn) -> str:
+    return conn.execute("SELECT sql FROM sqlite_master WHERE name = 'questions_fts';").fetchone()[0]
+
+
+def test_short_prefixes_find_every_word_they_start(conn):
+    assert "prefix = '2 3'" in fts_sql(conn)
+    rows = conn.execute("SELECT id, question, answer FROM questions;").fetchall()
+    for prefix in ("ha", "har", "te", "ter"):
+        found = {r["id"] for r in search_questions(conn, prefix, limit=10_000)}
+        expected = {
+            qid
+            for qid, question, answer in rows
+            if any(w.startswith(prefix) for w in _WORD.findall(f"{question} {answer}".lower()))
+        }
+        assert found and found == expected
+
+
+def test_triggers_keep_the_index_current(conn):
+    cur = conn.execute(
+        "INSERT INTO questions (topic, question, answer) VALUES ('T', 'Zyxwv question?', 'Qwerty');"
+    )
+    conn.commit()
+    assert [r["id"] for r in search_questions(conn, "zy")] == [cur.lastrowid]
+
+    conn.execute(
+        "UPDATE questions SET question = 'Plain question?' WHERE id = ?;", (cur.lastrowid,)
+    )
+    conn.commit()
+    assert search_questions(conn, "zy") == []
+
+
+def test_broad_queries_skip_ranking(conn, monkeypatch):
+    ranked = search_questions(conn, "ha", limit=10_000)
+    assert all(r["score"] is not None for r in ranked)
+
+    monkeypatch.setattr(search, "RANK_CANDIDATES", len(ranked) - 1)
+    unranked = search_questions(conn, "ha", limit=10_000)
+
+    assert [r["id"] for r in unranked] == sorted(r["id"] for r in ranked)
+    assert all(r["score"] is None for r in unranked)
@@ -0,0 +1,97 @@
+"""Slow-query log: the threshold, what an entry records, and the summary."""
+
+import json
+
+import pytest
+
+from src.sqlite_functions import slow_query_log
+from src.sqlite_functions.connection import ConnectionPool, stop_tracking_queries, track_queries
+from src.sqlite_functions.slow_query_log import SlowQueryLog, summarize
+
+
+@pytest.fixture
+def pooled(db_path):
+    pool = ConnectionPool(db_path, size=1)
+    conn = pool.acquire()  # before the log is on, so setup PRAGMAs aren't logged
+    yield conn
+    conn.close()
+    pool.close_all()
+
+
+def enable(monkeypatch, tmp_path, threshold_ms: float) -> SlowQueryLog:
+    log = SlowQueryLog(threshold_ms, path=str(tmp_path / "slow.log"))
+    monkeypatch.setattr(slow_query_log, "slow_log", log)
+    return log
+
+
+def entries(log: SlowQueryLog) -> list[dict]:
+    try:
+        with open(log.path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+    except FileNotFoundError:
+        return []
+
+
+def test_statements_under_the_threshold_are_not_logged(pooled, monkeypatch, tmp_path):
+    log = enable(monkeypatch, tmp_path, threshold_ms=60_000)
+    pooled.execute("SELECT COUNT(*) FROM questions;").fetchone()
+    assert entries(log) == []
+
+
+def test_slow_statement_is_logged_once_with_its_plan(pooled, monkeypatch, tmp_path):
+    log = enable(monkeypatch, tmp_path, threshold_ms=0)
+    track_queries("api_get_question")
+    try:
+        cur = pooled.execute(
+            """
+            SELECT question
+            FROM questions
+            WHERE id = ? AND topic = ?;
+            """,
+            (164, "Star Wars"),
+        )
+        cur.fetchone()
+        cur.fetchall()
+    finally:
+        stop_tracking_queries()
+
+    [entry] = entries(log)
+    assert entry["sql"] == "SELECT question FROM questions WHERE id = ? AND topic = ?;"
+    assert entry["params"] == ["int", "str[9]"]  # shapes, never values
+    assert entry["endpoint"] == "api_get_question"
+    assert any("USING INTEGER PRIMARY KEY" in line for line in entry["plan"])
+
+
+def test_plans_are_cached_per_statement(pooled, monkeypatch, tmp_path):
+    log = enable(monkeypatch, tmp_path, threshold_ms=0)
+    for qid in (164, 165, 166):
+        pooled.execute("SELECT question FROM questions WHERE id = ?;", (qid,)).fetchone()
+
+    assert len(entries(log)) == 3
+    assert len(log._plans) == 1
+
+
+def test_executemany_logs_row_count_and_first_row_shape(pooled, monkeypatch, tmp_path):
+    log = enable(monkeypatch, tmp_path, threshold_ms=0)
+    pooled.executemany(
+        "UPDATE questions SET likelihood = ? WHERE id = ?;", ((3, qid) for qid in range(164, 174))
+    )
+
+    [entry] = entries(log)
+    assert entry["rows"] == 10
+    assert entry["params"] == ["int", "int"]
+
+
+def test_summary_ranks_statements_by_total_time():
+    logged = [
+        {"sql": "A", "ms": 5.0, "endpoint": "x"},
+        {"sql": "B", "ms": 8.0, "endpoint": "y"},
+        {"sql": "A", "ms": 6.0, "endpoint": "z"},
+    ]
+    summary = summarize(logged)
+
+    assert [(s["sql"], s["count"], s["total_ms"]) for s in summary] == [
+        ("A", 2, 11.0),
+        ("B", 1, 8.0),
+    ]
+    assert summary[0]["endpoints"] == ["x", "z"]
@@ -0,0 +1,66 @@
+"""The trigger-maintained tables stay in step with the rows they summarize."""
+
+from src.sqlite_functions.catalog_cache import catalog_version
+from src.sqlite_functions.progress_summary import check_progress_summary
+from src.sqlite_functions.progress_version import progress_version
+
+USER = "alice"
+
+
+def post_batch(client, updates):
+    resp = client.post("/update_progress/batch/", json={"user_name": USER, "updates": updates})
+    assert resp.status_code == 200
+
+
+def test_progress_summary_follows_every_write(client, conn):
+    post_batch(client, [{"question_id": qid, "status": "wrong"} for qid in range(164, 187)])
+    assert check_progress_summary(conn) == []
+
+    # flip some to correct, then drop a topic and move a question between topics
+    post_batch(client, [{"question_id": qid, "status": "correct"} for qid in range(164, 170)])
+    assert check_progress_summary(conn) == []
+
+    conn.execute("UPDATE questions SET topic = 'Moved' WHERE id = 170;")
+    conn.commit()
+    assert check_progress_summary(conn) == []
+
+    client.post(f"/reset_progress/{USER}/Star Wars/")
+    assert check_progress_summary(conn) == []
+
+    row = conn.execute(
+        "SELECT wrong_count, total_count FROM progress_summary WHERE user_name = ? AND topic = ?;",
+        (USER, "Moved"),
+    ).fetchone()
+    assert tuple(row) == (1, 1)
+
+
+def test_catalog_version_bumps_on_questions_writes(conn):
+    before = catalog_version(conn)
+    cur = conn.execute("INSERT INTO questions (topic, question, answer) VALUES ('T', 'Q?', 'A');")
+    conn.commit()
+    inserted = catalog_version(conn)
+    assert inserted > before
+
+    conn.execute("UPDATE questions SET answer = 'B' WHERE id = ?;", (cur.lastrowid,))
+    conn.commit()
+    assert catalog_version(conn) > inserted
+
+    conn.execute("DELETE FROM questions WHERE id = ?;", (cur.lastrowid,))
+    conn.commit()
+    assert catalog_version(conn) > inserted + 1
+
+
+def test_progress_version_bumps_per_user(client, conn):
+    assert progress_version(conn, USER) == 0
+
+    post_batch(client, [{"question_id": 164, "status": "wrong"}])
+    first = progress_version(conn, USER)
+    assert first > 0
+
+    post_batch(client, [{"question_id": 164, "status": "correct"}])
+    second = progress_version(conn, USER)
+    assert second > first
+
+    client.post(f"/reset_progress/{USER}/Star Wars/")
+    assert progress_version(conn, USER) > second
+    assert progress_version(conn, "bob") == 0